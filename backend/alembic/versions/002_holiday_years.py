@@ -0,0 +1,36 @@
+"""Add holiday_years table
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per country and year of Calendarific holidays
+    op.create_table(
+        'holiday_years',
+        sa.Column('country', sa.String(length=2), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('etag', sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint('country', 'year')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('holiday_years')
@@ -0,0 +1,34 @@
+"""Add api_usage table
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Calls made per API key and quota month
+    op.create_table(
+        'api_usage',
+        sa.Column('key_hash', sa.String(length=64), nullable=False),
+        sa.Column('period', sa.Date(), nullable=False),
+        sa.Column('calls', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('key_hash', 'period')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('api_usage')
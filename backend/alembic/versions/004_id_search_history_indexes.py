@@ -0,0 +1,41 @@
+"""Add search history indexes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so a large id_searches table stays writable
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_id_searches_last_searched',
+            'id_searches',
+            [sa.text('coalesce(updated_at, created_at) DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_id_searches_search_count',
+            'id_searches',
+            [sa.text('search_count DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_id_searches_search_count', table_name='id_searches', postgresql_concurrently=True)
+        op.drop_index('ix_id_searches_last_searched', table_name='id_searches', postgresql_concurrently=True)
@@ -0,0 +1,54 @@
+"""Add search stats rollup tables
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Searches per birth year, gender and citizen status
+    op.create_table(
+        'search_demographics',
+        sa.Column('birth_year', sa.Integer(), nullable=False),
+        sa.Column('gender', sa.String(), nullable=False),
+        sa.Column('citizen', sa.Boolean(), nullable=False),
+        sa.Column('searches', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('birth_year', 'gender', 'citizen')
+    )
+    # Searches per hour, in UTC
+    op.create_table(
+        'search_hourly',
+        sa.Column('hour', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('searches', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('hour')
+    )
+
+    # Seed the demographics with the searches recorded so far. When each
+    # past search happened is not stored, so search_hourly starts empty.
+    op.execute(
+        """
+        INSERT INTO search_demographics (birth_year, gender, citizen, searches)
+        SELECT extract(year FROM date_of_birth)::int, gender, citizen,
+               sum(coalesce(search_count, 1))
+        FROM id_searches
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('search_hourly')
+    op.drop_table('search_demographics')
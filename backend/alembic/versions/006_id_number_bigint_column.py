@@ -0,0 +1,48 @@
+"""Add BIGINT id_number column
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by 007 and swapped in for the VARCHAR id_number
+    op.add_column('id_searches', sa.Column('id_number_bigint', sa.BigInteger(), nullable=True))
+
+    # Keep the new column in step with rows written while 007 backfills
+    op.execute(
+        """
+        CREATE FUNCTION id_searches_sync_id_number() RETURNS trigger AS $$
+        BEGIN
+            NEW.id_number_bigint := NEW.id_number::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER id_searches_sync_id_number
+        BEFORE INSERT OR UPDATE OF id_number ON id_searches
+        FOR EACH ROW EXECUTE FUNCTION id_searches_sync_id_number()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER id_searches_sync_id_number ON id_searches')
+    op.execute('DROP FUNCTION id_searches_sync_id_number()')
+    op.drop_column('id_searches', 'id_number_bigint')
@@ -0,0 +1,94 @@
+"""Backfill BIGINT id_number and swap it in
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows updated per transaction, so the backfill never locks the whole table
+BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        max_id = bind.execute(sa.text('SELECT max(id) FROM id_searches')).scalar() or 0
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    """
+                    UPDATE id_searches SET id_number_bigint = id_number::bigint
+                    WHERE id >= :start AND id < :end AND id_number_bigint IS NULL
+                    """
+                ),
+                {"start": start, "end": start + BATCH_SIZE},
+            )
+        missing = bind.execute(
+            sa.text('SELECT count(*) FROM id_searches WHERE id_number_bigint IS NULL'),
+        ).scalar()
+        if missing:
+            raise RuntimeError(f"{missing} id_searches rows were not backfilled, not swapping columns")
+
+        op.create_index(
+            'ix_id_searches_id_number_bigint',
+            'id_searches',
+            ['id_number_bigint'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        # Proves the column has no NULLs without blocking writes, so SET NOT
+        # NULL below can skip its full table scan
+        op.execute(
+            'ALTER TABLE id_searches ADD CONSTRAINT ck_id_searches_id_number_bigint_not_null '
+            'CHECK (id_number_bigint IS NOT NULL) NOT VALID'
+        )
+        op.execute('ALTER TABLE id_searches VALIDATE CONSTRAINT ck_id_searches_id_number_bigint_not_null')
+
+    # Swap the columns; dropping id_number also drops its unique constraint
+    # and index. Nothing in this transaction scans the table, so it holds
+    # its exclusive lock only briefly.
+    op.execute('DROP TRIGGER id_searches_sync_id_number ON id_searches')
+    op.execute('DROP FUNCTION id_searches_sync_id_number()')
+    op.drop_column('id_searches', 'id_number')
+    op.alter_column('id_searches', 'id_number_bigint', new_column_name='id_number', nullable=False)
+    op.drop_constraint('ck_id_searches_id_number_bigint_not_null', 'id_searches', type_='check')
+    op.execute('ALTER INDEX ix_id_searches_id_number_bigint RENAME TO ix_id_searches_id_number')
+
+
+def downgrade() -> None:
+    op.add_column('id_searches', sa.Column('id_number_varchar', sa.String(length=13), nullable=True))
+    op.execute("UPDATE id_searches SET id_number_varchar = lpad(id_number::text, 13, '0')")
+    op.drop_column('id_searches', 'id_number')
+    op.alter_column('id_searches', 'id_number_varchar', new_column_name='id_number', nullable=False)
+    op.create_index('ix_id_searches_id_number', 'id_searches', ['id_number'], unique=True)
+    # Back to where 006 left off
+    op.add_column('id_searches', sa.Column('id_number_bigint', sa.BigInteger(), nullable=True))
+    op.execute(
+        """
+        CREATE FUNCTION id_searches_sync_id_number() RETURNS trigger AS $$
+        BEGIN
+            NEW.id_number_bigint := NEW.id_number::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER id_searches_sync_id_number
+        BEFORE INSERT OR UPDATE OF id_number ON id_searches
+        FOR EACH ROW EXECUTE FUNCTION id_searches_sync_id_number()
+        """
+    )
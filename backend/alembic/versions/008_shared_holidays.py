@@ -0,0 +1,83 @@
+"""Replace per-search holidays with one shared row per holiday
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Payloads are either [name, description, date, type] lists or raw
+# Calendarific holidays.
+BACKFILL_HOLIDAYS = """
+INSERT INTO holidays (country, date, name, description, type)
+SELECT y.country,
+       CASE jsonb_typeof(h.item)
+           WHEN 'array' THEN (h.item->>2)::date
+           ELSE left(h.item->'date'->>'iso', 10)::date
+       END,
+       CASE jsonb_typeof(h.item)
+           WHEN 'array' THEN h.item->>0
+           ELSE h.item->>'name'
+       END,
+       CASE jsonb_typeof(h.item)
+           WHEN 'array' THEN h.item->>1
+           ELSE h.item->>'description'
+       END,
+       CASE jsonb_typeof(h.item)
+           WHEN 'array' THEN h.item->>3
+           ELSE h.item->'type'->>0
+       END
+FROM holiday_years y
+CROSS JOIN LATERAL jsonb_array_elements(y.payload) AS h(item)
+ON CONFLICT DO NOTHING
+"""
+
+
+def upgrade() -> None:
+    # The per-search copies were never written, nothing is lost
+    op.drop_index('ix_holidays_id_search_id', table_name='holidays')
+    op.drop_table('holidays')
+
+    # Keyed by date within a country, so joining searches on their date of
+    # birth is a primary key lookup
+    op.create_table(
+        'holidays',
+        sa.Column('country', sa.String(length=2), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('country', 'date', 'name')
+    )
+
+    # Fill it from the years fetched so far
+    op.execute(BACKFILL_HOLIDAYS)
+
+
+def downgrade() -> None:
+    op.drop_table('holidays')
+    op.create_table(
+        'holidays',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('id_search_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['id_search_id'], ['id_searches.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_holidays_id_search_id', 'holidays', ['id_search_id'], unique=False)
@@ -0,0 +1,398 @@
+"""
+Offline bulk validation of ID number files.
+
+The input file is memory-mapped and cut into chunks that end on a line
+boundary. Each chunk is validated by a worker process that maps the same
+file, so no input data is pickled between processes. Workers write their
+results to part files, which are concatenated in order into the output CSV.
+"""
+
+import argparse
+import asyncio
+import csv
+import mmap
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from backend.services import id_kernel
+from backend.services.bulk_pipeline import InputFormat, RecordParser
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+CHUNK_SIZE = 16 * 1024 * 1024
+# IDs handed to the kernel at once inside a worker
+WORKER_BATCH_SIZE = 100_000
+# Rows sent to the database per bulk upsert
+DB_BATCH_SIZE = 5000
+OUTPUT_HEADER = ("id_number", "valid", "date_of_birth", "gender", "citizen")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """Record-aligned byte range of the input file."""
+
+    index: int
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class ChunkResult:
+    """Outcome of validating one chunk."""
+
+    index: int
+    part_path: Path
+    records: int
+    valid: int
+
+
+def split_chunks(path: Path, chunk_size: int = CHUNK_SIZE) -> List[Chunk]:
+    """
+    Cut a file into chunks that start and end on line boundaries.
+
+    :param path: input file.
+    :param chunk_size: approximate chunk size in bytes.
+    :return: chunks covering the whole file.
+    """
+    size = path.stat().st_size
+    if size == 0:
+        return []
+    chunks: List[Chunk] = []
+    with path.open("rb") as file, mmap.mmap(
+        file.fileno(),
+        0,
+        access=mmap.ACCESS_READ,
+    ) as data:
+        start = 0
+        while start < size:
+            newline = data.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            chunks.append(Chunk(index=len(chunks), start=start, end=end))
+            start = end
+    return chunks
+
+
+def detect_column(path: Path, input_format: InputFormat) -> int:
+    """
+    Find the ID number column from the header of a CSV file.
+
+    :param path: input file.
+    :param input_format: CSV or NDJSON.
+    :return: column index, 0 when there is no header.
+    """
+    parser = RecordParser(input_format)
+    with path.open("rb") as file:
+        parser.parse(file.readline(4096).rstrip(b"\r\n"))
+    return parser.column
+
+
+def _iter_lines(data: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+    position = start
+    while position < end:
+        newline = data.find(b"\n", position, end)
+        if newline == -1:
+            newline = end
+        yield data[position:newline]
+        position = newline + 1
+
+
+def _iter_batches(
+    lines: Iterator[bytes],
+    parser: RecordParser,
+) -> Iterator[List[str]]:
+    batch: List[str] = []
+    for line in lines:
+        id_number = parser.parse(line.rstrip(b"\r"))
+        if id_number is None:
+            continue
+        batch.append(id_number)
+        if len(batch) >= WORKER_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _output_rows(id_numbers: List[str]) -> Tuple[List[Tuple[Any, ...]], int]:
+    decoded = id_kernel.decode_batch(id_numbers)
+    valid = decoded["date_valid"]
+    dates = np.datetime_as_string(decoded["date_of_birth"], unit="D")
+    genders = np.where(decoded["male"], "male", "female")
+
+    rows = [
+        (id_number, True, date_of_birth, gender, citizen)
+        if is_valid
+        else (id_number, False, "", "", "")
+        for id_number, is_valid, date_of_birth, gender, citizen in zip(
+            id_numbers,
+            valid.tolist(),
+            dates.tolist(),
+            genders.tolist(),
+            decoded["citizen"].tolist(),
+        )
+    ]
+    return rows, int(valid.sum())
+
+
+def process_chunk(
+    path: Path,
+    chunk: Chunk,
+    input_format: InputFormat,
+    column: int,
+    part_path: Path,
+) -> ChunkResult:
+    """
+    Validate one chunk of the input and write its results to a part file.
+
+    Runs inside a worker process.
+
+    :param path: input file.
+    :param chunk: byte range to process.
+    :param input_format: CSV or NDJSON.
+    :param column: CSV column holding the ID number.
+    :param part_path: where to write this chunk's CSV rows.
+    :return: counts for the chunk.
+    """
+    parser = RecordParser(
+        input_format,
+        column=column,
+        detect_header=chunk.start == 0,
+    )
+    records = 0
+    valid = 0
+    with path.open("rb") as file, mmap.mmap(
+        file.fileno(),
+        0,
+        access=mmap.ACCESS_READ,
+    ) as data, part_path.open("w", newline="") as part:
+        writer = csv.writer(part)
+        lines = _iter_lines(data, chunk.start, chunk.end)
+        for batch in _iter_batches(lines, parser):
+            rows, batch_valid = _output_rows(batch)
+            writer.writerows(rows)
+            records += len(rows)
+            valid += batch_valid
+    return ChunkResult(
+        index=chunk.index,
+        part_path=part_path,
+        records=records,
+        valid=valid,
+    )
+
+
+def run(
+    input_path: Path,
+    output_path: Path,
+    input_format: InputFormat,
+    workers: int,
+    chunk_size: int = CHUNK_SIZE,
+) -> Tuple[int, int]:
+    """
+    Validate a whole file with a pool of worker processes.
+
+    Part files are removed whether or not every chunk succeeds.
+
+    :param input_path: file with one ID number per record.
+    :param output_path: CSV file to write results to.
+    :param input_format: CSV or NDJSON.
+    :param workers: number of worker processes.
+    :param chunk_size: approximate bytes per chunk.
+    :return: total and valid record counts.
+    """
+    chunks = split_chunks(input_path, chunk_size)
+    column = detect_column(input_path, input_format)
+    part_paths = [
+        output_path.with_name(f"{output_path.name}.part{chunk.index}")
+        for chunk in chunks
+    ]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    process_chunk,
+                    input_path,
+                    chunk,
+                    input_format,
+                    column,
+                    part_path,
+                )
+                for chunk, part_path in zip(chunks, part_paths)
+            ]
+            results = [future.result() for future in futures]
+
+        with output_path.open("w", newline="") as output:
+            csv.writer(output).writerow(OUTPUT_HEADER)
+        with output_path.open("ab") as output:
+            for result in results:
+                with result.part_path.open("rb") as part:
+                    shutil.copyfileobj(part, output)
+                result.part_path.unlink()
+    finally:
+        # A failed worker leaves the other chunks' part files behind
+        for part_path in part_paths:
+            part_path.unlink(missing_ok=True)
+
+    return (
+        sum(result.records for result in results),
+        sum(result.valid for result in results),
+    )
+
+
+def _iter_valid_rows(output_path: Path) -> Iterator[Dict[str, Any]]:
+    with output_path.open(newline="") as output:
+        for row in csv.DictReader(output):
+            if row["valid"] != "True":
+                continue
+            yield {
+                "id_number": row["id_number"],
+                "date_of_birth": datetime.fromisoformat(row["date_of_birth"]),
+                "gender": row["gender"],
+                "citizen": row["citizen"] == "True",
+            }
+
+
+async def _load_batch(session: "AsyncSession", batch: List[Dict[str, Any]]) -> None:
+    """
+    Upsert a batch of valid rows and count them in the search stats.
+
+    Both happen in the caller's transaction, so the stats rollups stay in
+    step with id_searches.
+
+    :param session: database session.
+    :param batch: rows read from a results file.
+    """
+    from backend.db.dao.id_search_dao import IDSearchDAO
+    from backend.db.dao.search_stats_dao import SearchStatsDAO
+    from backend.services.search_stats import count_searches
+
+    await IDSearchDAO(session).bulk_upsert(batch)
+    await SearchStatsDAO(session).add(*count_searches(batch))
+
+
+async def load_valid_rows(output_path: Path) -> int:
+    """
+    Bulk upsert the valid rows of a results file into id_searches.
+
+    The rows are also added to the search stats rollups.
+
+    :param output_path: CSV written by run().
+    :return: number of rows loaded.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from backend.settings import settings
+
+    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    loaded = 0
+    try:
+        batch: List[Dict[str, Any]] = []
+        for row in _iter_valid_rows(output_path):
+            batch.append(row)
+            if len(batch) >= DB_BATCH_SIZE:
+                async with session_factory() as session, session.begin():
+                    await _load_batch(session, batch)
+                loaded += len(batch)
+                batch = []
+        if batch:
+            async with session_factory() as session, session.begin():
+                await _load_batch(session, batch)
+            loaded += len(batch)
+    finally:
+        await engine.dispose()
+    return loaded
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    :param argv: arguments, defaults to sys.argv.
+    :return: parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.bulk",
+        description="Validate a large file of South African ID numbers.",
+    )
+    parser.add_argument("input", type=Path, help="CSV or NDJSON file of ID numbers")
+    parser.add_argument("output", type=Path, help="CSV file to write results to")
+    parser.add_argument(
+        "--format",
+        dest="input_format",
+        choices=[input_format.value for input_format in InputFormat],
+        help="input format, guessed from the file extension by default",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help="approximate bytes per chunk handed to a worker",
+    )
+    parser.add_argument(
+        "--load-db",
+        action="store_true",
+        help="bulk upsert valid rows into id_searches and the search stats",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    Entrypoint of the bulk validator.
+
+    :param argv: command line arguments, defaults to sys.argv.
+    """
+    args = parse_args(argv)
+    if args.input_format is not None:
+        input_format = InputFormat(args.input_format)
+    elif args.input.suffix.lower() in {".ndjson", ".jsonl"}:
+        input_format = InputFormat.NDJSON
+    else:
+        input_format = InputFormat.CSV
+
+    started = time.perf_counter()
+    total, valid = run(
+        args.input,
+        args.output,
+        input_format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Validated {} records ({} valid) in {:.2f}s, {:,.0f} records/sec "
+        "with {} workers",
+        total,
+        valid,
+        elapsed,
+        total / elapsed if elapsed else 0,
+        args.workers,
+    )
+
+    if args.load_db:
+        started = time.perf_counter()
+        loaded = asyncio.run(load_valid_rows(args.output))
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Loaded {} rows into id_searches in {:.2f}s, {:,.0f} rows/sec",
+            loaded,
+            elapsed,
+            loaded / elapsed if elapsed else 0,
+        )
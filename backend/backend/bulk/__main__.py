@@ -0,0 +1,4 @@
+from backend.bulk import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""DAO classes."""
@@ -0,0 +1,58 @@
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.api_usage import ApiUsage
+
+
+class ApiUsageDAO:
+    """Class for accessing api_usage table."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get(self, key_hash: str, period: date) -> int:
+        """
+        Calls made with a key in a quota month.
+
+        :param key_hash: hashed API key.
+        :param period: first day of the month.
+        :return: number of calls, 0 if none were recorded.
+        """
+        calls = await self.session.scalar(
+            select(ApiUsage.calls).where(
+                ApiUsage.key_hash == key_hash,
+                ApiUsage.period == period,
+            ),
+        )
+        return calls or 0
+
+    async def reserve(self, key_hash: str, period: date, limit: int) -> Optional[int]:
+        """
+        Count one call against a key, unless that would exceed the limit.
+
+        The check and the increment are one statement, so concurrent
+        instances can never overshoot the limit together.
+
+        :param key_hash: hashed API key.
+        :param period: first day of the month.
+        :param limit: most calls allowed in the month.
+        :return: calls made including this one, or None if the limit is reached.
+        """
+        if limit <= 0:
+            return None
+        stmt = insert(ApiUsage).values(
+            key_hash=key_hash,
+            period=period,
+            calls=1,
+            updated_at=func.now(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ApiUsage.key_hash, ApiUsage.period],
+            set_={"calls": ApiUsage.calls + 1, "updated_at": func.now()},
+            where=ApiUsage.calls < limit,
+        )
+        return await self.session.scalar(stmt.returning(ApiUsage.calls))
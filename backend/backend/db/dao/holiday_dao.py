@@ -0,0 +1,55 @@
+from datetime import date
+from typing import Any, Iterable, Mapping
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.holiday import Holiday
+
+# asyncpg caps a statement at 32767 bind parameters, five are used per row.
+INSERT_CHUNK_SIZE = 5000
+
+
+class HolidayDAO:
+    """Class for accessing holidays table."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def replace_year(
+        self,
+        country: str,
+        year: int,
+        holidays: Iterable[Mapping[str, Any]],
+    ) -> None:
+        """
+        Replace the stored holidays of a year.
+
+        Holidays removed or renamed upstream are dropped, and holidays listed
+        more than once on a date, e.g. once per region, are stored once.
+
+        :param country: country code.
+        :param year: calendar year.
+        :param holidays: every holiday of the year, as mappings with date,
+            name, description and type.
+        """
+        await self.session.execute(
+            delete(Holiday).where(
+                Holiday.country == country,
+                Holiday.date.between(date(year, 1, 1), date(year, 12, 31)),
+            ),
+        )
+        values = [
+            {
+                "country": country,
+                "date": holiday["date"],
+                "name": holiday["name"],
+                "description": holiday["description"],
+                "type": holiday["type"],
+            }
+            for holiday in holidays
+        ]
+        for start in range(0, len(values), INSERT_CHUNK_SIZE):
+            stmt = insert(Holiday).values(values[start : start + INSERT_CHUNK_SIZE])
+            await self.session.execute(stmt.on_conflict_do_nothing())
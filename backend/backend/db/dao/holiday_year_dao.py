@@ -0,0 +1,107 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+
+import ujson
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.holiday_year import HolidayYear
+
+
+def payload_etag(payload: List[Any]) -> str:
+    """
+    Content hash of a holiday payload.
+
+    :param payload: holidays as returned by Calendarific.
+    :return: hex digest, stable for equal payloads.
+    """
+    encoded = ujson.dumps(payload, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _lock_key(country: str, year: int) -> Any:
+    return func.hashtext(f"holidays:{country}:{year}")
+
+
+class HolidayYearDAO:
+    """Class for accessing holiday_years table."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get(self, country: str, year: int) -> Optional[HolidayYear]:
+        """
+        Get the stored holidays for a year.
+
+        :param country: country code.
+        :param year: calendar year.
+        :return: stored row or None.
+        """
+        return await self.session.get(HolidayYear, (country, year))
+
+    async def try_lock(self, country: str, year: int) -> bool:
+        """
+        Claim the refresh of one year across every app instance.
+
+        Takes a session level advisory lock without waiting. It is held by
+        the connection, not a transaction, so the session should run in
+        autocommit mode and must call unlock when done.
+
+        :param country: country code.
+        :param year: calendar year.
+        :return: whether the lock was taken.
+        """
+        return bool(
+            await self.session.scalar(
+                select(func.pg_try_advisory_lock(_lock_key(country, year))),
+            ),
+        )
+
+    async def unlock(self, country: str, year: int) -> None:
+        """
+        Release a lock taken with try_lock.
+
+        :param country: country code.
+        :param year: calendar year.
+        """
+        await self.session.execute(
+            select(func.pg_advisory_unlock(_lock_key(country, year))),
+        )
+
+    async def upsert(self, country: str, year: int, payload: List[Any]) -> None:
+        """
+        Store freshly fetched holidays for a year.
+
+        :param country: country code.
+        :param year: calendar year.
+        :param payload: holidays as returned by Calendarific.
+        """
+        stmt = insert(HolidayYear).values(
+            country=country,
+            year=year,
+            payload=payload,
+            etag=payload_etag(payload),
+            fetched_at=func.now(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[HolidayYear.country, HolidayYear.year],
+            set_={
+                "payload": stmt.excluded.payload,
+                "etag": stmt.excluded.etag,
+                "fetched_at": stmt.excluded.fetched_at,
+            },
+        )
+        await self.session.execute(stmt)
+
+
+def is_fresh(row: HolidayYear, refresh_period: timedelta) -> bool:
+    """
+    Whether a stored year is recent enough to serve without refetching.
+
+    :param row: stored row.
+    :param refresh_period: how long a fetch stays valid.
+    :return: True if the row is younger than refresh_period.
+    """
+    return datetime.now(timezone.utc) - row.fetched_at < refresh_period
@@ -0,0 +1,158 @@
+import enum
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Depends
+from sqlalchemy import Date, and_, cast, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import func
+
+from backend.db.dependencies import get_db_session
+from backend.models.holiday import Holiday
+from backend.models.id_search import IDSearch, last_searched_at
+
+# asyncpg caps a statement at 32767 bind parameters, five are used per row.
+UPSERT_CHUNK_SIZE = 5000
+
+
+class SearchOrder(str, enum.Enum):
+    """Orders of the search history, both descending."""
+
+    LAST_SEARCHED = "updated_at"
+    SEARCH_COUNT = "search_count"
+
+
+class IDSearchDAO:
+    """Class for accessing id_searches table."""
+
+    def __init__(self, session: AsyncSession = Depends(get_db_session)) -> None:
+        self.session = session
+
+    async def bulk_upsert(self, searches: Sequence[Dict[str, Any]]) -> None:
+        """
+        Record a batch of searches in as few statements as possible.
+
+        New ID numbers are inserted, known ones get their search_count
+        incremented by the number of times they appear in the batch. A
+        search with a search_count key counts that many times.
+        Rows are written in id_number order.
+
+        :param searches: dicts with id_number, date_of_birth, gender and citizen.
+        """
+        counts: Counter[str] = Counter()
+        for search in searches:
+            counts[search["id_number"]] += search.get("search_count", 1)
+        rows: Dict[str, Dict[str, Any]] = {}
+        for search in searches:
+            rows.setdefault(
+                search["id_number"],
+                {
+                    "id_number": search["id_number"],
+                    "date_of_birth": search["date_of_birth"],
+                    "gender": search["gender"],
+                    "citizen": search["citizen"],
+                    "search_count": counts[search["id_number"]],
+                    "created_at": func.now(),
+                },
+            )
+
+        # Rows are locked in id_number order, so concurrent batches with
+        # overlapping IDs wait for each other instead of deadlocking
+        values = [rows[id_number] for id_number in sorted(rows)]
+        for start in range(0, len(values), UPSERT_CHUNK_SIZE):
+            stmt = insert(IDSearch).values(values[start : start + UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[IDSearch.id_number],
+                set_={
+                    "search_count": IDSearch.search_count
+                    + stmt.excluded.search_count,
+                    "updated_at": func.now(),
+                },
+            )
+            await self.session.execute(stmt)
+
+    async def record_search(
+        self,
+        search: Dict[str, Any],
+        country: str = "ZA",
+    ) -> Tuple[IDSearch, List[Holiday]]:
+        """
+        Record one search of an ID number in a single round trip.
+
+        Inserts the ID with a search_count of 1, or increments the count if
+        it is known, and reads back the row and the holidays on its date of
+        birth. Concurrent first searches of the same ID cannot race on the
+        unique constraint.
+
+        :param search: dict with id_number, date_of_birth, gender and citizen.
+        :param country: country of the holidays.
+        :return: the stored search and the holidays on its date of birth.
+        """
+        stmt = insert(IDSearch).values(
+            id_number=search["id_number"],
+            date_of_birth=search["date_of_birth"],
+            gender=search["gender"],
+            citizen=search["citizen"],
+            search_count=1,
+            created_at=func.now(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IDSearch.id_number],
+            set_={
+                "search_count": IDSearch.search_count + 1,
+                "updated_at": func.now(),
+            },
+        )
+        upserted = stmt.returning(*IDSearch.__table__.c).cte("upserted")
+        stored = aliased(IDSearch, upserted)
+        query = (
+            select(stored, Holiday)
+            .outerjoin(
+                Holiday,
+                and_(
+                    Holiday.country == country,
+                    Holiday.date == cast(upserted.c.date_of_birth, Date),
+                ),
+            )
+            .execution_options(populate_existing=True)
+        )
+        rows = (await self.session.execute(query)).all()
+        return rows[0][0], [holiday for _, holiday in rows if holiday is not None]
+
+    async def list_searches(
+        self,
+        order: SearchOrder,
+        limit: int,
+        after: Optional[Tuple[Any, int]] = None,
+    ) -> List[Tuple[IDSearch, Any]]:
+        """
+        Page through the search history with keyset pagination.
+
+        Each page continues after the sort key and id of the previous page's
+        last row, so any page is an index range scan of the matching
+        composite index, however deep it is.
+
+        :param order: most recently or most often searched first.
+        :param limit: maximum number of rows.
+        :param after: (sort key, id) of the last row of the previous page.
+        :return: searches with their sort key, in order.
+        """
+        key = (
+            last_searched_at
+            if order == SearchOrder.LAST_SEARCHED
+            else IDSearch.search_count
+        )
+        query = (
+            select(IDSearch, key)
+            .order_by(key.desc(), IDSearch.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            last_key, last_id = after
+            query = query.where(
+                tuple_(key, IDSearch.id) < tuple_(literal(last_key), literal(last_id)),
+            )
+        rows = await self.session.execute(query)
+        return list(rows.tuples())
@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models.search_stats import SearchDemographics, SearchHourly
+
+# (birth year, gender, citizen)
+DemographicKey = Tuple[int, str, bool]
+
+
+class SearchStatsDAO:
+    """Class for accessing the search_demographics and search_hourly rollups."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def add(
+        self,
+        demographics: Dict[DemographicKey, int],
+        hourly: Dict[datetime, int],
+    ) -> None:
+        """
+        Add search counts to the rollups, one upsert per table.
+
+        :param demographics: searches per (birth year, gender, citizen).
+        :param hourly: searches per start of the hour.
+        """
+        if demographics:
+            stmt = insert(SearchDemographics).values(
+                [
+                    {
+                        "birth_year": birth_year,
+                        "gender": gender,
+                        "citizen": citizen,
+                        "searches": searches,
+                    }
+                    for (birth_year, gender, citizen), searches in demographics.items()
+                ],
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[
+                    SearchDemographics.birth_year,
+                    SearchDemographics.gender,
+                    SearchDemographics.citizen,
+                ],
+                set_={"searches": SearchDemographics.searches + stmt.excluded.searches},
+            )
+            await self.session.execute(stmt)
+        if hourly:
+            stmt = insert(SearchHourly).values(
+                [
+                    {"hour": hour, "searches": searches}
+                    for hour, searches in hourly.items()
+                ],
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SearchHourly.hour],
+                set_={"searches": SearchHourly.searches + stmt.excluded.searches},
+            )
+            await self.session.execute(stmt)
+
+    async def demographics(self) -> List[SearchDemographics]:
+        """
+        Every demographic rollup row.
+
+        There is at most one row per birth year, gender and citizen status,
+        so this reads a few hundred rows however many searches were made.
+
+        :return: rollup rows ordered by birth year.
+        """
+        rows = await self.session.scalars(
+            select(SearchDemographics).order_by(SearchDemographics.birth_year),
+        )
+        return list(rows)
+
+    async def hourly(self, since: datetime) -> List[SearchHourly]:
+        """
+        Searches per hour from an hour on.
+
+        :param since: start of the first hour.
+        :return: rollup rows ordered by hour, hours without searches are missing.
+        """
+        rows = await self.session.scalars(
+            select(SearchHourly)
+            .where(SearchHourly.hour >= since)
+            .order_by(SearchHourly.hour),
+        )
+        return list(rows)
@@ -8,6 +8,11 @@ async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]
     """
     Create and get database session.
 
+    A pooled connection is only checked out on the first statement, so
+    requests rejected before touching the database never use the pool.
+    The transaction is committed only if something was written and rolled
+    back if the request failed.
+
     :param request: current request.
     :yield: database session.
     """
@@ -15,6 +20,11 @@ async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]
 
     try:
         yield session
+    except BaseException:
+        await session.rollback()
+        raise
+    else:
+        if session.in_transaction() and getattr(session.sync_session, "wrote", True):
+            await session.commit()
     finally:
-        await session.commit()
         await session.close()
@@ -0,0 +1,64 @@
+from typing import Any, Callable, List, cast
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.dml import UpdateBase
+
+
+def _writes(statement: Any) -> bool:
+    """Whether a statement may change data."""
+    if not getattr(statement, "is_select", False):
+        # INSERT, UPDATE, DELETE and textual SQL
+        return True
+    # SELECT from a data modifying CTE, e.g. INSERT ... RETURNING
+    return any(
+        isinstance(element, UpdateBase) for element in visitors.iterate(statement)
+    )
+
+
+class WriteTrackingSession(Session):
+    """
+    Session that remembers whether it wrote anything since it was opened.
+
+    Lets the request session dependency commit only when there is
+    something to commit.
+    """
+
+    wrote: bool = False
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _track_statement(state: ORMExecuteState) -> None:
+    session = cast(WriteTrackingSession, state.session)
+    if not session.wrote and _writes(state.statement):
+        session.wrote = True
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _track_flush(session: WriteTrackingSession, flush_context: Any) -> None:
+    session.wrote = True
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Runs callback once the session's current transaction is committed.
+
+    Callbacks are dropped if the transaction is rolled back instead.
+    """
+    callbacks: List[Callable[[], None]] = session.sync_session.info.setdefault(
+        "after_commit", [],
+    )
+    callbacks.append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    for callback in session.info.pop("after_commit", ()):
+        callback()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_after_commit(session: Session, previous_transaction: Any) -> None:
+    session.info.pop("after_commit", None)
@@ -0,0 +1,33 @@
+from typing import Any, Optional
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+# South African ID numbers have 13 digits and may start with zeros
+ID_NUMBER_LENGTH = 13
+
+
+class IDNumber(TypeDecorator[str]):
+    """
+    ID number stored as a BIGINT.
+
+    The application keeps using the 13 character string, this type converts
+    to the integer on the way in and back to the zero-padded string on the
+    way out. An 8 byte key keeps the unique index small and makes lookups
+    and upserts compare integers instead of text.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[Any], dialect: Any) -> Optional[int]:
+        """Convert the ID number string to its integer."""
+        if value is None:
+            return None
+        return int(value)
+
+    def process_result_value(self, value: Optional[int], dialect: Any) -> Optional[str]:
+        """Convert the stored integer back to the 13 digit string."""
+        if value is None:
+            return None
+        return str(value).zfill(ID_NUMBER_LENGTH)
@@ -0,0 +1,24 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from backend.db.base import Base
+
+
+class ApiUsage(Base):
+    """Calendarific calls made per API key and quota month."""
+
+    __tablename__ = "api_usage"
+
+    # sha256 of the API key, the key itself is never stored
+    key_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # First day of the quota month
+    period: Mapped[date] = mapped_column(Date, primary_key=True)
+    calls: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
@@ -0,0 +1,20 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy import Date, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.db.base import Base
+
+
+class Holiday(Base):
+    """A public holiday of one country, joined to searches by date of birth."""
+
+    __tablename__ = "holidays"
+
+    # One row per holiday, shared by every search with that date of birth
+    country: Mapped[str] = mapped_column(String(2), primary_key=True)
+    date: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    type: Mapped[Optional[str]] = mapped_column(String)
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any, List
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from backend.db.base import Base
+
+
+class HolidayYear(Base):
+    """Holidays of one country and year as last fetched from Calendarific."""
+
+    __tablename__ = "holiday_years"
+
+    country: Mapped[str] = mapped_column(String(2), primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    payload: Mapped[List[Any]] = mapped_column(JSONB, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    etag: Mapped[str] = mapped_column(String(64), nullable=False)
@@ -1,33 +1,38 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Boolean, DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
+
 from backend.db.base import Base
+from backend.db.types import IDNumber
+
 
 class IDSearch(Base):
+    """A searched ID number and how often it was searched."""
+
     __tablename__ = "id_searches"
 
-    id = Column(Integer, primary_key=True, index=True)
-    id_number = Column(String, unique=True, index=True)
-    date_of_birth = Column(DateTime, nullable=False)
-    gender = Column(String, nullable=False)
-    citizen = Column(Boolean, nullable=False)
-    search_count = Column(Integer, default=1)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-
-    # Relationship with holidays
-    holidays = relationship("Holiday", back_populates="id_search", cascade="all, delete-orphan")
-
-class Holiday(Base):
-    __tablename__ = "holidays"
-
-    id = Column(Integer, primary_key=True, index=True)
-    id_search_id = Column(Integer, ForeignKey("id_searches.id"))
-    name = Column(String, nullable=False)
-    description = Column(String)
-    date = Column(DateTime, nullable=False)
-    type = Column(String)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-
-    # Relationship with id_search
-    id_search = relationship("IDSearch", back_populates="holidays")
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id_number: Mapped[Optional[str]] = mapped_column(IDNumber, unique=True, index=True)
+    date_of_birth: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    gender: Mapped[str] = mapped_column(String, nullable=False)
+    citizen: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    search_count: Mapped[Optional[int]] = mapped_column(Integer, default=1)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+    )
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        onupdate=func.now(),
+    )
+
+
+# When an ID was last searched; updated_at is only set from its second search on
+last_searched_at = func.coalesce(IDSearch.updated_at, IDSearch.created_at)
+
+# Keyset pagination of the search history, newest and most searched first
+Index("ix_id_searches_last_searched", last_searched_at.desc(), IDSearch.id.desc())
+Index("ix_id_searches_search_count", IDSearch.search_count.desc(), IDSearch.id.desc())
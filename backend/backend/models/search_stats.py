@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.db.base import Base
+
+
+class SearchDemographics(Base):
+    """Searches per birth year, gender and citizen status."""
+
+    __tablename__ = "search_demographics"
+
+    birth_year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    gender: Mapped[str] = mapped_column(String, primary_key=True)
+    citizen: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    # Every search counts, repeat searches of an ID included
+    searches: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class SearchHourly(Base):
+    """Searches per hour."""
+
+    __tablename__ = "search_hourly"
+
+    # Start of the hour, in UTC
+    hour: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    searches: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
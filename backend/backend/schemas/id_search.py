@@ -1,20 +1,20 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
+
 from pydantic import BaseModel, Field
 
+
 class HolidayBase(BaseModel):
     name: str
     description: Optional[str] = None
-    date: datetime
+    date: date
     type: Optional[str] = None
 
 class HolidayCreate(HolidayBase):
-    pass
+    country: str = "ZA"
 
 class Holiday(HolidayBase):
-    id: int
-    id_search_id: int
-    created_at: datetime
+    country: str
 
     class Config:
         from_attributes = True
@@ -33,6 +33,7 @@ class IDSearch(IDSearchBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    # Holidays on the date of birth
     holidays: List[Holiday] = []
 
     class Config:
@@ -45,3 +46,40 @@ class IDSearchResponse(BaseModel):
     citizen: bool
     search_count: int
     holidays: List[Holiday]
+
+BATCH_MAX_SIZE = 10_000
+
+class BatchValidateRequest(BaseModel):
+    """ID numbers to validate in one batch."""
+
+    id_numbers: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=BATCH_MAX_SIZE,
+        description="South African ID numbers to validate in one request",
+    )
+
+SEARCH_PAGE_MAX_SIZE = 500
+
+class SearchHistoryItem(BaseModel):
+    """A searched ID number and how often it was searched."""
+
+    id_number: str
+    date_of_birth: datetime
+    gender: str
+    citizen: bool
+    search_count: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class SearchHistoryPage(BaseModel):
+    """One page of the search history."""
+
+    items: List[SearchHistoryItem]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Pass as cursor to get the next page, null on the last page",
+    )
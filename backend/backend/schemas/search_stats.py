@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
+
+
+class DemographicCount(BaseModel):
+    """Searches of one birth year, gender and citizen status."""
+
+    birth_year: int
+    gender: str
+    citizen: bool
+    searches: int
+
+    class Config:
+        from_attributes = True
+
+class DecadeCount(BaseModel):
+    """Searches of one birth decade."""
+
+    decade: int = Field(..., description="First year of the birth decade, e.g. 1980")
+    searches: int
+
+class HourlyCount(BaseModel):
+    """Searches made in one hour."""
+
+    hour: datetime = Field(..., description="Start of the hour, in UTC")
+    searches: int
+
+    class Config:
+        from_attributes = True
+
+class SearchStats(BaseModel):
+    """Search statistics read from the rollup tables."""
+
+    total_searches: int
+    by_decade: List[DecadeCount]
+    by_gender: Dict[str, int]
+    by_citizen: Dict[str, int]
+    by_birth_year: List[DemographicCount]
+    hourly: List[HourlyCount]
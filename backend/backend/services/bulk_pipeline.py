@@ -0,0 +1,297 @@
+"""
+Generator pipeline for validating large files of ID numbers.
+
+Stages are chained lazily: raw chunks -> lines -> ID numbers -> batches ->
+validated and decoded records -> (optional) holiday enrichment -> NDJSON.
+Each stage only pulls from the previous one when the consumer asks for more,
+so memory stays bounded by one batch and a slow consumer throttles reading
+of the input.
+"""
+
+import csv
+import enum
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
+
+import numpy as np
+import ujson
+
+from backend.services import id_kernel
+
+if TYPE_CHECKING:
+    from backend.services.calendarific.holiday_record import HolidayRecord
+    from backend.services.calendarific.holiday_service import HolidayService
+
+BATCH_SIZE = 1000
+# A CSV header names this column, a first row without it is data
+ID_COLUMN = "id_number"
+# Lines longer than this cannot hold an ID number and are not buffered whole
+MAX_LINE_LENGTH = 4096
+
+
+class InputFormat(str, enum.Enum):
+    """Supported bulk input formats."""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+    @classmethod
+    def from_content_type(cls, content_type: str) -> "InputFormat":
+        """
+        Pick the input format from a Content-Type header.
+
+        :param content_type: header value, parameters are ignored.
+        :return: NDJSON for JSON-lines types, CSV otherwise.
+        """
+        media_type = content_type.split(";")[0].strip().lower()
+        if media_type in {
+            "application/x-ndjson",
+            "application/ndjson",
+            "application/jsonl",
+            "application/json-lines",
+        }:
+            return cls.NDJSON
+        return cls.CSV
+
+
+class RecordParser:
+    """
+    Extracts ID numbers from CSV or NDJSON lines.
+
+    CSV input may start with a header row, recognised by its "id_number"
+    column, which is then used; otherwise the first column is, and a
+    malformed first row is parsed like any other. NDJSON lines may be bare
+    strings or objects with an "id_number" key. Parsers for later slices of
+    a file pass the column found in the header and disable header detection.
+    """
+
+    def __init__(
+        self,
+        input_format: InputFormat,
+        column: int = 0,
+        detect_header: bool = True,
+    ) -> None:
+        self.input_format = input_format
+        self.column = column
+        self._first_line = detect_header
+
+    def parse(self, line: bytes) -> Optional[str]:
+        """
+        Parse one line.
+
+        :param line: raw line without the line terminator.
+        :return: the ID number, "" for unparseable records, None for lines to skip.
+        """
+        text = line.decode("utf-8", errors="replace").strip()
+        first_line, self._first_line = self._first_line, False
+        if not text:
+            return None
+        if self.input_format is InputFormat.NDJSON:
+            return self._parse_json(text)
+
+        fields = text.split(",") if '"' not in text else next(csv.reader([text]))
+        if first_line:
+            normalized = [field.strip().lower() for field in fields]
+            if ID_COLUMN in normalized:
+                self.column = normalized.index(ID_COLUMN)
+                return None
+        if self.column >= len(fields):
+            return ""
+        return fields[self.column].strip()
+
+    @staticmethod
+    def _parse_json(text: str) -> str:
+        try:
+            record = ujson.loads(text)
+        except ValueError:
+            return ""
+        if isinstance(record, dict):
+            record = record.get(ID_COLUMN, "")
+        if isinstance(record, int) and not isinstance(record, bool):
+            record = str(record).zfill(id_kernel.ID_LENGTH)
+        return record if isinstance(record, str) else ""
+
+
+async def split_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """
+    Re-split arbitrary byte chunks into lines.
+
+    :param chunks: input chunks.
+    :yield: lines without terminators, truncated to MAX_LINE_LENGTH.
+    """
+    splitter = _LineSplitter()
+    async for chunk in chunks:
+        for line in splitter.feed(chunk):
+            yield line
+    for line in splitter.finish():
+        yield line
+
+
+class _LineSplitter:
+    """
+    Incremental line splitter with a bounded carry-over buffer.
+
+    Every line is truncated to MAX_LINE_LENGTH, whether it arrived whole in
+    one chunk or spread over several.
+    """
+
+    def __init__(self) -> None:
+        self._pending = b""
+        self._overflow = False
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        lines = (self._pending + chunk).split(b"\n")
+        self._pending = lines.pop()
+        if self._overflow:
+            if not lines:
+                # Still inside a line whose head was already emitted
+                self._pending = b""
+                return []
+            lines.pop(0)
+            self._overflow = False
+        if len(self._pending) > MAX_LINE_LENGTH:
+            lines.append(self._pending[:MAX_LINE_LENGTH])
+            self._pending = b""
+            self._overflow = True
+        return [line.rstrip(b"\r")[:MAX_LINE_LENGTH] for line in lines]
+
+    def finish(self) -> List[bytes]:
+        if self._pending and not self._overflow:
+            return [self._pending.rstrip(b"\r")]
+        return []
+
+
+def decode_records(id_numbers: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Validate and decode a batch of ID numbers into output records.
+
+    :param id_numbers: ID numbers.
+    :return: one JSON-ready dict per input.
+    """
+    decoded = id_kernel.decode_batch(id_numbers)
+    dates = np.datetime_as_string(decoded["date_of_birth"], unit="D").tolist()
+    valid = decoded["date_valid"].tolist()
+    male = decoded["male"].tolist()
+    citizen = decoded["citizen"].tolist()
+
+    records: List[Dict[str, Any]] = []
+    for i, id_number in enumerate(id_numbers):
+        if not valid[i]:
+            records.append({"id_number": id_number, "valid": False})
+            continue
+        records.append(
+            {
+                "id_number": id_number,
+                "valid": True,
+                "date_of_birth": dates[i],
+                "gender": "male" if male[i] else "female",
+                "citizen": citizen[i],
+            },
+        )
+    return records
+
+
+async def iter_batches(
+    lines: AsyncIterable[bytes],
+    input_format: InputFormat,
+    batch_size: int = BATCH_SIZE,
+) -> AsyncIterator[List[str]]:
+    """
+    Group parsed ID numbers into batches.
+
+    :param lines: input lines.
+    :param input_format: CSV or NDJSON.
+    :param batch_size: IDs per batch.
+    :yield: lists of ID numbers.
+    """
+    parser = RecordParser(input_format)
+    batch: List[str] = []
+    async for line in lines:
+        id_number = parser.parse(line)
+        if id_number is None:
+            continue
+        batch.append(id_number)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def enrich_records(
+    records: List[Dict[str, Any]],
+    holidays: "HolidayService",
+) -> List[Dict[str, Any]]:
+    """
+    Add the public holidays falling on each valid record's date of birth.
+
+    :param records: decoded records, updated in place.
+    :param holidays: holiday lookup service.
+    :return: the same records.
+    """
+    by_date: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        if not record["valid"]:
+            continue
+        date_of_birth = record["date_of_birth"]
+        if date_of_birth not in by_date:
+            found = await holidays.get_holidays_for_date(
+                datetime.fromisoformat(date_of_birth),
+            )
+            by_date[date_of_birth] = [_holiday_summary(holiday) for holiday in found]
+        record["holidays"] = by_date[date_of_birth]
+    return records
+
+
+def _holiday_summary(holiday: "HolidayRecord") -> Dict[str, Any]:
+    return {"name": holiday.name, "date": holiday.iso}
+
+
+async def validate_stream(
+    chunks: AsyncIterable[bytes],
+    input_format: InputFormat,
+    holidays: Optional["HolidayService"] = None,
+    batch_size: int = BATCH_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Run the whole pipeline over a stream of raw input chunks.
+
+    :param chunks: raw request body chunks.
+    :param input_format: CSV or NDJSON.
+    :param holidays: optional holiday lookup used for enrichment, its
+        Calendarific calls are made at background priority.
+    :param batch_size: IDs validated per kernel call.
+    :yield: NDJSON encoded results, one chunk per batch.
+    """
+    from backend.services.calendarific.quota import Priority, call_priority
+
+    lines = split_lines(chunks)
+    async for batch in iter_batches(lines, input_format, batch_size):
+        records = decode_records(batch)
+        if holidays is not None:
+            # Reset before yielding, the consumer's context is not ours to keep
+            token = call_priority.set(Priority.BACKGROUND)
+            try:
+                records = await enrich_records(records, holidays)
+            finally:
+                call_priority.reset(token)
+        yield encode_ndjson(records)
+
+
+def encode_ndjson(records: Sequence[Dict[str, Any]]) -> bytes:
+    """
+    Encode records as newline delimited JSON.
+
+    :param records: JSON-ready dicts.
+    :return: encoded bytes.
+    """
+    return "".join(ujson.dumps(record) + "\n" for record in records).encode()
@@ -0,0 +1,130 @@
+import abc
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+
+class CacheBackend(abc.ABC):
+    """
+    Shared storage tier behind the in-process cache.
+
+    Implementations store values with an absolute expiry timestamp and must
+    be safe to use from several worker processes at once.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Get a value and its expiry, or None if missing or expired."""
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Any, expiry: float) -> None:
+        """Store a value until the given timestamp."""
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete a value."""
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """Delete every value."""
+
+    @abc.abstractmethod
+    def sweep_expired(self) -> int:
+        """Remove expired values. Returns the number removed."""
+
+    def close(self) -> None:  # noqa: B027
+        """Release resources held by this process."""
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Host-local cache shared by all workers through a SQLite file.
+
+    The database runs in WAL mode so readers in one worker never block on a
+    writer in another. Values are pickled; the file is only ever written by
+    this application. Each process opens its own connection on first use,
+    so the backend can be created before uvicorn forks its workers. Calls
+    come from several threads of a process, so opening the connection and
+    every statement on it are serialised by a lock.
+    """
+
+    def __init__(self, path: Path, timeout: float = 5.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Connection for the current process, created on first use.
+
+        Only call it with the lock held.
+        """
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expiry REAL NOT NULL)",
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_expiry ON cache (expiry)",
+            )
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Get a value and its expiry, or None if missing or expired."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, expiry FROM cache WHERE key = ? AND expiry > ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0]), row[1]  # noqa: S301
+
+    def set(self, key: str, value: Any, expiry: float) -> None:
+        """Store a value until the given timestamp."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO cache (key, value, expiry) VALUES (?, ?, ?)",
+                (key, data, expiry),
+            )
+
+    def delete(self, key: str) -> None:
+        """Delete a value."""
+        with self._lock:
+            self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Delete every value."""
+        with self._lock:
+            self._connect().execute("DELETE FROM cache")
+
+    def sweep_expired(self) -> int:
+        """Remove expired values. Returns the number removed."""
+        with self._lock:
+            cursor = self._connect().execute(
+                "DELETE FROM cache WHERE expiry <= ?",
+                (time.time(),),
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Close this process's connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -1,61 +1,425 @@
-from typing import Any, Optional
+import asyncio
+import contextvars
+import heapq
+import inspect
+import sys
 import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
 from functools import wraps
-from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import anyio
+from loguru import logger
+
+from backend.services.cache_backends import CacheBackend, SQLiteCacheBackend
+from backend.settings import CacheBackendType, settings
+
+
+class _Entry(NamedTuple):
+    value: Any
+    expiry: float
+    size: int
+
+
+@dataclass
+class CacheStats:
+    """Counters for one cache namespace."""
+
+    hits: int = 0
+    # Hits served by the shared backend after an in-process miss
+    shared_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+# Returned by _get_local when the key is not cached in process
+_MISS = object()
+
+
+def _namespace(key: str) -> str:
+    """Namespace of a key, the part before the first colon."""
+    return key.split(":", 1)[0]
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Rough deep size of a cached value in bytes.
+
+    Walks dicts, lists, tuples, sets and __slots__ objects; other objects count
+    their shallow size.
+    """
+    size = sys.getsizeof(value)
+    if _depth > 8:
+        return size
+    if isinstance(value, dict):
+        size += sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    elif hasattr(value, "__slots__"):
+        size += sum(
+            estimate_size(getattr(value, slot), _depth + 1)
+            for slot in value.__slots__
+            if hasattr(value, slot)
+        )
+    return size
+
 
 class CacheService:
-    """Simple in-memory cache service with TTL support."""
-    
-    def __init__(self, default_ttl: int = 3600):  # 1 hour default TTL
-        self._cache = {}
+    """
+    In-memory LRU cache with TTL support and memory limits.
+
+    Entries are evicted least recently used first once either max_entries or
+    max_bytes is exceeded. Expired entries are removed when read and by
+    sweep_expired, which run_sweeper calls periodically. Hits, misses,
+    evictions and expirations are counted per key namespace.
+
+    With a shared backend the in-memory dict is the L1 tier: misses fall
+    through to the backend, which other worker processes also read and
+    write, and values found there are copied into L1 until they expire.
+    """
+
+    def __init__(
+        self,
+        default_ttl: int = 3600,  # 1 hour default TTL
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        shared: Optional[CacheBackend] = None,
+    ) -> None:
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
         self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        # Min-heap of (expiry, key) for active sweeping; stale pairs are skipped
+        self._expiries: List[Tuple[float, str]] = []
+        self._stats: Dict[str, CacheStats] = {}
+        self._shared = shared
+
+    def _stats_for(self, key: str) -> CacheStats:
+        namespace = _namespace(key)
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = CacheStats()
+        return stats
 
     def get(self, key: str) -> Optional[Any]:
         """Get a value from cache if it exists and hasn't expired."""
-        if key in self._cache:
-            value, expiry = self._cache[key]
-            if expiry > time.time():
-                return value
-            else:
-                del self._cache[key]
-        return None
+        stats = self._stats_for(key)
+        value = self._get_local(key, stats)
+        if value is not _MISS:
+            return value
+        found = self._shared.get(key) if self._shared is not None else None
+        return self._found_shared(key, found, stats)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        Like get, but reads the shared backend in a worker thread.
+
+        A slow or locked backend then never blocks the event loop. A failing
+        backend counts as a miss.
+        """
+        stats = self._stats_for(key)
+        value = self._get_local(key, stats)
+        if value is not _MISS:
+            return value
+        found = None
+        if self._shared is not None:
+            try:
+                found = await anyio.to_thread.run_sync(self._shared.get, key)
+            except Exception as e:
+                logger.warning("Shared cache read of {} failed: {}", key, e)
+        return self._found_shared(key, found, stats)
+
+    def _get_local(self, key: str, stats: CacheStats) -> Any:
+        entry = self._cache.get(key)
+        if entry is not None and entry.expiry <= time.time():
+            self._remove(key)
+            stats.expirations += 1
+            entry = None
+        if entry is None:
+            return _MISS
+        self._cache.move_to_end(key)
+        stats.hits += 1
+        return entry.value
+
+    def _found_shared(
+        self,
+        key: str,
+        found: Optional[Tuple[Any, float]],
+        stats: CacheStats,
+    ) -> Optional[Any]:
+        if found is None:
+            stats.misses += 1
+            return None
+        value, expiry = found
+        self._set_local(key, value, expiry)
+        stats.shared_hits += 1
+        return value
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set a value in cache with optional TTL."""
-        expiry = time.time() + (ttl if ttl is not None else self._default_ttl)
-        self._cache[key] = (value, expiry)
+        expiry = self._expiry_for(ttl)
+        self._set_local(key, value, expiry)
+        if self._shared is not None:
+            self._shared.set(key, value, expiry)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """
+        Like set, but writes the shared backend in a worker thread.
+
+        The value stays cached in process if the backend write fails.
+        """
+        expiry = self._expiry_for(ttl)
+        self._set_local(key, value, expiry)
+        if self._shared is not None:
+            try:
+                await anyio.to_thread.run_sync(self._shared.set, key, value, expiry)
+            except Exception as e:
+                logger.warning("Shared cache write of {} failed: {}", key, e)
+
+    def _expiry_for(self, ttl: Optional[int]) -> float:
+        return time.time() + (ttl if ttl is not None else self._default_ttl)
+
+    def _set_local(self, key: str, value: Any, expiry: float) -> None:
+        size = estimate_size(value) if self._max_bytes is not None else 0
+        if key in self._cache:
+            self._remove(key)
+        self._cache[key] = _Entry(value, expiry, size)
+        self._bytes += size
+        heapq.heappush(self._expiries, (expiry, key))
+        self._evict()
 
     def delete(self, key: str) -> None:
         """Delete a value from cache."""
-        self._cache.pop(key, None)
+        if key in self._cache:
+            self._remove(key)
+        if self._shared is not None:
+            self._shared.delete(key)
 
     def clear(self) -> None:
         """Clear all cached values."""
         self._cache.clear()
+        self._expiries.clear()
+        self._bytes = 0
+        if self._shared is not None:
+            self._shared.clear()
+
+    def sweep_expired(self) -> int:
+        """Remove every expired entry. Returns the number removed."""
+        now = time.time()
+        removed = 0
+        while self._expiries and self._expiries[0][0] <= now:
+            expiry, key = heapq.heappop(self._expiries)
+            entry = self._cache.get(key)
+            if entry is not None and entry.expiry == expiry:
+                self._remove(key)
+                self._stats_for(key).expirations += 1
+                removed += 1
+        # Drop stale heap pairs left behind by overwrites and evictions
+        if len(self._expiries) > 2 * len(self._cache) + 64:
+            self._expiries = [(e.expiry, k) for k, e in self._cache.items()]
+            heapq.heapify(self._expiries)
+        return removed
+
+    async def run_sweeper(self, interval: float) -> None:
+        """Sweep expired entries every interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            removed = self.sweep_expired()
+            if self._shared is not None:
+                sweep = self._shared.sweep_expired
+                try:
+                    removed += await anyio.to_thread.run_sync(sweep)
+                except Exception as e:
+                    logger.warning("Shared cache sweep failed: {}", e)
+            if removed:
+                logger.debug("Cache sweep removed {} expired entries", removed)
+
+    def expiry(self, key: str) -> Optional[float]:
+        """Expiry of an in-process entry, without touching stats or LRU order."""
+        entry = self._cache.get(key)
+        return entry.expiry if entry is not None else None
+
+    def close(self) -> None:
+        """Release the shared backend's resources."""
+        if self._shared is not None:
+            self._shared.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current size and per-namespace counters."""
+        return {
+            "entries": len(self._cache),
+            "bytes": self._bytes,
+            "max_entries": self._max_entries,
+            "max_bytes": self._max_bytes,
+            "shared_backend": type(self._shared).__name__ if self._shared else None,
+            "namespaces": {
+                namespace: asdict(stats) for namespace, stats in self._stats.items()
+            },
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._cache.pop(key)
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._cache and (
+            (self._max_entries is not None and len(self._cache) > self._max_entries)
+            or (self._max_bytes is not None and self._bytes > self._max_bytes)
+        ):
+            key, entry = self._cache.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats_for(key).evictions += 1
+
+
+class _Flight(NamedTuple):
+    """A cache miss being computed, with the contexts of its callers."""
+
+    task: "asyncio.Task[Any]"
+    waiters: List[contextvars.Context]
+
+
+# Cache misses currently being computed, shared by concurrent callers
+_in_flight: Dict[str, _Flight] = {}
+
+# Contexts of the callers waiting for the cache miss the current task computes
+_waiters: contextvars.ContextVar[Sequence[contextvars.Context]] = (
+    contextvars.ContextVar(
+        "cache_waiters",
+        default=(),
+    )
+)
+
+
+def waiting_contexts() -> Tuple[contextvars.Context, ...]:
+    """
+    Contexts of every caller waiting for the cached call the current task runs.
+
+    The first caller is included. The call itself runs in a copy of the
+    first caller's context only, so settings carried in context variables
+    that later callers need too, like a call priority, can be read from here.
+    Empty outside a cached call.
+    """
+    return tuple(_waiters.get())
+
+
+def _forget_in_flight(key: str, task: "asyncio.Task[Any]") -> None:
+    """Drop a finished task from the in-flight registry."""
+    flight = _in_flight.get(key)
+    if flight is not None and flight.task is task:
+        del _in_flight[key]
+    if not task.cancelled():
+        # Mark the exception as retrieved in case every caller went away
+        task.exception()
+
+
+def cache_response(
+    ttl: Optional[int] = None,
+    ttl_for: Optional[Callable[[Any], Optional[int]]] = None,
+) -> Callable[[Callable[..., Any]], Any]:
+    """
+    Decorator to cache function responses.
+
+    ttl_for(result) can give a result its own TTL, e.g. a short one for a
+    fallback value; returning None uses ttl.
+
+    Concurrent misses for the same key share a single call to the wrapped
+    function. Its exceptions are raised to every waiting caller but are not
+    cached. Each caller awaits the shared call through asyncio.shield, so a
+    caller that times out or is cancelled does not cancel it for the others.
+    The shared call can read the context of every caller through
+    waiting_contexts().
+
+    The wrapper also exposes key_for(*args, **kwargs), the cache key for a
+    call, and refresh(*args, **kwargs), which recomputes the value while
+    readers keep being served the currently cached one.
+
+    Keys are built from the function name and arguments. The self argument
+    of methods is left out, its repr holds a per-process address, so that
+    every worker process computes the same key for the shared backend.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Any:
+        parameters = list(inspect.signature(func).parameters)
+        skip = 1 if parameters and parameters[0] == "self" else 0
+
+        def key_for(*args: Any, **kwargs: Any) -> str:
+            # Create cache key from function name and arguments
+            return f"{func.__name__}:{args[skip:]!s}:{kwargs!s}"
+
+        async def fill(
+            key: str,
+            args: Any,
+            kwargs: Any,
+            waiters: List[contextvars.Context],
+        ) -> Any:
+            # The list itself, so callers joining later are seen too
+            _waiters.set(waiters)
+            result = await func(*args, **kwargs)
+            result_ttl = ttl_for(result) if ttl_for is not None else None
+            await cache_service.aset(
+                key,
+                result,
+                result_ttl if result_ttl is not None else ttl,
+            )
+            return result
+
+        def in_flight(key: str, args: Any, kwargs: Any) -> "asyncio.Task[Any]":
+            # Join the in-flight call for this key or start one
+            flight = _in_flight.get(key)
+            if (
+                flight is None
+                or flight.task.get_loop() is not asyncio.get_running_loop()
+            ):
+                waiters = [contextvars.copy_context()]
+                task = asyncio.ensure_future(fill(key, args, kwargs, waiters))
+                _in_flight[key] = _Flight(task, waiters)
+                task.add_done_callback(lambda done: _forget_in_flight(key, done))
+                return task
+            flight.waiters.append(contextvars.copy_context())
+            return flight.task
 
-def cache_response(ttl: Optional[int] = None):
-    """Decorator to cache function responses."""
-    def decorator(func):
         @wraps(func)
-        async def wrapper(*args, **kwargs):
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
             # Get cache instance
             cache = cache_service
-
-            # Create cache key from function name and arguments
-            key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
+            key = key_for(*args, **kwargs)
 
             # Try to get from cache
-            cached_value = cache.get(key)
+            cached_value = await cache.aget(key)
             if cached_value is not None:
                 return cached_value
 
-            # If not in cache, call function and cache result
-            result = await func(*args, **kwargs)
-            cache.set(key, result, ttl)
-            return result
+            # If not in cache, call function once for all concurrent callers
+            return await asyncio.shield(in_flight(key, args, kwargs))
+
+        async def refresh(*args: Any, **kwargs: Any) -> Any:
+            return await asyncio.shield(
+                in_flight(key_for(*args, **kwargs), args, kwargs),
+            )
 
+        wrapper.key_for = key_for  # type: ignore[attr-defined]
+        wrapper.refresh = refresh  # type: ignore[attr-defined]
         return wrapper
+
     return decorator
 
+
+def _shared_backend() -> Optional[CacheBackend]:
+    """Shared cache tier selected in settings."""
+    if settings.cache_backend == CacheBackendType.SQLITE:
+        return SQLiteCacheBackend(settings.cache_sqlite_path)
+    return None
+
+
 # Global cache instance
-cache_service = CacheService()
+cache_service = CacheService(
+    max_entries=settings.cache_max_entries,
+    max_bytes=settings.cache_max_bytes,
+    shared=_shared_backend(),
+)
@@ -0,0 +1,65 @@
+import time
+from typing import Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a dependency keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected for `reset_timeout` seconds. The first call after
+    that is let through as a trial: success closes the circuit, failure
+    opens it for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """One of "closed", "open" or "half-open"."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError if the call should not be attempted."""
+        state = self.state
+        if state == "closed":
+            return
+        now = time.monotonic()
+        # A trial that never reported back (e.g. was cancelled) expires too
+        trial_running = (
+            self._trial_started_at is not None
+            and now - self._trial_started_at < self.reset_timeout
+        )
+        if state == "open" or trial_running:
+            raise CircuitOpenError("Circuit is open, failing fast")
+        self._trial_started_at = now
+
+    def record_success(self) -> None:
+        """Closes the circuit."""
+        self.failures = 0
+        self._opened_at = None
+        self._trial_started_at = None
+
+    def cancel_trial(self) -> None:
+        """Ends a trial call that was not made, so the next call is the trial."""
+        self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        """Counts a failure and opens the circuit past the threshold."""
+        self.failures += 1
+        self._trial_started_at = None
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
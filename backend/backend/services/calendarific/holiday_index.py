@@ -0,0 +1,89 @@
+import enum
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from .holiday_record import HolidayRecord
+
+
+class HolidayStatus(str, enum.Enum):
+    """How trustworthy a holiday answer is, from best to worst."""
+
+    # Fetched within the refresh period, or computed as the primary source
+    FRESH = "fresh"
+    # Last good data, served because refreshing it failed or was skipped
+    STALE = "stale"
+    # No good data, an empty or locally computed substitute
+    DEGRADED = "degraded"
+
+    @classmethod
+    def worst(cls, statuses: Iterable["HolidayStatus"]) -> "HolidayStatus":
+        """The least trustworthy of the given statuses, FRESH if there are none."""
+        order = list(cls)
+        return max(statuses, key=order.index, default=cls.FRESH)
+
+
+class HolidayIndex:
+    """
+    Holidays of one country and year, indexed by date.
+
+    Built once when the year is fetched, so lookups never parse dates again.
+    Unless it is fresh, `retry_after` is how many seconds it may be cached
+    before fetching the year is tried again.
+    """
+
+    __slots__ = (
+        "holidays",
+        "status",
+        "retry_after",
+        "_by_ordinal",
+        "_by_month",
+        "_ordinals",
+        "_sorted",
+    )
+
+    def __init__(
+        self,
+        holidays: List[HolidayRecord],
+        status: HolidayStatus = HolidayStatus.FRESH,
+        retry_after: Optional[int] = None,
+    ) -> None:
+        self.holidays = holidays
+        self.status = status
+        self.retry_after = retry_after
+        self._by_ordinal: Dict[int, List[HolidayRecord]] = {}
+        self._by_month: Dict[int, List[HolidayRecord]] = {}
+
+        for holiday in holidays:
+            self._by_ordinal.setdefault(holiday.ordinal, []).append(holiday)
+            self._by_month.setdefault(holiday.date.month, []).append(holiday)
+
+        self._sorted = sorted(holidays, key=lambda holiday: holiday.ordinal)
+        self._ordinals = [holiday.ordinal for holiday in self._sorted]
+
+    def on_date(self, day: date) -> List[HolidayRecord]:
+        """Holidays falling on the given date."""
+        return self._by_ordinal.get(day.toordinal(), [])
+
+    def in_month(self, month: int) -> List[HolidayRecord]:
+        """Holidays falling in the given month."""
+        return self._by_month.get(month, [])
+
+    def in_range(self, start: date, end: date) -> List[HolidayRecord]:
+        """Holidays from start to end inclusive, in date order."""
+        low = bisect_left(self._ordinals, start.toordinal())
+        high = bisect_right(self._ordinals, end.toordinal())
+        return self._sorted[low:high]
+
+    def with_status(
+        self,
+        status: HolidayStatus,
+        retry_after: Optional[int],
+    ) -> "HolidayIndex":
+        """Copy of this index with another status, sharing the lookups."""
+        index = object.__new__(HolidayIndex)
+        for slot in self.__slots__:
+            setattr(index, slot, getattr(self, slot))
+        index.status = status
+        index.retry_after = retry_after
+        return index
@@ -0,0 +1,80 @@
+import sys
+from datetime import date, datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Holiday names and types repeat every year, share one copy of each
+    return sys.intern(value) if value is not None else None
+
+
+class HolidayRecord(NamedTuple):
+    """
+    One holiday, parsed once from the Calendarific payload.
+
+    Only the fields the API serves are kept, and the date is stored as a
+    proleptic Gregorian ordinal so indexing never parses it again.
+    """
+
+    name: str
+    description: Optional[str]
+    ordinal: int
+    type: Optional[str]
+
+    @property
+    def date(self) -> date:
+        """Date of the holiday."""
+        return date.fromordinal(self.ordinal)
+
+    @property
+    def iso(self) -> str:
+        """Date of the holiday as YYYY-MM-DD."""
+        return self.date.isoformat()
+
+    @classmethod
+    def from_calendarific(cls, holiday: Dict[str, Any]) -> "HolidayRecord":
+        """
+        Parses one holiday of a Calendarific API response.
+
+        Raises KeyError, ValueError or TypeError if the holiday is malformed.
+        """
+        date_obj = holiday["date"]
+        # The API returns a 'datetime' object within the date object
+        datetime_obj = date_obj.get("datetime", {})
+        day = date(
+            int(datetime_obj.get("year", date_obj.get("year"))),
+            int(datetime_obj.get("month", date_obj.get("month"))),
+            int(datetime_obj.get("day", date_obj.get("day"))),
+        )
+        types = holiday.get("type") or [None]
+        return cls(
+            name=sys.intern(holiday["name"]),
+            description=holiday.get("description"),
+            ordinal=day.toordinal(),
+            type=_intern(types[0]),
+        )
+
+    @classmethod
+    def from_payload(cls, item: Union[List[Any], Dict[str, Any]]) -> "HolidayRecord":
+        """
+        Reads a holiday stored by to_payload.
+
+        Raw Calendarific holidays, stored before records existed, are read too.
+        """
+        if isinstance(item, dict):
+            return cls.from_calendarific(item)
+        name, description, iso, holiday_type = item
+        return cls(
+            name=sys.intern(name),
+            description=description,
+            ordinal=date.fromisoformat(iso).toordinal(),
+            type=_intern(holiday_type),
+        )
+
+    def to_payload(self) -> List[Any]:
+        """JSON serialisable form for the holiday_years table."""
+        return [self.name, self.description, self.iso, self.type]
+
+    def as_datetime(self) -> datetime:
+        """Midnight at the start of the holiday."""
+        return datetime.combine(self.date, datetime.min.time())
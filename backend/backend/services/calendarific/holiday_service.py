@@ -1,8 +1,44 @@
-from datetime import datetime
+import asyncio
 import os
-from typing import List, Optional
-from .service import CalendarificService
-from ..cache_service import cache_response
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.db.dao.holiday_dao import HolidayDAO
+from backend.db.dao.holiday_year_dao import HolidayYearDAO, is_fresh
+from backend.models.holiday_year import HolidayYear
+from backend.settings import HolidaySource, settings
+
+from ..cache_service import cache_response, cache_service
+from ..concurrency import gather
+from .holiday_index import HolidayIndex, HolidayStatus
+from .holiday_record import HolidayRecord
+from .quota import Priority, call_priority, current_priority
+from .sa_holidays import SAHolidayCalculator
+from .service import CalendarificService, CalendarificUnavailableError
+
+
+def _records(payload: List[Any]) -> List[HolidayRecord]:
+    """Holidays stored in the holiday_years table."""
+    return [HolidayRecord.from_payload(item) for item in payload]
+
+
+def _rows(holidays: Iterable[HolidayRecord]) -> List[Dict[str, Any]]:
+    """Holidays as rows of the holidays table."""
+    return [
+        {
+            "date": holiday.date,
+            "name": holiday.name,
+            "description": holiday.description,
+            "type": holiday.type,
+        }
+        for holiday in holidays
+    ]
+
 
 class HolidayService:
     def __init__(self):
@@ -10,76 +46,407 @@ class HolidayService:
         if not api_key:
             raise ValueError("CALENDARIFIC_API_KEY environment variable is not set")
         self.calendarific = CalendarificService(api_key)
+        self.local = SAHolidayCalculator()
+        self.source = settings.holiday_source
+        self.refresh_period = timedelta(seconds=settings.holiday_refresh_seconds)
+        self.fetch_timeout = settings.holiday_fetch_timeout
+        self.lock_wait = settings.holiday_lock_wait
+        self.lock_poll_interval = settings.holiday_lock_poll_interval
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        # (year, country) pairs loaded into the cache, kept warm by the refresher
+        self._loaded_years: Set[Tuple[int, str]] = set()
+        # Last fresh index of every year, served as stale data when fetching fails
+        self._last_good: Dict[Tuple[int, str], HolidayIndex] = {}
+        # Failed fetches in a row per year, for the fallback TTL backoff
+        self._failures: Dict[Tuple[int, str], int] = {}
+
+    def attach_store(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """
+        Persists fetched holiday years in the holiday_years and holidays tables.
+
+        Until this is called, every cache miss goes to Calendarific.
+        """
+        self._session_factory = session_factory
+        self.calendarific.budget.attach_store(session_factory)
+
+    @property
+    def _sessions(self) -> async_sessionmaker[AsyncSession]:
+        """Session factory of the attached store."""
+        if self._session_factory is None:
+            raise RuntimeError("No holiday store is attached")
+        return self._session_factory
 
-    @cache_response(ttl=3600 * 24)  # Cache for 24 hours
-    async def get_holidays_for_year(self, year: int, country_code: str = "ZA") -> List[dict]:
+    @cache_response(
+        ttl=3600 * 24,
+        ttl_for=lambda index: index.retry_after,
+    )  # Cache for 24 hours
+    async def get_holiday_index(
+        self,
+        year: int,
+        country_code: str = "ZA",
+    ) -> HolidayIndex:
         """
-        Fetches public holidays for a specific year and country.
+        Fetches public holidays for a year and country, indexed by date and month.
+
+        Reads through the holiday_years table, so each year is fetched from
+        Calendarific at most once per refresh period across all instances.
         Results are cached for 24 hours.
+        Depending on the holiday source setting, supported countries are
+        computed locally instead, either always or when Calendarific fails.
+
+        A year that cannot be fetched is answered with the last good data,
+        marked stale, or else with a degraded substitute. Those answers are
+        only cached for a short time that doubles with every failure in a
+        row, so fetching is retried soon without hammering Calendarific.
         """
+        key = (year, country_code)
+        self._loaded_years.add(key)
+        local = self.local.supports(country_code)
         try:
-            return await self.calendarific.get_holidays(year, country_code)
+            if local and self.source == HolidaySource.LOCAL:
+                index = HolidayIndex(await self.local.get_holidays(year, country_code))
+                await self._save_local(year, country_code, index.holidays)
+            elif self._session_factory is None:
+                index = HolidayIndex(
+                    await self.calendarific.get_holidays(year, country_code),
+                )
+            else:
+                index = HolidayIndex(
+                    *await self._read_through_store(year, country_code),
+                )
         except Exception as e:
-            print(f"Error fetching holidays: {e}")
-            return []
+            logger.warning(
+                "Error fetching holidays for {} {}: {}",
+                country_code,
+                year,
+                e,
+            )
+            last_good = self._last_good.get(key)
+            if last_good is not None:
+                return last_good.with_status(HolidayStatus.STALE, self._backoff(key))
+            holidays = []
+            if local and self.source == HolidaySource.FALLBACK:
+                holidays = await self.local.get_holidays(year, country_code)
+                await self._save_local(year, country_code, holidays)
+            return HolidayIndex(holidays, HolidayStatus.DEGRADED, self._backoff(key))
+
+        if index.status == HolidayStatus.FRESH:
+            self._failures.pop(key, None)
+            self._last_good[key] = index
+        else:
+            index.retry_after = self._backoff(key)
+        return index
+
+    def _backoff(self, key: Tuple[int, str]) -> int:
+        """Counts a failed fetch and returns how long to cache its fallback answer."""
+        failures = self._failures.get(key, 0) + 1
+        self._failures[key] = failures
+        ttl = settings.holiday_error_ttl * 2 ** min(failures - 1, 16)
+        return min(ttl, settings.holiday_error_ttl_max)
 
-    @cache_response(ttl=3600 * 24)  # Cache for 24 hours
-    async def get_holidays_for_date(self, date: datetime, country_code: str = "ZA") -> List[dict]:
+    async def get_status(
+        self,
+        years: Iterable[int],
+        country_code: str = "ZA",
+    ) -> HolidayStatus:
+        """Worst status of the holiday years an answer was built from."""
+        indexes = await gather(
+            *(self.get_holiday_index(year, country_code) for year in set(years)),
+        )
+        return HolidayStatus.worst(index.status for index in indexes)
+
+    async def get_holidays_for_year(
+        self,
+        year: int,
+        country_code: str = "ZA",
+    ) -> List[HolidayRecord]:
+        """Fetches public holidays for a specific year and country."""
+        return (await self.get_holiday_index(year, country_code)).holidays
+
+    async def prefetch(
+        self,
+        years: Iterable[int],
+        country_code: str = "ZA",
+        concurrency: int = 4,
+    ) -> None:
         """
-        Gets holidays that match a specific date.
-        Results are cached for 24 hours.
+        Loads holidays for the given years into the cache.
+
+        At most `concurrency` fetches are in flight at once, and Calendarific
+        calls are made at background priority.
         """
-        year_holidays = await self.get_holidays_for_year(date.year, country_code)
-        return [
-            holiday for holiday in year_holidays
-            if datetime.fromisoformat(holiday["date"]["iso"]).date() == date.date()
-        ]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load(year: int) -> None:
+            call_priority.set(Priority.BACKGROUND)
+            async with semaphore:
+                await self.get_holiday_index(year, country_code)
 
-    @cache_response(ttl=3600 * 24)  # Cache for 24 hours
-    async def get_holidays_around_birthday(self, birthday: datetime, country_code: str = "ZA") -> List[dict]:
+        await asyncio.gather(*(load(year) for year in years))
+
+    async def run_refresher(
+        self,
+        interval: float,
+        refresh_ahead: float,
+        concurrency: int = 4,
+    ) -> None:
         """
-        Fetches public holidays for the month before, the month of, and the month after the given birthday.
-        Results are cached for 24 hours.
+        Periodically re-fetches cached holiday years that expire soon.
+
+        Years expiring within `refresh_ahead` seconds are refreshed. Readers
+        keep getting the cached value while the refresh runs, so a hot year
+        never goes cold on expiry. Calendarific calls are made at background
+        priority.
+        """
+        call_priority.set(Priority.BACKGROUND)
+        semaphore = asyncio.Semaphore(concurrency)
+        refresh = HolidayService.get_holiday_index.refresh
+        key_for = HolidayService.get_holiday_index.key_for
+
+        async def refresh_year(year: int, country_code: str) -> None:
+            async with semaphore:
+                await refresh(self, year, country_code)
+
+        while True:
+            await asyncio.sleep(interval)
+            deadline = time.time() + refresh_ahead
+            due = []
+            for year, country_code in list(self._loaded_years):
+                expiry = cache_service.expiry(key_for(self, year, country_code))
+                if expiry is None or expiry < deadline:
+                    due.append(refresh_year(year, country_code))
+            if due:
+                logger.debug("Refreshing {} cached holiday years", len(due))
+                await asyncio.gather(*due, return_exceptions=True)
+
+    async def _read_through_store(
+        self,
+        year: int,
+        country_code: str,
+    ) -> Tuple[List[HolidayRecord], HolidayStatus]:
+        """
+        Serves a year from the store, refreshing it from Calendarific when old.
+
+        A stored year is refreshed once it is older than the refresh period.
+        One instance at a time refreshes a year. It claims the year's
+        advisory lock without waiting, checks the store again and fetches
+        within holiday_fetch_timeout. It then saves the year in a short
+        transaction of its own, so no transaction is open while fetching.
+        Instances that find the year claimed poll the store for the result
+        for up to holiday_lock_wait seconds. A stored year that could not
+        be refreshed is served as stale.
+        """
+        stored = await self._load_stored(year, country_code)
+        if stored is not None and is_fresh(stored, self.refresh_period):
+            return _records(stored.payload), HolidayStatus.FRESH
+        budget = self.calendarific.budget
+        if stored is not None and budget.nearly_exhausted:
+            # Save the last calls of the month for years we have nothing for
+            budget.record_stale_served(current_priority())
+            return _records(stored.payload), HolidayStatus.STALE
+
+        async with self._refresh_lock(year, country_code) as claimed:
+            if claimed:
+                return await self._refresh_stored(year, country_code)
+        return await self._wait_for_refresh(year, country_code, stored)
+
+    async def _refresh_stored(
+        self,
+        year: int,
+        country_code: str,
+    ) -> Tuple[List[HolidayRecord], HolidayStatus]:
+        """Fetches and stores a year, with its refresh lock held."""
+        # Another instance may have refreshed the year since it was read
+        stored = await self._load_stored(year, country_code)
+        if stored is not None and is_fresh(stored, self.refresh_period):
+            return _records(stored.payload), HolidayStatus.FRESH
+        try:
+            holidays = await asyncio.wait_for(
+                self.calendarific.get_holidays(year, country_code),
+                self.fetch_timeout,
+            )
+        except Exception as e:
+            if stored is None:
+                raise
+            logger.warning(
+                "Serving stored holidays for {} {}: {}",
+                country_code,
+                year,
+                e,
+            )
+            return _records(stored.payload), HolidayStatus.STALE
+        await self._save(year, country_code, holidays)
+        return holidays, HolidayStatus.FRESH
+
+    async def _wait_for_refresh(
+        self,
+        year: int,
+        country_code: str,
+        stored: Optional[HolidayYear],
+    ) -> Tuple[List[HolidayRecord], HolidayStatus]:
+        """Waits for the instance refreshing a year to store it."""
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_poll_interval)
+            latest = await self._load_stored(year, country_code)
+            if latest is not None and is_fresh(latest, self.refresh_period):
+                return _records(latest.payload), HolidayStatus.FRESH
+            stored = latest or stored
+        if stored is None:
+            raise CalendarificUnavailableError(
+                f"Holidays for {country_code} {year} are still being fetched "
+                "by another instance",
+            )
+        return _records(stored.payload), HolidayStatus.STALE
+
+    @asynccontextmanager
+    async def _refresh_lock(self, year: int, country_code: str) -> AsyncIterator[bool]:
+        """
+        Claims the refresh of a year across instances, yielding whether it was.
+
+        The lock is held by an autocommit connection, so no transaction stays
+        open while it is held, but that one pooled connection stays checked
+        out until the lock is released. If releasing fails or is cancelled,
+        the connection is invalidated rather than returned to the pool:
+        closing it is the only other way to drop a session level advisory
+        lock, and a pooled connection would keep the year locked for every
+        instance.
+        """
+        async with self._sessions() as session:
+            connection = await session.connection(
+                execution_options={"isolation_level": "AUTOCOMMIT"},
+            )
+            dao = HolidayYearDAO(session)
+            claimed = await dao.try_lock(country_code, year)
+            try:
+                yield claimed
+            finally:
+                if claimed:
+                    try:
+                        await dao.unlock(country_code, year)
+                    except BaseException:
+                        await connection.invalidate()
+                        raise
+
+    async def _load_stored(self, year: int, country_code: str) -> Optional[HolidayYear]:
+        """Reads a stored year."""
+        async with self._sessions() as session:
+            return await HolidayYearDAO(session).get(country_code, year)
+
+    async def _save(
+        self,
+        year: int,
+        country_code: str,
+        holidays: List[HolidayRecord],
+    ) -> None:
+        """Stores a freshly fetched year."""
+        async with self._sessions() as session, session.begin():
+            await HolidayYearDAO(session).upsert(
+                country_code,
+                year,
+                [holiday.to_payload() for holiday in holidays],
+            )
+            # Also kept one row per holiday, joined to searches by date of birth
+            await HolidayDAO(session).replace_year(country_code, year, _rows(holidays))
+
+    async def _save_local(
+        self,
+        year: int,
+        country_code: str,
+        holidays: List[HolidayRecord],
+    ) -> None:
         """
-        holidays = []
-        months_to_check = [birthday.month - 1, birthday.month, birthday.month + 1]
-        years_to_check = list(set([birthday.year if month > 0 else birthday.year - 1 for month in months_to_check] +
-                                [birthday.year if month < 13 else birthday.year + 1 for month in months_to_check]))
+        Stores locally computed holidays in the holidays table.
+
+        Searches are then joined to holidays of years Calendarific has not
+        served. Years already fetched from Calendarific are left alone, and a failed
+        write is only logged.
+        """
+        if self._session_factory is None:
+            return
+        try:
+            async with self._session_factory() as session, session.begin():
+                if await HolidayYearDAO(session).get(country_code, year) is None:
+                    await HolidayDAO(session).replace_year(
+                        country_code,
+                        year,
+                        _rows(holidays),
+                    )
+        except Exception as e:
+            logger.warning(
+                "Error storing local holidays for {} {}: {}",
+                country_code,
+                year,
+                e,
+            )
 
-        # Adjust months that fall outside the 1-12 range
-        adjusted_months = [(month + 12 if month < 1 else month - 12 if month > 12 else month) for month in months_to_check]
+    async def get_holidays_for_date(
+        self,
+        date: datetime,
+        country_code: str = "ZA",
+    ) -> List[HolidayRecord]:
+        """Gets holidays that match a specific date."""
+        index = await self.get_holiday_index(date.year, country_code)
+        return index.on_date(date)
 
-        for year in years_to_check:
-            # Fetch all holidays for the year
-            yearly_holidays = await self.calendarific.get_holidays(year, country_code)
-            
-            # Filter holidays for the relevant months
-            for holiday in yearly_holidays:
-                holiday_date = datetime.fromisoformat(holiday["date"]["iso"])
-                if holiday_date.month in adjusted_months:
-                    holidays.append(holiday)
+    async def get_holidays_in_range(
+        self,
+        start: date,
+        end: date,
+        country_code: str = "ZA",
+    ) -> List[HolidayRecord]:
+        """Gets holidays from start to end inclusive, in date order."""
+        indexes = await gather(
+            *(
+                self.get_holiday_index(year, country_code)
+                for year in range(start.year, end.year + 1)
+            ),
+        )
+        return [holiday for index in indexes for holiday in index.in_range(start, end)]
 
-        return holidays
+    async def get_holidays_around_birthday(
+        self,
+        birthday: datetime,
+        country_code: str = "ZA",
+    ) -> List[HolidayRecord]:
+        """
+        Fetches public holidays from the month before to the month after a birthday.
+
+        For December and January birthdays the window crosses into the
+        neighbouring year.
+        """
+        start, end = self.birthday_window(birthday)
+        return await self.get_holidays_in_range(start, end, country_code)
+
+    @staticmethod
+    def birthday_window(birthday: date) -> Tuple[date, date]:
+        """Dates from the start of the month before to the end of the month after."""
+        month_index = birthday.year * 12 + birthday.month - 1
+        start = date((month_index - 1) // 12, (month_index - 1) % 12 + 1, 1)
+        after_end = date((month_index + 2) // 12, (month_index + 2) % 12 + 1, 1)
+        return start, after_end - timedelta(days=1)
 
-    @cache_response(ttl=3600 * 24)  # Cache for 24 hours
-    async def is_public_holiday(self, date: datetime, country_code: str = "ZA") -> Optional[dict]:
+    async def is_public_holiday(
+        self,
+        date: datetime,
+        country_code: str = "ZA",
+    ) -> Optional[HolidayRecord]:
         """
         Checks if a given date is a public holiday.
         Returns the holiday information if it is, None otherwise.
-        Results are cached for 24 hours.
         """
         holidays = await self.get_holidays_for_date(date, country_code)
         return holidays[0] if holidays else None
 
-    def format_holiday(self, holiday: dict) -> dict:
+    def format_holiday(self, holiday: HolidayRecord) -> dict:
         """
-        Formats a holiday response from the Calendarific API into our schema format.
+        Formats a holiday record into our schema format.
         """
         return {
-            "name": holiday["name"],
-            "description": holiday.get("description", None),
-            "date": datetime.fromisoformat(holiday["date"]["iso"]),
-            "type": holiday.get("type", [None])[0]
+            "name": holiday.name,
+            "description": holiday.description,
+            "date": holiday.as_datetime(),
+            "type": holiday.type,
         }
 
     async def close(self):
@@ -88,3 +455,7 @@ class HolidayService:
         Should be called when the service is no longer needed.
         """
         await self.calendarific.close()
+
+
+# Global holiday service instance
+holiday_service = HolidayService()
@@ -0,0 +1,238 @@
+import asyncio
+import enum
+import hashlib
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.db.dao.api_usage_dao import ApiUsageDAO
+from backend.services.cache_service import waiting_contexts
+
+
+class Priority(str, enum.Enum):
+    """Who a Calendarific call is made for."""
+
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+# Priority of Calendarific calls made by the current task
+call_priority: ContextVar[Priority] = ContextVar(
+    "call_priority", default=Priority.INTERACTIVE,
+)
+
+
+def current_priority() -> Priority:
+    """
+    Priority of a Calendarific call made now.
+
+    A call made for a cached lookup serves every caller waiting for that
+    lookup, so it is interactive if any of them is, even when a background
+    prefetch started it.
+    """
+    priorities = {call_priority.get()}
+    priorities.update(
+        context.get(call_priority, Priority.INTERACTIVE)
+        for context in waiting_contexts()
+    )
+    if Priority.INTERACTIVE in priorities:
+        return Priority.INTERACTIVE
+    return Priority.BACKGROUND
+
+
+def current_period() -> date:
+    """First day of the current quota month, in UTC."""
+    return datetime.now(timezone.utc).date().replace(day=1)
+
+
+class TokenBucket:
+    """Rate limiter that refills `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self._updated) * self.rate,
+        )
+        self._updated = now
+
+    async def acquire(self, reserve: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Takes a token, waiting for one if the bucket is empty.
+
+        At least `reserve` tokens are left in the bucket for other callers.
+        Returns False if no token became available within `timeout` seconds.
+        """
+        reserve = min(reserve, self.capacity - 1)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._refill()
+            if self.tokens >= reserve + 1:
+                self.tokens -= 1
+                return True
+            wait = (reserve + 1 - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+@dataclass
+class BudgetStats:
+    """Counters for one call priority."""
+
+    calls_made: int = 0
+    # Calls not made because the rate limit or the monthly quota was hit
+    throttled: int = 0
+    over_budget: int = 0
+    # Stale stored data served instead of refreshing near the end of the quota
+    stale_served: int = 0
+
+
+class QuotaBudget:
+    """
+    Keeps Calendarific calls within the plan's monthly quota.
+
+    Calls are rate limited by a token bucket and counted per API key and
+    month. With a store attached the count lives in the api_usage table and
+    is shared by every instance, otherwise it is kept in memory.
+
+    Interactive calls may use the whole quota and get `interactive_tokens`
+    of the bucket to themselves. Background calls stop once only
+    `background_reserve` calls are left, at which point the budget reports
+    itself nearly exhausted and callers should serve stale data instead.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        monthly_quota: int,
+        background_reserve: int,
+        rate: float,
+        burst: int,
+        interactive_tokens: int = 1,
+        interactive_wait: float = 2.0,
+    ) -> None:
+        self.key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+        self.monthly_quota = monthly_quota
+        self.background_reserve = background_reserve
+        self.bucket = TokenBucket(rate, burst)
+        self.interactive_tokens = interactive_tokens
+        self.interactive_wait = interactive_wait
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        self._period = current_period()
+        self._used = 0
+        self._stats = {priority: BudgetStats() for priority in Priority}
+
+    def attach_store(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """Counts calls in the api_usage table from now on."""
+        self._session_factory = session_factory
+
+    @property
+    def remaining(self) -> int:
+        """Calls left this month, as last seen by this instance."""
+        if self._period != current_period():
+            return self.monthly_quota
+        return max(self.monthly_quota - self._used, 0)
+
+    @property
+    def nearly_exhausted(self) -> bool:
+        """Whether only the calls reserved for interactive use are left."""
+        return self.remaining <= self.background_reserve
+
+    def limit_for(self, priority: Priority) -> int:
+        """Most calls a priority may make in a month."""
+        if priority == Priority.INTERACTIVE:
+            return self.monthly_quota
+        return self.monthly_quota - self.background_reserve
+
+    async def acquire(self, priority: Priority) -> bool:
+        """
+        Waits for the rate limiter and counts one call against the quota.
+
+        Returns False if the call must not be made.
+        """
+        stats = self._stats[priority]
+        if priority == Priority.INTERACTIVE:
+            allowed = await self.bucket.acquire(timeout=self.interactive_wait)
+        else:
+            allowed = await self.bucket.acquire(reserve=self.interactive_tokens)
+        if not allowed:
+            stats.throttled += 1
+            return False
+        if not await self._count_call(self.limit_for(priority)):
+            stats.over_budget += 1
+            return False
+        stats.calls_made += 1
+        return True
+
+    def record_stale_served(self, priority: Priority) -> None:
+        """Counts a refresh skipped in favour of stale data."""
+        self._stats[priority].stale_served += 1
+
+    async def _count_call(self, limit: int) -> bool:
+        period = current_period()
+        if period != self._period:
+            self._period, self._used = period, 0
+        if self._session_factory is not None:
+            try:
+                async with self._session_factory() as session, session.begin():
+                    used = await ApiUsageDAO(session).reserve(
+                        self.key_hash,
+                        period,
+                        limit,
+                    )
+            except Exception as e:
+                # Bookkeeping must not take the API down, fall back to the local count
+                logger.warning("Could not record Calendarific usage: {}", e)
+            else:
+                if used is None:
+                    self._used = max(self._used, limit)
+                    return False
+                self._used = used
+                return True
+        if self._used >= limit:
+            return False
+        self._used += 1
+        return True
+
+    async def sync_usage(self) -> None:
+        """
+        Reloads this month's usage from the store.
+
+        Other instances write to the store too.
+        """
+        if self._session_factory is None:
+            return
+        period = current_period()
+        async with self._session_factory() as session:
+            used = await ApiUsageDAO(session).get(self.key_hash, period)
+        self._period, self._used = period, used
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls made, calls avoided and budget left this month."""
+        by_priority = {
+            priority.value: asdict(stats) for priority, stats in self._stats.items()
+        }
+        return {
+            "monthly_quota": self.monthly_quota,
+            "used": self.monthly_quota - self.remaining,
+            "remaining": self.remaining,
+            "nearly_exhausted": self.nearly_exhausted,
+            "calls_made": sum(stats.calls_made for stats in self._stats.values()),
+            "calls_avoided": sum(
+                stats.throttled + stats.over_budget + stats.stale_served
+                for stats in self._stats.values()
+            ),
+            "by_priority": by_priority,
+        }
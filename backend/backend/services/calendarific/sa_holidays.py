@@ -0,0 +1,154 @@
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from .holiday_record import HolidayRecord
+
+# The Public Holidays Act 36 of 1994 took effect in 1995
+FIRST_YEAR = 1995
+
+# Public holidays on the same date every year
+FIXED_HOLIDAYS: Tuple[Tuple[int, int, str, str], ...] = (
+    (1, 1, "New Year's Day", "The first day of the year."),
+    (3, 21, "Human Rights Day", "Commemorates the Sharpeville massacre of 1960."),
+    (4, 27, "Freedom Day", "Marks the first democratic elections of 1994."),
+    (5, 1, "Workers' Day", "Celebrates the role of trade unions and workers."),
+    (6, 16, "Youth Day", "Commemorates the Soweto uprising of 1976."),
+    (8, 9, "National Women's Day", "Commemorates the women's march of 1956."),
+    (9, 24, "Heritage Day", "Celebrates the cultural heritage of South Africans."),
+    (12, 16, "Day of Reconciliation", "Promotes reconciliation and national unity."),
+    (12, 25, "Christmas Day", "Celebrates the birth of Jesus Christ."),
+    (12, 26, "Day of Goodwill", "The day after Christmas Day."),
+)
+
+# Public holidays relative to Easter Sunday, in days
+EASTER_HOLIDAYS: Tuple[Tuple[int, str, str], ...] = (
+    (-2, "Good Friday", "Commemorates the crucifixion of Jesus Christ."),
+    (1, "Family Day", "The Monday after Easter Sunday."),
+)
+
+# One-off public holidays declared by the President: election days, and the
+# Tuesday after Christmas when Christmas falls on a Sunday (the Monday is the
+# Day of Goodwill already). These cannot be derived from rules and must be
+# added when proclaimed.
+PROCLAIMED_HOLIDAYS: Dict[date, str] = {
+    date(1999, 6, 2): "General Election Day",
+    date(1999, 12, 31): "Millennium Holiday",
+    date(2000, 1, 2): "Millennium Holiday",
+    date(2000, 12, 5): "Local Government Election Day",
+    date(2004, 4, 14): "General Election Day",
+    date(2006, 3, 1): "Local Government Election Day",
+    date(2008, 5, 2): "Public Holiday",
+    date(2009, 4, 22): "General Election Day",
+    date(2011, 5, 18): "Local Government Election Day",
+    date(2011, 12, 27): "Day of Goodwill observed",
+    date(2014, 5, 7): "General Election Day",
+    date(2016, 8, 3): "Local Government Election Day",
+    date(2016, 12, 27): "Day of Goodwill observed",
+    date(2019, 5, 8): "General Election Day",
+    date(2021, 11, 1): "Local Government Election Day",
+    date(2022, 12, 27): "Day of Goodwill observed",
+    date(2023, 12, 15): "Rugby World Cup Victory Day",
+    date(2024, 5, 29): "General Election Day",
+}
+
+SUPPORTED_COUNTRIES = frozenset({"ZA"})
+
+
+def easter_sunday(year: int) -> date:
+    """Date of Western Easter Sunday, by the anonymous Gregorian computus."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def south_african_holidays(year: int) -> List[HolidayRecord]:
+    """
+    Public holidays of South Africa in a year, in date order.
+
+    A holiday falling on a Sunday makes the following Monday a public
+    holiday too, listed as "<name> observed" like Calendarific does, unless
+    that Monday is a holiday already.
+    Years are computed once.
+    """
+    return list(_south_african_holidays(year))
+
+
+@lru_cache(maxsize=512)
+def _south_african_holidays(year: int) -> Tuple[HolidayRecord, ...]:
+    if year < FIRST_YEAR:
+        return ()
+
+    easter = easter_sunday(year)
+    days = [
+        (date(year, month, day), name, description)
+        for month, day, name, description in FIXED_HOLIDAYS
+    ]
+    days += [
+        (easter + timedelta(days=offset), name, description)
+        for offset, name, description in EASTER_HOLIDAYS
+    ]
+    days += [
+        (day, name, "Public holiday declared by the President.")
+        for day, name in PROCLAIMED_HOLIDAYS.items()
+        if day.year == year
+    ]
+
+    taken = {day for day, _, _ in days}
+    for day, name, _ in list(days):
+        monday = day + timedelta(days=1)
+        if day.weekday() == 6 and monday not in taken:
+            description = f"{name} fell on a Sunday, so the Monday after is a holiday."
+            days.append((monday, f"{name} observed", description))
+            taken.add(monday)
+
+    days.sort(key=lambda holiday: holiday[0])
+    return tuple(
+        HolidayRecord(name, description, day.toordinal(), "National holiday")
+        for day, name, description in days
+    )
+
+
+class SAHolidayCalculator:
+    """
+    Rule based stand-in for CalendarificService for South Africa.
+
+    Computes public holidays locally instead of calling the API, so it
+    never fails, never waits and never uses request quota. It only knows
+    public holidays, not the observances and religious days Calendarific
+    also lists, and only from 1995 when the current holidays took effect.
+    """
+
+    def supports(self, country: str) -> bool:
+        """Whether holidays of the country can be computed locally."""
+        return country.upper() in SUPPORTED_COUNTRIES
+
+    async def get_holidays(
+        self,
+        year: int,
+        country: str = "ZA",
+    ) -> List[HolidayRecord]:
+        """
+        Computes holidays for a specific year and country.
+
+        Args:
+            year (int): The year to compute holidays for
+            country (str): The country code, only "ZA" is supported
+
+        Returns:
+            List[Dict[str, Any]]: Holidays in the same format as CalendarificService
+        """
+        if not self.supports(country):
+            raise ValueError(f"No local holiday rules for country {country}")
+        return south_african_holidays(year)
+
+    async def close(self) -> None:
+        """Nothing to release, kept for the CalendarificService interface."""
@@ -1,82 +1,197 @@
+import asyncio
+import random
+from typing import Any, Dict, List
+
 import httpx
-from typing import List, Dict, Any
-from datetime import datetime
+from loguru import logger
+
+from backend.settings import settings
+
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .holiday_record import HolidayRecord
+from .quota import QuotaBudget, current_priority
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+
+class CalendarificError(Exception):
+    """Base error for failed Calendarific requests."""
+
+
+class CalendarificUnavailableError(CalendarificError):
+    """
+    Calendarific is unreachable or failing.
+
+    It could not be reached, kept failing after retries, or the circuit
+    breaker is open.
+    """
+
+
+class CalendarificBudgetError(CalendarificUnavailableError):
+    """The call was not made because of the rate limit or the monthly quota."""
+
+
+class CalendarificResponseError(CalendarificError):
+    """Calendarific answered with an error or a payload we cannot parse."""
+
+
+# HTTP statuses worth retrying: rate limiting and server side failures
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
 
 class CalendarificService:
     """
     Service for interacting with the Calendarific API to fetch holiday information.
+
+    Uses one pooled keep-alive client (HTTP/2 when the h2 package is installed)
+    with explicit timeouts. Transient failures are retried with jittered
+    exponential backoff, and a circuit breaker fails fast while the API is down.
+    Every request, retries included, is paid for from the quota budget.
     """
-    
+
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.base_url = "https://calendarific.com/api/v2"
-        self.client = httpx.AsyncClient()
+        self.base_url = settings.calendarific_base_url
+        self.max_retries = settings.calendarific_max_retries
+        self.backoff_base = settings.calendarific_backoff_base
+        self.backoff_max = settings.calendarific_backoff_max
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.calendarific_breaker_failure_threshold,
+            reset_timeout=settings.calendarific_breaker_reset_timeout,
+        )
+        self.budget = QuotaBudget(
+            api_key,
+            monthly_quota=settings.calendarific_monthly_quota,
+            background_reserve=settings.calendarific_background_reserve,
+            rate=settings.calendarific_rate_limit,
+            burst=settings.calendarific_rate_burst,
+            interactive_tokens=settings.calendarific_interactive_tokens,
+            interactive_wait=settings.calendarific_interactive_wait,
+        )
+        http2 = settings.calendarific_http2 and HTTP2_AVAILABLE
+        if settings.calendarific_http2 and not http2:
+            logger.info("h2 is not installed, using HTTP/1.1 for Calendarific")
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            timeout=httpx.Timeout(
+                settings.calendarific_read_timeout,
+                connect=settings.calendarific_connect_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.calendarific_max_connections,
+                max_keepalive_connections=settings.calendarific_max_keepalive_connections,
+                keepalive_expiry=settings.calendarific_keepalive_expiry,
+            ),
+        )
 
-    async def get_holidays(self, year: int, country: str = "ZA") -> List[Dict[str, Any]]:
+    async def get_holidays(self, year: int, country: str = "ZA") -> List[HolidayRecord]:
         """
         Fetches holidays for a specific year and country.
-        
+
         Args:
             year (int): The year to fetch holidays for
             country (str): The country code (default: "ZA" for South Africa)
-            
+
         Returns:
-            List[Dict[str, Any]]: List of holidays with their details
+            List[HolidayRecord]: Holidays parsed from the response
+
+        Raises:
+            CalendarificBudgetError: The rate limit or monthly quota does not
+                allow the call
+            CalendarificUnavailableError: The API is unreachable or failing
+            CalendarificResponseError: The API rejected the request or sent an
+                invalid payload
         """
-        endpoint = f"{self.base_url}/holidays"
-        
         params = {
             "api_key": self.api_key,
             "country": country,
             "year": year,
-            "type": "national,local,religious"
+            "type": "national,local,religious",
         }
-        
+
+        response = await self._request("/holidays", params)
+
         try:
-            response = await self.client.get(endpoint, params=params)
-            response.raise_for_status()
-            
             data = response.json()
-            
+
             if data["meta"]["code"] != 200:
                 raise ValueError(f"API Error: {data['meta']['error_type']}")
-            
-            holidays = data["response"]["holidays"]
-            
-            # Add ISO formatted date to each holiday
-            for holiday in holidays:
-                holiday["date"]["iso"] = self.format_date(holiday["date"])
-                
-            return holidays
-            
-        except httpx.RequestError as e:
-            raise Exception(f"Failed to fetch holidays: {str(e)}")
-        except (KeyError, ValueError) as e:
-            raise Exception(f"Error processing API response: {str(e)}")
-
-    def format_date(self, date_obj: Dict[str, Any]) -> str:
+
+            # Parse once into compact records, the raw payload is dropped
+            return [
+                HolidayRecord.from_calendarific(holiday)
+                for holiday in data["response"]["holidays"]
+            ]
+
+        except (KeyError, ValueError, TypeError) as e:
+            raise CalendarificResponseError(
+                f"Error processing API response: {e}",
+            ) from e
+
+    async def _request(self, path: str, params: Dict[str, Any]) -> httpx.Response:
         """
-        Formats a date object from the API response into ISO format.
-        
-        Args:
-            date_obj (Dict[str, Any]): Date object from API response
-            
-        Returns:
-            str: ISO formatted date string
+        Sends a GET request through the circuit breaker.
+
+        Transient failures (timeouts, connection errors, 429 and 5xx
+        responses) are retried.
         """
         try:
-            # The API returns a 'datetime' object within the date_obj
-            datetime_obj = date_obj.get("datetime", {})
-            
-            # Extract year, month, and day from the datetime object
-            year = int(datetime_obj.get("year", date_obj.get("year")))
-            month = int(datetime_obj.get("month", date_obj.get("month")))
-            day = int(datetime_obj.get("day", date_obj.get("day")))
-            
-            dt = datetime(year=year, month=month, day=day)
-            return dt.isoformat()
-        except (KeyError, ValueError, TypeError) as e:
-            raise ValueError(f"Invalid date format in API response: {str(e)}")
+            self.breaker.before_call()
+        except CircuitOpenError as e:
+            raise CalendarificUnavailableError(str(e)) from e
+
+        for attempt in range(self.max_retries + 1):
+            if not await self.budget.acquire(current_priority()):
+                # No verdict on the API, let the next call be the trial
+                self.breaker.cancel_trial()
+                raise CalendarificBudgetError(
+                    "Calendarific request budget does not allow the call",
+                )
+            try:
+                response = await self.client.get(path, params=params)
+            except httpx.TransportError as e:
+                error: Exception = e
+            else:
+                if response.status_code not in RETRYABLE_STATUSES:
+                    break
+                error = httpx.HTTPStatusError(
+                    f"Calendarific returned {response.status_code}",
+                    request=response.request,
+                    response=response,
+                )
+
+            if attempt == self.max_retries:
+                self.breaker.record_failure()
+                raise CalendarificUnavailableError(
+                    f"Failed to fetch holidays after {attempt + 1} attempts: {error}",
+                ) from error
+            delay = self._backoff(attempt)
+            logger.warning(
+                "Calendarific request failed ({}), retrying in {:.2f}s", error, delay,
+            )
+            await asyncio.sleep(delay)
+
+        # The API answered, so it is up even if it rejected this request
+        self.breaker.record_success()
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            # The error's own message holds the request URL, api_key included
+            reason = f"{e.response.status_code} {e.response.reason_phrase}"
+            message = f"Failed to fetch holidays: {reason}"
+            raise CalendarificResponseError(message) from e
+        return response
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter exponential backoff for the given retry attempt."""
+        ceiling = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return random.uniform(0, ceiling)  # noqa: S311
 
     async def close(self):
         """
@@ -0,0 +1,36 @@
+import sys
+from typing import Any, Awaitable, List
+
+import anyio
+
+if sys.version_info < (3, 11):
+    from exceptiongroup import BaseExceptionGroup
+
+
+async def gather(*awaitables: Awaitable[Any]) -> List[Any]:
+    """
+    Run awaitables concurrently and return their results in order.
+
+    Unlike asyncio.gather, the awaitables run in a task group: if one fails
+    the others are cancelled before the error propagates, and cancelling the
+    caller cancels all of them. A single failure is raised as the original
+    exception rather than wrapped in an exception group, so callers can keep
+    catching it by type.
+
+    :param awaitables: coroutines to run.
+    :return: results in argument order.
+    """
+    results: List[Any] = [None] * len(awaitables)
+
+    async def run(index: int, awaitable: Awaitable[Any]) -> None:
+        results[index] = await awaitable
+
+    try:
+        async with anyio.create_task_group() as task_group:
+            for index, awaitable in enumerate(awaitables):
+                task_group.start_soon(run, index, awaitable)
+    except BaseExceptionGroup as group:
+        if len(group.exceptions) == 1:
+            raise group.exceptions[0] from None
+        raise
+    return results
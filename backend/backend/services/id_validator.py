@@ -1,7 +1,11 @@
-from datetime import datetime
 import calendar
-from typing import Dict, Any
-from .cache_service import cache_response
+from datetime import date, datetime, timedelta
+from typing import Any, ClassVar, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import id_kernel
+
 
 class IDValidator:
     CHINESE_ZODIAC = [
@@ -9,7 +13,7 @@ class IDValidator:
         "Horse", "Goat", "Monkey", "Rooster", "Dog", "Pig"
     ]
 
-    BIRTH_MONTHS = {
+    BIRTH_MONTHS: ClassVar[Dict[int, Dict[str, Any]]] = {
         1: {
             "stone": {
                 "name": "Garnet",
@@ -172,6 +176,18 @@ class IDValidator:
         "12-25": ["Annie Lennox", "Justin Trudeau"]
     }
 
+    LIFE_PATH_MEANINGS: ClassVar[Dict[int, str]] = {
+        1: "The Leader: Independent, focused, and a natural-born leader",
+        2: "The Mediator: Diplomatic, sensitive, and cooperative",
+        3: "The Creative: Expressive, optimistic, and talented in arts",
+        4: "The Worker: Practical, trustworthy, and hardworking",
+        5: "The Freedom Seeker: Adventurous, versatile, and progressive",
+        6: "The Nurturer: Responsible, caring, and a natural healer",
+        7: "The Seeker: Analytical, introspective, and philosophical",
+        8: "The Powerhouse: Ambitious, successful, and materialistic",
+        9: "The Humanitarian: Compassionate, romantic, and selfless",
+    }
+
     @staticmethod
     def get_zodiac_sign(date: datetime) -> str:
         """Get zodiac sign based on birth date."""
@@ -222,21 +238,9 @@ class IDValidator:
         
         life_path = reduce_to_single_digit(year + month + day)
         
-        meanings = {
-            1: "The Leader: Independent, focused, and a natural-born leader",
-            2: "The Mediator: Diplomatic, sensitive, and cooperative",
-            3: "The Creative: Expressive, optimistic, and talented in arts",
-            4: "The Worker: Practical, trustworthy, and hardworking",
-            5: "The Freedom Seeker: Adventurous, versatile, and progressive",
-            6: "The Nurturer: Responsible, caring, and a natural healer",
-            7: "The Seeker: Analytical, introspective, and philosophical",
-            8: "The Powerhouse: Ambitious, successful, and materialistic",
-            9: "The Humanitarian: Compassionate, romantic, and selfless"
-        }
-        
         return {
             "number": life_path,
-            "meaning": meanings.get(life_path, "Unknown meaning")
+            "meaning": IDValidator.LIFE_PATH_MEANINGS.get(life_path, "Unknown meaning"),
         }
 
     @staticmethod
@@ -316,11 +320,11 @@ class IDValidator:
             return False
 
     @staticmethod
-    @cache_response(ttl=3600 * 24)  # Cache for 24 hours
-    async def decode_id_number(id_number: str) -> Dict[str, Any]:
+    async def decode_id_number(id_number: str) -> "DecodedID":
         """
         Decodes a South African ID number into its components.
-        Results are cached for 24 hours since ID information doesn't change.
+        Only the date of birth, gender and citizenship are worked out here;
+        age and birth insights are computed when first read.
         """
         birth_year = int(id_number[0:2])
         birth_month = int(id_number[2:4])
@@ -335,31 +339,47 @@ class IDValidator:
 
         # Create full date
         date_of_birth = datetime(century + birth_year, birth_month, birth_day)
-        
-        # Get additional information
-        age_info = IDValidator.calculate_age(date_of_birth)
-        zodiac_sign = IDValidator.get_zodiac_sign(date_of_birth)
-        chinese_zodiac = IDValidator.get_chinese_zodiac(date_of_birth.year)
-        life_path_number = IDValidator.get_life_path_number(date_of_birth)
-        birth_day_info = IDValidator.get_birth_day_info(date_of_birth)
-        birth_symbols = IDValidator.get_birth_symbols(date_of_birth)
 
-        return {
-            "date_of_birth": date_of_birth,
-            "gender": "male" if gender_num >= 5000 else "female",
-            "citizen": citizenship == 0,
-            "age": age_info["years"],
-            "days_to_next_birthday": age_info["days_to_next_birthday"],
-            "is_birthday_today": age_info["is_birthday_today"],
-            "zodiac_sign": zodiac_sign,
-            "chinese_zodiac": chinese_zodiac,
-            "life_path_number": life_path_number["number"],
-            "life_path_meaning": life_path_number["meaning"],
-            "day_of_week": birth_day_info["day_of_week"],
-            "famous_birthdays": birth_day_info["famous_birthdays"],
-            "birth_stone": birth_symbols["stone"],
-            "birth_flower": birth_symbols["flower"]
-        }
+        return DecodedID(
+            id_number,
+            date_of_birth,
+            "male" if gender_num >= 5000 else "female",
+            citizenship == 0,
+        )
+
+    @staticmethod
+    def validate_many(id_numbers: Sequence[str]) -> np.ndarray:
+        """
+        Validates a batch of ID numbers at once.
+
+        Applies the same rules as validate_id_number, but runs the length, date,
+        citizenship and Luhn checks over the whole batch as array operations.
+        Returns a boolean array aligned with the input.
+        """
+        return id_kernel.decode_batch(id_numbers)["valid"]
+
+    @staticmethod
+    def decode_many(id_numbers: Sequence[str]) -> List[Optional["DecodedID"]]:
+        """
+        Decodes a batch of ID numbers into their core components.
+
+        Returns one entry per input: a DecodedID for valid IDs, or None for
+        IDs that fail validation or encode a date that does not exist
+        (e.g. 31 February).
+        """
+        decoded = id_kernel.decode_batch(id_numbers)
+        dates_of_birth = decoded["date_of_birth"].astype("datetime64[us]").tolist()
+        genders = np.where(decoded["male"], "male", "female").tolist()
+        citizens = decoded["citizen"].tolist()
+
+        return [
+            DecodedID(id_number, dates_of_birth[i], genders[i], citizens[i])
+            if is_valid
+            else None
+            for i, (id_number, is_valid) in enumerate(
+                zip(id_numbers, decoded["date_valid"].tolist()),
+            )
+        ]
 
     @staticmethod
     def _validate_checksum(id_number: str) -> bool:
@@ -377,3 +397,213 @@ class IDValidator:
             total += digit
 
         return total % 10 == 0
+
+
+class BirthStone(NamedTuple):
+    """Birth stone of a month."""
+
+    name: str
+    meaning: str
+    color: str
+
+
+class BirthFlower(NamedTuple):
+    """Birth flower of a month."""
+
+    name: str
+    meaning: str
+    colors: Tuple[str, ...]
+
+
+# One shared instance per month
+BIRTH_STONES = {
+    month: BirthStone(**info["stone"])
+    for month, info in IDValidator.BIRTH_MONTHS.items()
+}
+BIRTH_FLOWERS = {
+    month: BirthFlower(
+        info["flower"]["name"],
+        info["flower"]["meaning"],
+        tuple(info["flower"]["colors"]),
+    )
+    for month, info in IDValidator.BIRTH_MONTHS.items()
+}
+
+
+class BirthInsights(NamedTuple):
+    """Everything derived from the date of birth alone."""
+
+    zodiac_sign: str
+    chinese_zodiac: str
+    life_path_number: int
+    life_path_meaning: str
+    day_of_week: str
+    famous_birthdays: Tuple[str, ...]
+    birth_stone: BirthStone
+    birth_flower: BirthFlower
+
+
+class DecodedID:
+    """
+    A decoded South African ID number.
+
+    The date of birth, gender and citizenship are set on creation. Age and
+    birth insights are computed on first access and kept, so callers that
+    only need the core fields never pay for them. Insight values are shared
+    by every ID born on the same day.
+    """
+
+    __slots__ = ("id_number", "date_of_birth", "gender", "citizen", "_age", "_insights")
+
+    def __init__(
+        self,
+        id_number: str,
+        date_of_birth: datetime,
+        gender: str,
+        citizen: bool,
+    ) -> None:
+        self.id_number = id_number
+        self.date_of_birth = date_of_birth
+        self.gender = gender
+        self.citizen = citizen
+        self._age: Optional[Dict[str, Any]] = None
+        self._insights: Optional[BirthInsights] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The core fields, as stored in id_searches."""
+        return {
+            "id_number": self.id_number,
+            "date_of_birth": self.date_of_birth,
+            "gender": self.gender,
+            "citizen": self.citizen,
+        }
+
+    @property
+    def insights(self) -> BirthInsights:
+        """Zodiac, numerology, birth symbols and famous birthdays."""
+        if self._insights is None:
+            self._insights = birth_insights.lookup(self.date_of_birth)
+        return self._insights
+
+    @property
+    def _age_info(self) -> Dict[str, Any]:
+        if self._age is None:
+            self._age = IDValidator.calculate_age(self.date_of_birth)
+        return self._age
+
+    @property
+    def age(self) -> int:
+        """Age in whole years."""
+        return self._age_info["years"]
+
+    @property
+    def days_to_next_birthday(self) -> int:
+        """Days until the next birthday, 0 on the birthday itself."""
+        return self._age_info["days_to_next_birthday"]
+
+    @property
+    def is_birthday_today(self) -> bool:
+        """Whether today is the birthday."""
+        return self._age_info["is_birthday_today"]
+
+
+class BirthInsightsTable:
+    """
+    Birth insights for every date from 1900-01-01 to 2099-12-31.
+
+    Everything in the insights depends only on the date of birth, so each
+    date is reduced to a handful of uint8 codes indexed by day number. A
+    lookup is one index into the arrays, and the values it returns are
+    shared by every ID born on the same day.
+    """
+
+    FIRST_DATE = date(1900, 1, 1)
+    LAST_DATE = date(2099, 12, 31)
+
+    def __init__(
+        self,
+        first_date: date = FIRST_DATE,
+        last_date: date = LAST_DATE,
+    ) -> None:
+        self.first_ordinal = first_date.toordinal()
+        self.last_ordinal = last_date.toordinal()
+        days = np.arange(self.last_ordinal - self.first_ordinal + 1)
+        dates = np.datetime64(first_date.isoformat(), "D") + days
+        years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+        months = (dates.astype("datetime64[M]").astype(np.int64) % 12) + 1
+        month_days = (dates - dates.astype("datetime64[M]")).astype(np.int64) + 1
+
+        # Western zodiac only depends on month and day; tabulate it on a leap year
+        self._zodiac_names = sorted(
+            {
+                IDValidator.get_zodiac_sign(
+                    datetime(2000, 1, 1) + timedelta(days=offset),
+                )
+                for offset in range(366)
+            },
+        )
+        zodiac_by_month_day = np.zeros((13, 32), dtype=np.uint8)
+        famous_by_month_day: List[List[Tuple[str, ...]]] = [
+            [() for _ in range(32)] for _ in range(13)
+        ]
+        for offset in range(366):
+            day = datetime(2000, 1, 1) + timedelta(days=offset)
+            zodiac_by_month_day[day.month, day.day] = self._zodiac_names.index(
+                IDValidator.get_zodiac_sign(day),
+            )
+            famous_by_month_day[day.month][day.day] = tuple(
+                IDValidator.get_birth_day_info(day)["famous_birthdays"],
+            )
+        self._famous_by_month_day = famous_by_month_day
+
+        self.month = months.astype(np.uint8)
+        self.day = month_days.astype(np.uint8)
+        self.zodiac = zodiac_by_month_day[months, month_days]
+        self.chinese_zodiac = (years % 12).astype(np.uint8)
+        # Repeated digit sums reduce to the digital root of year + month + day
+        self.life_path = (1 + (years + months + month_days - 1) % 9).astype(np.uint8)
+        self.weekday = ((days + first_date.weekday()) % 7).astype(np.uint8)
+
+    def lookup(self, date_of_birth: date) -> BirthInsights:
+        """
+        Returns the birth insights for a date.
+
+        Dates outside the table fall back to computing them directly.
+        """
+        index = date_of_birth.toordinal() - self.first_ordinal
+        if not 0 <= index <= self.last_ordinal - self.first_ordinal:
+            return self._compute(date_of_birth)
+
+        month = int(self.month[index])
+        life_path = int(self.life_path[index])
+        return BirthInsights(
+            zodiac_sign=self._zodiac_names[self.zodiac[index]],
+            chinese_zodiac=IDValidator.CHINESE_ZODIAC[self.chinese_zodiac[index]],
+            life_path_number=life_path,
+            life_path_meaning=IDValidator.LIFE_PATH_MEANINGS[life_path],
+            day_of_week=calendar.day_name[self.weekday[index]],
+            famous_birthdays=self._famous_by_month_day[month][int(self.day[index])],
+            birth_stone=BIRTH_STONES[month],
+            birth_flower=BIRTH_FLOWERS[month],
+        )
+
+    @staticmethod
+    def _compute(date_of_birth: date) -> BirthInsights:
+        """Computes the insights for a date outside the table."""
+        day = datetime(date_of_birth.year, date_of_birth.month, date_of_birth.day)
+        life_path_number = IDValidator.get_life_path_number(day)
+        birth_day_info = IDValidator.get_birth_day_info(day)
+        return BirthInsights(
+            zodiac_sign=IDValidator.get_zodiac_sign(day),
+            chinese_zodiac=IDValidator.get_chinese_zodiac(day.year),
+            life_path_number=life_path_number["number"],
+            life_path_meaning=life_path_number["meaning"],
+            day_of_week=birth_day_info["day_of_week"],
+            famous_birthdays=tuple(birth_day_info["famous_birthdays"]),
+            birth_stone=BIRTH_STONES[day.month],
+            birth_flower=BIRTH_FLOWERS[day.month],
+        )
+
+
+# Built once per process, about 440KB of arrays
+birth_insights = BirthInsightsTable()
@@ -0,0 +1,106 @@
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.dao.id_search_dao import IDSearchDAO
+from backend.services.search_stats import search_stats
+from backend.services.write_behind import WriteBehindBuffer
+from backend.settings import settings
+
+PendingSearches = Dict[str, Dict[str, Any]]
+
+
+class SearchCountBuffer(WriteBehindBuffer[PendingSearches]):
+    """
+    Write-behind buffer for id_searches.
+
+    Searches are aggregated in memory per ID number and written as one
+    multi-row upsert, either every `flush_interval` seconds or as soon as
+    `max_ids` distinct IDs are pending. Writes then scale with the number
+    of distinct IDs per flush instead of the number of requests.
+
+    Searches are held for at most about `flush_interval` seconds, which is
+    how many seconds of counts a crash can lose. A failed flush keeps its
+    searches, and flushes are then retried after a delay that doubles with
+    every failure up to `max_backoff` seconds. Once `max_pending` distinct
+    IDs are waiting, e.g. while the database is down, the buffer refuses
+    new searches and callers write them directly instead.
+
+    Written searches are added to the search stats rollups once committed.
+    """
+
+    noun = "searches"
+
+    def __init__(
+        self,
+        flush_interval: float = 1.0,
+        max_ids: int = 10_000,
+        max_pending: int = 100_000,
+        max_backoff: float = 60.0,
+    ) -> None:
+        super().__init__(flush_interval, max_backoff)
+        self.max_ids = max_ids
+        self.max_pending = max_pending
+        self._pending: PendingSearches = {}
+
+    @property
+    def pending(self) -> int:
+        """Distinct ID numbers waiting to be written."""
+        return len(self._pending)
+
+    def add(self, search: Dict[str, Any]) -> bool:
+        """
+        Counts one search of an ID number.
+
+        :param search: dict with id_number, date_of_birth, gender and citizen.
+        :return: False if the buffer is full and the search was not counted.
+        """
+        return self.add_many((search,))
+
+    def add_many(self, searches: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Counts a batch of searches.
+
+        :param searches: dicts with id_number, date_of_birth, gender and citizen.
+        :return: False if the buffer is full and none of them were counted.
+        """
+        if len(self._pending) >= self.max_pending:
+            return False
+        for search in searches:
+            self._merge(search, search.get("search_count", 1))
+        if len(self._pending) >= self.max_ids:
+            self._flush_soon()
+        return True
+
+    def _merge(self, search: Dict[str, Any], count: int) -> None:
+        pending = self._pending.get(search["id_number"])
+        if pending is None:
+            self._pending[search["id_number"]] = {**search, "search_count": count}
+        else:
+            pending["search_count"] += count
+
+    def _take(self) -> Optional[PendingSearches]:
+        if not self._pending:
+            return None
+        searches, self._pending = self._pending, {}
+        return searches
+
+    async def _write(self, session: AsyncSession, searches: PendingSearches) -> int:
+        await IDSearchDAO(session).bulk_upsert(list(searches.values()))
+        return len(searches)
+
+    def _restore(self, searches: PendingSearches) -> None:
+        for search in searches.values():
+            self._merge(search, search["search_count"])
+
+    def _written(self, searches: PendingSearches) -> None:
+        search_stats.add_many(searches.values())
+
+
+# Global search buffer, only used when settings.search_buffer_enabled
+search_buffer = SearchCountBuffer(
+    flush_interval=settings.search_buffer_flush_interval,
+    max_ids=settings.search_buffer_max_ids,
+    max_pending=settings.search_buffer_max_pending,
+    max_backoff=settings.search_buffer_max_backoff,
+)
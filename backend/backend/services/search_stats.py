@@ -0,0 +1,104 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.dao.search_stats_dao import DemographicKey, SearchStatsDAO
+from backend.services.write_behind import WriteBehindBuffer
+from backend.settings import settings
+
+# Searches per (birth year, gender, citizen) and per hour
+RollupCounts = Tuple["Counter[DemographicKey]", "Counter[datetime]"]
+
+
+def current_hour() -> datetime:
+    """Start of the current hour, in UTC."""
+    return datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def count_searches(searches: Iterable[Dict[str, Any]]) -> RollupCounts:
+    """
+    Rollup counts of searches made in the current hour.
+
+    :param searches: dicts with date_of_birth, gender and citizen, and
+        optionally a search_count.
+    :return: searches per (birth year, gender, citizen) and per hour.
+    """
+    demographics: Counter[DemographicKey] = Counter()
+    for search in searches:
+        key = (search["date_of_birth"].year, search["gender"], search["citizen"])
+        demographics[key] += search.get("search_count", 1)
+    hourly: Counter[datetime] = Counter()
+    total = sum(demographics.values())
+    if total:
+        hourly[current_hour()] = total
+    return demographics, hourly
+
+
+class SearchStatsRollup(WriteBehindBuffer[RollupCounts]):
+    """
+    Keeps the search_demographics and search_hourly rollups up to date.
+
+    Recorded searches are counted in memory and the counts are added to
+    the rollup tables every `flush_interval` seconds in one short
+    transaction. The busy rollup rows, such as the current hour, are then
+    written by one statement per interval instead of being locked by every
+    request that records a search. Searches should only be counted once
+    their write to id_searches is committed, so the rollups agree with it.
+
+    Dashboards read only the rollups, which stay small whatever the size of
+    id_searches. They lag by up to `flush_interval` seconds and a crash
+    loses at most that many seconds of counts.
+    """
+
+    noun = "search counts"
+
+    def __init__(self, flush_interval: float = 5.0, max_backoff: float = 60.0) -> None:
+        super().__init__(flush_interval, max_backoff)
+        self._demographics: Counter[DemographicKey] = Counter()
+        self._hourly: Counter[datetime] = Counter()
+
+    @property
+    def pending(self) -> int:
+        """Searches counted but not written yet."""
+        return sum(self._hourly.values())
+
+    def add(self, search: Dict[str, Any]) -> None:
+        """
+        Counts one search of an ID number.
+
+        :param search: dict with date_of_birth, gender and citizen.
+        """
+        self.add_many((search,))
+
+    def add_many(self, searches: Iterable[Dict[str, Any]]) -> None:
+        """
+        Counts a batch of searches, all in the current hour.
+
+        :param searches: dicts with date_of_birth, gender and citizen.
+        """
+        demographics, hourly = count_searches(searches)
+        self._demographics.update(demographics)
+        self._hourly.update(hourly)
+
+    def _take(self) -> Optional[RollupCounts]:
+        if not self._hourly:
+            return None
+        counts = (self._demographics, self._hourly)
+        self._demographics, self._hourly = Counter(), Counter()
+        return counts
+
+    async def _write(self, session: AsyncSession, counts: RollupCounts) -> int:
+        demographics, hourly = counts
+        await SearchStatsDAO(session).add(demographics, hourly)
+        return sum(hourly.values())
+
+    def _restore(self, counts: RollupCounts) -> None:
+        demographics, hourly = counts
+        self._demographics.update(demographics)
+        self._hourly.update(hourly)
+
+
+# Global search stats rollup
+search_stats = SearchStatsRollup(flush_interval=settings.search_stats_flush_interval)
@@ -0,0 +1,129 @@
+import abc
+import asyncio
+import time
+from typing import Generic, Optional, TypeVar
+
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+Batch = TypeVar("Batch")
+
+
+class WriteBehindBuffer(abc.ABC, Generic[Batch]):
+    """
+    Base for in-memory buffers that are written to the database in batches.
+
+    Subclasses collect data and say how to take, write and put back a
+    batch. This class writes it every `flush_interval` seconds in one
+    transaction. A failed write puts the batch back, and flushing is then
+    retried after a delay that doubles with every failure up to
+    `max_backoff` seconds.
+    """
+
+    # What is pending, for log messages
+    noun = "rows"
+
+    def __init__(self, flush_interval: float, max_backoff: float = 60.0) -> None:
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional["asyncio.Task[None]"] = None
+        # Failed flushes in a row, and when flushing may be tried again
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def attach_store(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """Sets where flushed data is written."""
+        self._session_factory = session_factory
+
+    @property
+    @abc.abstractmethod
+    def pending(self) -> int:
+        """Amount of data waiting to be written."""
+
+    @abc.abstractmethod
+    def _take(self) -> Optional[Batch]:
+        """Removes and returns everything pending, None if there is nothing."""
+
+    @abc.abstractmethod
+    async def _write(self, session: AsyncSession, batch: Batch) -> int:
+        """Writes a batch in the given transaction, returns how much was written."""
+
+    @abc.abstractmethod
+    def _restore(self, batch: Batch) -> None:
+        """Puts a batch that could not be written back with the pending data."""
+
+    def _written(self, batch: Batch) -> None:
+        """Called once a batch is committed."""
+
+    async def flush(self) -> int:
+        """
+        Writes everything pending in one transaction.
+
+        :return: how much was written.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._session_factory is None:
+                return 0
+            batch = self._take()
+            if batch is None:
+                return 0
+            try:
+                async with self._session_factory() as session, session.begin():
+                    written = await self._write(session, batch)
+            except BaseException:
+                # Keep the data for the next flush, merged with newer data
+                self._restore(batch)
+                raise
+            self._written(batch)
+            return written
+
+    def _may_flush(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _flush_soon(self) -> None:
+        """Starts a flush now unless one is running or failures are backing off."""
+        if self._may_flush() and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.ensure_future(self._try_flush())
+
+    async def _try_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            self._failures += 1
+            delay = min(self.flush_interval * 2 ** self._failures, self.max_backoff)
+            self._retry_at = time.monotonic() + delay
+            logger.warning(
+                "Could not flush {} buffered {}, retrying in {:.1f}s: {}",
+                self.pending,
+                self.noun,
+                delay,
+                e,
+            )
+        else:
+            self._failures = 0
+            self._retry_at = 0.0
+
+    async def run_flusher(self) -> None:
+        """Flushes every flush_interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._may_flush():
+                await self._try_flush()
+
+    async def drain(self) -> None:
+        """Writes everything still pending, for shutdown."""
+        if self._flush_task is not None:
+            await self._flush_task
+        try:
+            written = await self.flush()
+        except Exception as e:
+            logger.error(
+                "Lost {} buffered {} on shutdown: {}", self.pending, self.noun, e,
+            )
+            return
+        if written:
+            logger.info("Flushed {} buffered {} on shutdown", written, self.noun)
@@ -1,7 +1,7 @@
 import enum
 from pathlib import Path
 from tempfile import gettempdir
-from typing import List
+from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from yarl import URL
@@ -21,6 +21,24 @@ class LogLevel(str, enum.Enum):
     FATAL = "FATAL"
 
 
+class CacheBackendType(str, enum.Enum):
+    """Possible shared cache tiers behind the in-process cache."""
+
+    MEMORY = "memory"
+    SQLITE = "sqlite"
+
+
+class HolidaySource(str, enum.Enum):
+    """Where holidays come from."""
+
+    # Calendarific only
+    CALENDARIFIC = "calendarific"
+    # Calendarific, with local rules when it is unavailable
+    FALLBACK = "fallback"
+    # Local rules, Calendarific only for countries without rules
+    LOCAL = "local"
+
+
 class Settings(BaseSettings):
     """
     Application settings.
@@ -47,8 +65,94 @@ class Settings(BaseSettings):
     db_pass: str = os.getenv("BACKEND_DB_PASS", "backend")
     db_base: str = os.getenv("BACKEND_DB_BASE", "admin")
     db_echo: bool = False
+    # Connection pool of the application engine
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    # Seconds to wait for a pooled connection before failing
+    db_pool_timeout: float = 30.0
+    # Connections older than this many seconds are replaced, -1 never
+    db_pool_recycle: int = 1800
+    # Test connections with a round trip on every checkout
+    db_pool_pre_ping: bool = False
+    # asyncpg statement caches per connection, set both to 0 behind
+    # pgbouncer in transaction pooling mode
+    db_statement_cache_size: int = 100
+    db_prepared_statement_cache_size: int = 100
 
     calendarific_api_key: str = os.environ.get("BACKEND_CALENDARIFIC_API_KEY")
+    # "local" computes South African public holidays without calling Calendarific
+    holiday_source: HolidaySource = HolidaySource.FALLBACK
+    calendarific_base_url: str = "https://calendarific.com/api/v2"
+    # Seconds to wait for a connection and for each read from Calendarific
+    calendarific_connect_timeout: float = 3.0
+    calendarific_read_timeout: float = 10.0
+    # Connection pool; idle keep-alive connections close after keepalive_expiry seconds
+    calendarific_max_connections: int = 20
+    calendarific_max_keepalive_connections: int = 10
+    calendarific_keepalive_expiry: float = 30.0
+    # HTTP/2 is only used when the h2 package is installed
+    calendarific_http2: bool = True
+    # Retries for timeouts, connection errors, 429 and 5xx, with jittered backoff
+    calendarific_max_retries: int = 3
+    calendarific_backoff_base: float = 0.5
+    calendarific_backoff_max: float = 8.0
+    # Failed requests in a row before calls fail fast for reset_timeout seconds
+    calendarific_breaker_failure_threshold: int = 5
+    calendarific_breaker_reset_timeout: float = 30.0
+    # Calls allowed per month by the Calendarific plan, counted per API key
+    calendarific_monthly_quota: int = 1000
+    # Calls at the end of the month kept for user-facing lookups, background
+    # warmup and refresh stop and stale data is served once only these are left
+    calendarific_background_reserve: int = 100
+    # Token bucket: calls per second and burst size
+    calendarific_rate_limit: float = 1.0
+    calendarific_rate_burst: int = 5
+    # Tokens background calls leave for user-facing ones, and how many
+    # seconds a user-facing call waits for a token
+    calendarific_interactive_tokens: int = 1
+    calendarific_interactive_wait: float = 2.0
+    # Seconds before a stored holiday year is fetched from Calendarific again
+    holiday_refresh_seconds: int = 7 * 24 * 3600
+    # Most seconds one instance spends fetching a year, including retries,
+    # while it holds the year's refresh lock and a pooled connection
+    holiday_fetch_timeout: float = 30.0
+    # Seconds other instances wait for that fetch, polling the store
+    holiday_lock_wait: float = 10.0
+    holiday_lock_poll_interval: float = 0.5
+    # Seconds a stale or degraded holiday year is cached after a failed fetch,
+    # doubling with each failure in a row up to the max
+    holiday_error_ttl: int = 30
+    holiday_error_ttl_max: int = 900
+    # Holiday years loaded into the cache at startup, end year None means next year
+    holiday_warmup_enabled: bool = True
+    holiday_warmup_start_year: int = 1920
+    holiday_warmup_end_year: Optional[int] = None
+    holiday_warmup_concurrency: int = 4
+    # Cached years expiring within refresh_ahead seconds are re-fetched every interval
+    holiday_refresher_interval: float = 300.0
+    holiday_refresh_ahead: float = 3600.0
+
+    # Buffer search counts in memory and write them in batches. Counts are
+    # written within flush_interval seconds, or sooner once max_ids distinct
+    # IDs are pending; a crash loses at most that window of counts.
+    search_buffer_enabled: bool = False
+    search_buffer_flush_interval: float = 1.0
+    search_buffer_max_ids: int = 10_000
+    # Past max_pending distinct IDs searches are written directly, and failed
+    # flushes are retried after a doubling delay of at most max_backoff seconds
+    search_buffer_max_pending: int = 100_000
+    search_buffer_max_backoff: float = 60.0
+    # Searches are added to the stats rollup tables every flush_interval seconds
+    search_stats_flush_interval: float = 5.0
+
+    # Limits for the in-process cache, None disables a limit
+    cache_max_entries: Optional[int] = 100_000
+    cache_max_bytes: Optional[int] = 256 * 1024 * 1024
+    # Seconds between sweeps for expired cache entries
+    cache_sweep_interval: float = 60.0
+    # "sqlite" shares cached values between all workers on the host
+    cache_backend: CacheBackendType = CacheBackendType.MEMORY
+    cache_sqlite_path: Path = TEMP_DIR / "backend-cache.sqlite3"
 
     @property
     def db_url(self) -> URL:
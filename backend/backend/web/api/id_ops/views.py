@@ -1,24 +1,52 @@
 from datetime import datetime, date
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Form, Request
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-
-from backend.db.dependencies import get_db_session
-from backend.models.id_search import IDSearch, Holiday
-from backend.schemas.id_search import IDSearchResponse
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Form, Query, Request
+
+from backend.db.dao.id_search_dao import IDSearchDAO
+from backend.db.session import after_commit
+from backend.schemas.id_search import (
+    BatchValidateRequest,
+    Holiday,
+    IDSearchResponse,
+)
+from backend.services import bulk_pipeline
+from backend.services.bulk_pipeline import InputFormat
 from backend.services.id_validator import IDValidator
-from backend.services.calendarific.holiday_service import HolidayService
+from backend.services.search_buffer import search_buffer
+from backend.services.search_stats import search_stats
+from backend.web.responses import DuplexStreamingResponse
+from backend.services.calendarific.holiday_service import holiday_service
+from backend.services.concurrency import gather
+from backend.settings import settings
 
 router = APIRouter()
-holiday_service = HolidayService()
+
+async def _record_search(
+    dao: IDSearchDAO,
+    search: Dict[str, Any],
+) -> Tuple[Optional[int], List[Any]]:
+    """
+    Records a search, through the write-behind buffer if enabled and not full.
+
+    Returns its search count and the holidays on its date of birth. A
+    buffered search is written later, so its count is None and its holidays
+    come from the holiday service instead of the database. The search stats
+    count it once it is committed.
+    """
+    if settings.search_buffer_enabled and search_buffer.add(search):
+        return None, await holiday_service.get_holidays_for_date(
+            search["date_of_birth"],
+        )
+    stored, holidays = await dao.record_search(search)
+    after_commit(dao.session, lambda: search_stats.add(search))
+    return stored.search_count, holidays
+
 
 @router.post("/validate")
 async def validate_id(
     request: Request,
     id_number: str = Form(...),
-    db: AsyncSession = Depends(get_db_session)
+    dao: IDSearchDAO = Depends(),
 ) -> dict:
     """
     Validate a South African ID number and return its decoded information
@@ -26,22 +54,19 @@ async def validate_id(
     """
     # Validate ID number format first
     if not IDValidator.validate_id_number(id_number):
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid ID number format"
-        )
+        raise HTTPException(status_code=400, detail="Invalid ID number format")
 
     # Decode ID number components
     id_info = await IDValidator.decode_id_number(id_number)
-    
+
     # Extract birth date from ID number
-    birth_date = id_info["date_of_birth"]
+    birth_date = id_info.date_of_birth
 
     # Calculate last and next birthday
     today = date.today()
     current_year = today.year
     birthday_this_year = birth_date.replace(year=current_year).date()
-    
+
     if birthday_this_year > today:
         last_birthday = birth_date.replace(year=current_year - 1).date()
         next_birthday = birthday_this_year
@@ -49,113 +74,195 @@ async def validate_id(
         last_birthday = birthday_this_year
         next_birthday = birth_date.replace(year=current_year + 1).date()
 
-    # Check if birthdays fall on holidays
-    last_birthday_holiday = await holiday_service.is_public_holiday(datetime.combine(last_birthday, datetime.min.time()))
-    next_birthday_holiday = await holiday_service.is_public_holiday(datetime.combine(next_birthday, datetime.min.time()))
-
-    # Fetch holidays around the birthday
-    holidays_around_birthday = await holiday_service.get_holidays_around_birthday(birth_date)
-
-    # Get holidays for the birth date
-    stmt = select(IDSearch).options(selectinload(IDSearch.holidays)).where(IDSearch.id_number == id_number)
-    result = await db.execute(stmt)
-    search = result.scalar_one_or_none()
-
-    if not search:
-        search = IDSearch(
-            id_number=id_number,
-            date_of_birth=id_info["date_of_birth"],
-            gender=id_info["gender"],
-            is_citizen=id_info["citizen"]
-        )
-        db.add(search)
-        await db.commit()
-        await db.refresh(search)
+    # Check if birthdays fall on holidays, fetch holidays around the birthday
+    # and record the search concurrently. Every holiday year goes through the
+    # cached, deduplicated year index.
+    (
+        last_birthday_holiday,
+        next_birthday_holiday,
+        holidays_around_birthday,
+        (search_count, search_holidays),
+    ) = await gather(
+        holiday_service.is_public_holiday(
+            datetime.combine(last_birthday, datetime.min.time()),
+        ),
+        holiday_service.is_public_holiday(
+            datetime.combine(next_birthday, datetime.min.time()),
+        ),
+        holiday_service.get_holidays_around_birthday(birth_date),
+        _record_search(dao, id_info.as_dict()),
+    )
+    window_start, window_end = holiday_service.birthday_window(birth_date)
+    holiday_status = await holiday_service.get_status(
+        {last_birthday.year, next_birthday.year, window_start.year, window_end.year},
+    )
 
     # Format response with additional information
+    insights = id_info.insights
     response = {
         "id_info": {
-            "date_of_birth": id_info["date_of_birth"].strftime("%Y-%m-%d"),
-            "gender": id_info["gender"],
-            "citizen_status": "South African Citizen" if id_info["citizen"] else "Permanent Resident",
-            "age": id_info["age"],
+            "date_of_birth": id_info.date_of_birth.strftime("%Y-%m-%d"),
+            "gender": id_info.gender,
+            "citizen_status": "South African Citizen"
+            if id_info.citizen
+            else "Permanent Resident",
+            "age": id_info.age,
+            "search_count": search_count,
         },
         "birth_insights": {
-            "day_of_week": id_info["day_of_week"],
+            "day_of_week": insights.day_of_week,
             "zodiac": {
-                "western": id_info["zodiac_sign"],
-                "chinese": id_info["chinese_zodiac"]
+                "western": insights.zodiac_sign,
+                "chinese": insights.chinese_zodiac,
             },
             "birth_symbols": {
-                "stone": {
-                    "name": id_info["birth_stone"]["name"],
-                    "meaning": id_info["birth_stone"]["meaning"],
-                    "color": id_info["birth_stone"]["color"]
-                },
-                "flower": {
-                    "name": id_info["birth_flower"]["name"],
-                    "meaning": id_info["birth_flower"]["meaning"],
-                    "colors": id_info["birth_flower"]["colors"]
-                }
+                "stone": insights.birth_stone._asdict(),
+                "flower": insights.birth_flower._asdict(),
             },
             "numerology": {
-                "life_path_number": id_info["life_path_number"],
-                "meaning": id_info["life_path_meaning"]
+                "life_path_number": insights.life_path_number,
+                "meaning": insights.life_path_meaning,
             },
             "birthday_countdown": {
-                "days_remaining": id_info["days_to_next_birthday"],
-                "is_today": id_info["is_birthday_today"]
+                "days_remaining": id_info.days_to_next_birthday,
+                "is_today": id_info.is_birthday_today,
             },
-            "shared_birthdays": id_info["famous_birthdays"]
+            "shared_birthdays": insights.famous_birthdays,
         },
         "holidays": [
             {
                 "name": holiday.name,
                 "description": holiday.description,
-                "date": holiday.date.strftime("%Y-%m-%d")
+                "date": holiday.date.strftime("%Y-%m-%d"),
             }
-            for holiday in (search.holidays or [])
+            for holiday in search_holidays
         ],
         "holidays_around_birthday": [
             {
-                "name": holiday["name"],
-                "description": holiday["description"],
-                "date": datetime(**holiday["date"]["datetime"]).strftime("%Y-%m-%d")
+                "name": holiday.name,
+                "description": holiday.description,
+                "date": holiday.iso,
             }
             for holiday in holidays_around_birthday
         ],
         "last_birthday": {
             "date": last_birthday.isoformat(),
-            "holiday": holiday_service.format_holiday(last_birthday_holiday) if last_birthday_holiday else None
+            "holiday": holiday_service.format_holiday(last_birthday_holiday)
+            if last_birthday_holiday
+            else None,
         },
         "next_birthday": {
             "date": next_birthday.isoformat(),
-            "holiday": holiday_service.format_holiday(next_birthday_holiday) if next_birthday_holiday else None
-        }
+            "holiday": holiday_service.format_holiday(next_birthday_holiday)
+            if next_birthday_holiday
+            else None,
+        },
+        # "stale" or "degraded" when holiday data could not be refreshed
+        "holiday_data_status": holiday_status.value,
     }
 
     # Add special messages
     special_messages = []
-    
-    if id_info["is_birthday_today"]:
+
+    if id_info.is_birthday_today:
         special_messages.append("🎉 Happy Birthday! 🎂")
-    
-    if id_info["famous_birthdays"]:
-        special_messages.append(f"You share your birthday with {', '.join(id_info['famous_birthdays'])}! 🌟")
+
+    if insights.famous_birthdays:
+        special_messages.append(
+            f"You share your birthday with {', '.join(insights.famous_birthdays)}! 🌟",
+        )
 
     # Add birth symbols message
-    birth_stone = id_info["birth_stone"]["name"]
-    birth_flower = id_info["birth_flower"]["name"]
-    special_messages.append(f"Your birth stone is the {birth_stone} 💎 and your birth flower is the {birth_flower} 🌸")
-    
+    birth_stone = insights.birth_stone.name
+    birth_flower = insights.birth_flower.name
+    special_messages.append(
+        f"Your birth stone is the {birth_stone} 💎 and "
+        f"your birth flower is the {birth_flower} 🌸",
+    )
+
     if special_messages:
         response["special_messages"] = special_messages
 
     return response
 
+
+@router.post("/validate/batch")
+async def validate_batch(
+    payload: BatchValidateRequest,
+    dao: IDSearchDAO = Depends(),
+) -> Dict[str, Any]:
+    """
+    Validate and decode a batch of South African ID numbers in one request.
+
+    All IDs are checked together and every valid one is recorded with a single
+    bulk upsert. Holiday lookups are left to the single ID endpoint.
+    """
+    decoded = IDValidator.decode_many(payload.id_numbers)
+
+    results = []
+    searches = []
+    for id_number, id_info in zip(payload.id_numbers, decoded):
+        if id_info is None:
+            results.append({"id_number": id_number, "valid": False})
+            continue
+        results.append(
+            {
+                "id_number": id_number,
+                "valid": True,
+                "date_of_birth": id_info.date_of_birth.strftime("%Y-%m-%d"),
+                "gender": id_info.gender,
+                "citizen": id_info.citizen,
+            },
+        )
+        searches.append(id_info.as_dict())
+
+    if not (settings.search_buffer_enabled and search_buffer.add_many(searches)):
+        await dao.bulk_upsert(searches)
+        after_commit(dao.session, lambda: search_stats.add_many(searches))
+
+    return {
+        "total": len(results),
+        "valid": len(searches),
+        "invalid": len(results) - len(searches),
+        "results": results,
+    }
+
+
+@router.post("/validate/stream", response_class=DuplexStreamingResponse)
+async def validate_stream(
+    request: Request,
+    input_format: Optional[InputFormat] = Query(None, alias="format"),
+    holidays: bool = False,
+) -> DuplexStreamingResponse:
+    """
+    Validate an uploaded CSV or NDJSON body of ID numbers of any size.
+
+    The body is read in chunks and results are streamed back as NDJSON, one
+    line per input record. The format is taken from the query string or the
+    Content-Type header. Set holidays=true to add the public holidays falling
+    on each date of birth.
+    """
+    if input_format is None:
+        input_format = InputFormat.from_content_type(
+            request.headers.get("content-type", ""),
+        )
+
+    return DuplexStreamingResponse(
+        bulk_pipeline.validate_stream(
+            request.stream(),
+            input_format,
+            holidays=holiday_service if holidays else None,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
 # Legacy endpoint - can be removed if not needed
 @router.get("/validate/{id_number}", response_model=IDSearchResponse)
-async def validate_id_get(id_number: str, db: AsyncSession = Depends(get_db_session)):
+async def validate_id_get(
+    id_number: str,
+    dao: IDSearchDAO = Depends(),
+) -> IDSearchResponse:
     """
     Legacy endpoint for backward compatibility.
     Consider using the POST /validate endpoint for new integrations.
@@ -164,48 +271,18 @@ async def validate_id_get(id_number: str, db: AsyncSession = Depends(get_db_sess
     if not IDValidator.validate_id_number(id_number):
         raise HTTPException(status_code=400, detail="Invalid ID number format")
 
-    # Check if ID has been searched before - include holidays relationship
-    query = select(IDSearch).where(IDSearch.id_number == id_number).options(selectinload(IDSearch.holidays))
-    result = await db.execute(query)
-    existing_search = result.scalar_one_or_none()
-
     # Decode ID number
     id_info = await IDValidator.decode_id_number(id_number)
 
-    if existing_search:
-        # Update search count
-        existing_search.search_count += 1
-        existing_search.updated_at = datetime.utcnow()
-        await db.commit()
-        
-        return IDSearchResponse(
-            id_number=id_number,
-            date_of_birth=existing_search.date_of_birth.strftime("%Y-%m-%d"),
-            gender=existing_search.gender,
-            citizen=existing_search.citizen,
-            search_count=existing_search.search_count,
-            holidays=existing_search.holidays
-        )
-
-    # Create new ID search record
-    new_search = IDSearch(
-        id_number=id_number,
-        date_of_birth=id_info["date_of_birth"],
-        gender=id_info["gender"],
-        citizen=id_info["citizen"],
-        search_count=1,
-        created_at=datetime.utcnow()
-    )
-    
-    db.add(new_search)
-    await db.commit()
-    await db.refresh(new_search)
+    # Create the search record or update its search count
+    search, holidays = await dao.record_search(id_info.as_dict())
+    after_commit(dao.session, lambda: search_stats.add(id_info.as_dict()))
 
     return IDSearchResponse(
         id_number=id_number,
-        date_of_birth=new_search.date_of_birth.strftime("%Y-%m-%d"),
-        gender=new_search.gender,
-        citizen=new_search.citizen,
-        search_count=new_search.search_count,
-        holidays=[]
+        date_of_birth=search.date_of_birth.strftime("%Y-%m-%d"),
+        gender=search.gender,
+        citizen=search.citizen,
+        search_count=search.search_count,
+        holidays=[Holiday.model_validate(holiday) for holiday in holidays],
     )
@@ -1,4 +1,11 @@
-from fastapi import APIRouter
+from contextlib import suppress
+from typing import Any, Dict
+
+from fastapi import APIRouter, Request, Response
+from starlette import status
+
+from backend.services.cache_service import cache_service
+from backend.services.calendarific.holiday_service import holiday_service
 
 router = APIRouter()
 
@@ -10,3 +17,44 @@ def health_check() -> None:
 
     It returns 200 if the project is healthy.
     """
+
+
+@router.get("/ready")
+def readiness_check(request: Request, response: Response) -> Dict[str, bool]:
+    """
+    Checks whether the application is ready to serve traffic.
+
+    It returns 503 until the startup holiday warmup has finished.
+    """
+    ready = getattr(request.app.state, "ready", False)
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"ready": ready}
+
+
+@router.get("/cache/stats")
+def cache_stats() -> Dict[str, Any]:
+    """
+    Reports the size of the in-process cache.
+
+    Includes hits, misses, evictions and expirations per namespace.
+    """
+    return cache_service.stats()
+
+
+@router.get("/calendarific/status")
+async def calendarific_status() -> Dict[str, Any]:
+    """
+    Reports the state of the Calendarific circuit breaker and request budget.
+
+    The circuit is "open" while calls fail fast after repeated failures.
+    The budget shows calls made, calls avoided and calls left this month.
+    """
+    calendarific = holiday_service.calendarific
+    with suppress(Exception):
+        await calendarific.budget.sync_usage()
+    return {
+        "circuit": calendarific.breaker.state,
+        "consecutive_failures": calendarific.breaker.failures,
+        "budget": calendarific.budget.stats(),
+    }
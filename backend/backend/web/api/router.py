@@ -1,7 +1,9 @@
 from fastapi.routing import APIRouter
 
-from backend.web.api import monitoring, id_ops
+from backend.web.api import monitoring, id_ops, searches, stats
 
 api_router = APIRouter()
 api_router.include_router(monitoring.router)
 api_router.include_router(id_ops.router)
+api_router.include_router(searches.router)
+api_router.include_router(stats.router)
@@ -0,0 +1,6 @@
+from fastapi import APIRouter
+
+from backend.web.api.searches import views
+
+router = APIRouter(prefix="/searches", tags=["Search History"])
+router.include_router(views.router)
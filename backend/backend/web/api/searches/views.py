@@ -0,0 +1,82 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+import ujson
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from backend.db.dao.id_search_dao import IDSearchDAO, SearchOrder
+from backend.schemas.id_search import (
+    SEARCH_PAGE_MAX_SIZE,
+    SearchHistoryItem,
+    SearchHistoryPage,
+)
+
+router = APIRouter()
+
+
+def _encode_cursor(order: SearchOrder, key: Any, search_id: int) -> str:
+    """Opaque cursor pointing after a row."""
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = ujson.dumps([order.value, key, search_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(order: SearchOrder, cursor: str) -> Tuple[Any, int]:
+    """Sort key and id encoded in a cursor, 400 if it is not one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order, key, search_id = ujson.loads(raw)
+        if cursor_order != order.value:
+            raise ValueError("cursor belongs to another order")
+        if order == SearchOrder.LAST_SEARCHED:
+            key = datetime.fromisoformat(key)
+        return key, int(search_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+@router.get("/", response_model=SearchHistoryPage)
+async def list_searches(
+    order_by: SearchOrder = SearchOrder.LAST_SEARCHED,
+    limit: int = Query(50, ge=1, le=SEARCH_PAGE_MAX_SIZE),
+    cursor: Optional[str] = None,
+    dao: IDSearchDAO = Depends(),
+) -> SearchHistoryPage:
+    """
+    Lists searched ID numbers, most recently or most often searched first.
+
+    Pages are fetched with keyset pagination: pass the returned next_cursor
+    to get the next page. Every page costs the same however deep it is.
+    """
+    after = _decode_cursor(order_by, cursor) if cursor else None
+    # One extra row tells whether there is a next page
+    rows = await dao.list_searches(order_by, limit + 1, after)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, key = rows[-1]
+        next_cursor = _encode_cursor(order_by, key, last.id)
+
+    return SearchHistoryPage(
+        items=[SearchHistoryItem.model_validate(search) for search, _ in rows],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/top", response_model=List[SearchHistoryItem])
+async def most_searched(
+    limit: int = Query(10, ge=1, le=100),
+    dao: IDSearchDAO = Depends(),
+) -> List[SearchHistoryItem]:
+    """
+    Returns the most searched ID numbers.
+
+    Reads the first entries of the search_count index, so it stays fast
+    however many IDs have been searched.
+    """
+    rows = await dao.list_searches(SearchOrder.SEARCH_COUNT, limit)
+    return [SearchHistoryItem.model_validate(search) for search, _ in rows]
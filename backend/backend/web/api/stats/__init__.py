@@ -0,0 +1,6 @@
+from fastapi import APIRouter
+
+from backend.web.api.stats import views
+
+router = APIRouter(prefix="/stats", tags=["Statistics"])
+router.include_router(views.router)
@@ -0,0 +1,54 @@
+from collections import Counter
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.dao.search_stats_dao import SearchStatsDAO
+from backend.db.dependencies import get_db_session
+from backend.schemas.search_stats import (
+    DecadeCount,
+    DemographicCount,
+    HourlyCount,
+    SearchStats,
+)
+from backend.services.search_stats import current_hour
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SearchStats)
+async def search_stats(
+    hours: int = Query(24, ge=1, le=24 * 31),
+    session: AsyncSession = Depends(get_db_session),
+) -> SearchStats:
+    """
+    Searches by birth decade, gender and citizen status, and per hour.
+
+    Reads only the rollup tables, which hold one row per birth year, gender
+    and citizen status and one per hour, so the cost does not grow with the
+    number of searches. Counts lag recorded searches by a few seconds.
+    """
+    dao = SearchStatsDAO(session)
+    rows = await dao.demographics()
+    hourly = await dao.hourly(current_hour() - timedelta(hours=hours - 1))
+
+    by_decade: Counter[int] = Counter()
+    by_gender: Counter[str] = Counter()
+    by_citizen: Counter[str] = Counter()
+    for row in rows:
+        by_decade[row.birth_year // 10 * 10] += row.searches
+        by_gender[row.gender] += row.searches
+        by_citizen["citizen" if row.citizen else "permanent_resident"] += row.searches
+
+    return SearchStats(
+        total_searches=sum(by_gender.values()),
+        by_decade=[
+            DecadeCount(decade=decade, searches=searches)
+            for decade, searches in sorted(by_decade.items())
+        ],
+        by_gender=dict(by_gender),
+        by_citizen=dict(by_citizen),
+        by_birth_year=[DemographicCount.model_validate(row) for row in rows],
+        hourly=[HourlyCount.model_validate(row) for row in hourly],
+    )
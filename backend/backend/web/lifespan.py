@@ -1,11 +1,19 @@
+import asyncio
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from datetime import date
+from typing import AsyncGenerator, List
 
 from fastapi import FastAPI
+from loguru import logger
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from backend.db.meta import meta
 from backend.db.models import load_all_models
+from backend.db.session import WriteTrackingSession
+from backend.services.cache_service import cache_service
+from backend.services.calendarific.holiday_service import holiday_service
+from backend.services.search_buffer import search_buffer
+from backend.services.search_stats import search_stats
 from backend.settings import settings
 
 
@@ -19,10 +27,23 @@ def _setup_db(app: FastAPI) -> None:  # pragma: no cover
 
     :param app: fastAPI application.
     """
-    engine = create_async_engine(str(settings.db_url), echo=settings.db_echo)
+    engine = create_async_engine(
+        str(settings.db_url),
+        echo=settings.db_echo,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        },
+    )
     session_factory = async_sessionmaker(
         engine,
         expire_on_commit=False,
+        sync_session_class=WriteTrackingSession,
     )
     app.state.db_engine = engine
     app.state.db_session_factory = session_factory
@@ -37,6 +58,41 @@ async def _create_tables() -> None:  # pragma: no cover
     await engine.dispose()
 
 
+async def _warm_up_holidays(app: FastAPI) -> None:
+    """
+    Loads the configured range of holiday years into the cache.
+
+    The application reports ready once this is done.
+
+    :param app: fastAPI application.
+    """
+    end_year = settings.holiday_warmup_end_year or date.today().year + 1
+    years = range(settings.holiday_warmup_start_year, end_year + 1)
+    await holiday_service.prefetch(
+        years,
+        concurrency=settings.holiday_warmup_concurrency,
+    )
+    app.state.ready = True
+    logger.info("Holiday cache warmed for {} years", len(years))
+
+
+async def _cancel_tasks(tasks: List["asyncio.Task[None]"]) -> None:
+    """
+    Cancels background tasks and waits for them to finish.
+
+    A task that already died with an error is logged instead of raising,
+    so the buffers are still drained on shutdown.
+    """
+    for task in tasks:
+        task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    for task, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            logger.opt(exception=result).error(
+                "Background task {} failed", task.get_name(),
+            )
+
+
 @asynccontextmanager
 async def lifespan_setup(
     app: FastAPI,
@@ -54,7 +110,31 @@ async def lifespan_setup(
     app.middleware_stack = None
     _setup_db(app)
     await _create_tables()
+    holiday_service.attach_store(app.state.db_session_factory)
+    search_stats.attach_store(app.state.db_session_factory)
+    background_tasks = [
+        asyncio.create_task(cache_service.run_sweeper(settings.cache_sweep_interval)),
+        asyncio.create_task(
+            holiday_service.run_refresher(
+                settings.holiday_refresher_interval,
+                settings.holiday_refresh_ahead,
+            ),
+        ),
+        asyncio.create_task(search_stats.run_flusher()),
+    ]
+    if settings.search_buffer_enabled:
+        search_buffer.attach_store(app.state.db_session_factory)
+        background_tasks.append(asyncio.create_task(search_buffer.run_flusher()))
+    app.state.ready = not settings.holiday_warmup_enabled
+    if settings.holiday_warmup_enabled:
+        background_tasks.append(asyncio.create_task(_warm_up_holidays(app)))
     app.middleware_stack = app.build_middleware_stack()
 
     yield
+    await _cancel_tasks(background_tasks)
+    if settings.search_buffer_enabled:
+        await search_buffer.drain()
+    await search_stats.drain()
+    await holiday_service.close()
+    cache_service.close()
     await app.state.db_engine.dispose()
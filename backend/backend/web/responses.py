@@ -0,0 +1,21 @@
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body is produced while the request is still read.
+
+    StreamingResponse listens for client disconnects by calling receive()
+    concurrently with streaming, which would swallow request body messages
+    that the body iterator is still reading. This response streams directly
+    instead; a disconnect surfaces to the iterator as ClientDisconnect on its
+    next read of the request body.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Stream the body, then run the background task."""
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()
@@ -1,4 +1,5 @@
-from typing import Any, AsyncGenerator
+from datetime import datetime
+from typing import Any, AsyncGenerator, Callable, Dict, Type
 
 import pytest
 from fastapi import FastAPI
@@ -12,7 +13,12 @@ from sqlalchemy.ext.asyncio import (
 
 from backend.db.dependencies import get_db_session
 from backend.db.utils import create_database, drop_database
+from backend.services import search_buffer
+from backend.services import search_stats as search_stats_module
+from backend.services.search_stats import SearchStatsRollup
 from backend.settings import settings
+from backend.web import lifespan
+from backend.web.api.id_ops import views as id_ops_views
 from backend.web.application import get_app
 
 
@@ -108,3 +114,69 @@ async def client(
     """
     async with AsyncClient(app=fastapi_app, base_url="http://test", timeout=2.0) as ac:
         yield ac
+
+
+class FakeSession:
+    """
+    Stand-in for a session and its transaction.
+
+    Pass the class as the session factory of a write-behind buffer whose
+    DAO calls are monkeypatched.
+    """
+
+    async def __aenter__(self) -> "FakeSession":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+    def begin(self) -> "FakeSession":
+        """Transaction of the session, the session itself."""
+        return self
+
+
+@pytest.fixture
+def fake_session_factory() -> Type[FakeSession]:
+    """
+    Session factory that never touches a database.
+
+    :return: the FakeSession class.
+    """
+    return FakeSession
+
+
+def _search(id_number: str = "8001015800089", **fields: Any) -> Dict[str, Any]:
+    search = {
+        "id_number": id_number,
+        "date_of_birth": datetime(1980, 1, 1),
+        "gender": "male",
+        "citizen": True,
+    }
+    search.update(fields)
+    return search
+
+
+@pytest.fixture
+def make_search() -> Callable[..., Dict[str, Any]]:
+    """
+    Factory of recorded searches.
+
+    :return: function taking an ID number and fields to override.
+    """
+    return _search
+
+
+@pytest.fixture(autouse=True)
+def stats_rollup(monkeypatch: pytest.MonkeyPatch) -> SearchStatsRollup:
+    """
+    Replace the global search stats rollup with a fresh one.
+
+    Searches counted by one test are then never seen by another.
+
+    :param monkeypatch: pytest monkeypatch.
+    :return: the rollup used during the test.
+    """
+    rollup = SearchStatsRollup()
+    for module in (search_stats_module, search_buffer, id_ops_views, lifespan):
+        monkeypatch.setattr(module, "search_stats", rollup)
+    return rollup
@@ -1,8 +1,26 @@
+import asyncio
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List
+
+import httpx
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from backend.db.dao import id_search_dao
+from backend.db.dao.id_search_dao import IDSearchDAO
+from backend.models.holiday import Holiday
+from backend.models.id_search import IDSearch
+from backend.services.calendarific.holiday_service import holiday_service
+from backend.settings import settings
+from backend.web import lifespan
+from backend.web.application import get_app
+
 
 @pytest.mark.anyio
 async def test_health(client: AsyncClient, fastapi_app: FastAPI) -> None:
@@ -15,3 +33,240 @@ async def test_health(client: AsyncClient, fastapi_app: FastAPI) -> None:
     url = fastapi_app.url_path_for("health_check")
     response = await client.get(url)
     assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_ready_after_holiday_warmup(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    The readiness check fails until the holiday warmup has finished.
+
+    :param monkeypatch: pytest monkeypatch fixture.
+    """
+    prefetched = []
+
+    async def prefetch(years: Iterable[int], concurrency: int) -> None:
+        prefetched.extend(years)
+
+    monkeypatch.setattr(holiday_service, "prefetch", prefetch)
+    monkeypatch.setattr(settings, "holiday_warmup_start_year", 2020)
+    monkeypatch.setattr(settings, "holiday_warmup_end_year", 2022)
+    app = get_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        url = app.url_path_for("readiness_check")
+        response = await ac.get(url)
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json() == {"ready": False}
+
+        await lifespan._warm_up_holidays(app)  # noqa: SLF001
+
+        response = await ac.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"ready": True}
+    assert prefetched == [2020, 2021, 2022]
+
+
+@pytest.mark.anyio
+async def test_cancel_tasks_survives_failed_tasks() -> None:
+    """Shutdown goes on when a background task already died."""
+
+    async def crash() -> None:
+        raise RuntimeError("refresher died")
+
+    async def forever() -> None:
+        await asyncio.Event().wait()
+
+    tasks = [asyncio.create_task(crash()), asyncio.create_task(forever())]
+    await asyncio.sleep(0)
+
+    await lifespan._cancel_tasks(tasks)  # noqa: SLF001
+
+    assert tasks[1].cancelled()
+
+
+def _search(id_number: str = "8001015800089") -> Dict[str, Any]:
+    return {
+        "id_number": id_number,
+        "date_of_birth": datetime(1980, 1, 1),
+        "gender": "male",
+        "citizen": True,
+    }
+
+
+class _Session:
+    """Captures the statement record_search runs."""
+
+    def __init__(self) -> None:
+        self.statement: Any = None
+
+    async def execute(self, statement: Any) -> Any:
+        self.statement = statement
+        search = IDSearch(**_search(), search_count=1)
+        return SimpleNamespace(all=lambda: [(search, None)])
+
+
+@pytest.mark.anyio
+async def test_record_search_is_one_statement() -> None:
+    """
+    Upserting a search and reading its holidays is a single statement.
+
+    The upsert runs in a CTE whose returned row is joined to the holidays
+    on its date of birth.
+    """
+    session = _Session()
+    stored, holidays = await IDSearchDAO(session).record_search(_search())  # type: ignore[arg-type]
+
+    sql = " ".join(str(session.statement.compile(dialect=postgresql.dialect())).split())
+    assert sql.startswith("WITH upserted AS (INSERT INTO id_searches")
+    assert (
+        "ON CONFLICT (id_number) DO UPDATE SET "
+        "search_count = (id_searches.search_count + %(search_count_1)s), "
+        "updated_at = now() RETURNING"
+    ) in sql
+    assert (
+        "FROM upserted LEFT OUTER JOIN holidays ON holidays.country = %(country_1)s "
+        "AND holidays.date = CAST(upserted.date_of_birth AS DATE)"
+    ) in sql
+    assert stored.id_number == "8001015800089"
+    assert holidays == []
+
+
+@pytest.mark.anyio
+async def test_record_search_inserts_then_increments(dbsession: AsyncSession) -> None:
+    """
+    The first search inserts the ID, later ones count it again.
+
+    Both return the holidays stored for the date of birth.
+
+    :param dbsession: session to the test database.
+    """
+    dbsession.add(
+        Holiday(country="ZA", date=date(1980, 1, 1), name="New Year's Day"),
+    )
+    dao = IDSearchDAO(dbsession)
+
+    first, holidays = await dao.record_search(_search())
+    assert first.search_count == 1
+    assert first.updated_at is None
+    assert [holiday.name for holiday in holidays] == ["New Year's Day"]
+
+    second, holidays = await dao.record_search(_search())
+    assert second.id == first.id
+    assert second.search_count == 2
+    assert second.updated_at is not None
+    assert [holiday.name for holiday in holidays] == ["New Year's Day"]
+
+    other, holidays = await dao.record_search(_search("9001015800085"), country="US")
+    assert other.id != first.id
+    assert other.search_count == 1
+    assert holidays == []
+
+
+async def _search_counts(dbsession: AsyncSession) -> Dict[str, int]:
+    rows = await dbsession.execute(select(IDSearch.id_number, IDSearch.search_count))
+    return dict(rows.all())
+
+
+class _Statements:
+    """Collects the statements a DAO executes."""
+
+    def __init__(self) -> None:
+        self.statements: List[Any] = []
+
+    async def execute(self, statement: Any) -> None:
+        self.statements.append(statement)
+
+
+@pytest.mark.anyio
+async def test_bulk_upsert_writes_in_id_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Rows are upserted in id_number order across chunks.
+
+    Concurrent batches then lock shared rows in the same order.
+
+    :param monkeypatch: pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(id_search_dao, "UPSERT_CHUNK_SIZE", 2)
+    session = _Statements()
+    id_numbers = ["9507150123086", "0112315000185", "8505055800080"]
+
+    searches = [_search(id_number) for id_number in id_numbers]
+    await IDSearchDAO(session).bulk_upsert(searches)  # type: ignore[arg-type]
+
+    written = [
+        value
+        for statement in session.statements
+        for key, value in statement.compile(dialect=postgresql.dialect()).params.items()
+        if key.startswith("id_number")
+    ]
+    assert len(session.statements) == 2
+    assert written == sorted(id_numbers)
+
+
+@pytest.mark.anyio
+async def test_bulk_upsert_counts_and_increments(
+    dbsession: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    Repeats within a batch are counted once per row, known IDs incremented.
+
+    :param dbsession: session to the test database.
+    :param monkeypatch: pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(id_search_dao, "UPSERT_CHUNK_SIZE", 2)
+    dao = IDSearchDAO(dbsession)
+
+    await dao.bulk_upsert(
+        [
+            _search("9001015000085"),
+            _search("9507150123086"),
+            _search("9001015000085"),
+            {**_search("0112315000185"), "search_count": 3},
+        ],
+    )
+    assert await _search_counts(dbsession) == {
+        "9001015000085": 2,
+        "9507150123086": 1,
+        "0112315000185": 3,
+    }
+
+    await dao.bulk_upsert([_search("9507150123086"), _search("9001015000085")])
+    assert await _search_counts(dbsession) == {
+        "9001015000085": 3,
+        "9507150123086": 2,
+        "0112315000185": 3,
+    }
+
+
+@pytest.mark.anyio
+async def test_validate_batch(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    dbsession: AsyncSession,
+) -> None:
+    """
+    The batch endpoint reports every ID and records the valid ones.
+
+    :param client: client for the app.
+    :param fastapi_app: current FastAPI application.
+    :param dbsession: session to the test database.
+    """
+    url = fastapi_app.url_path_for("validate_batch")
+    response = await client.post(
+        url,
+        json={"id_numbers": ["9001015000085", "123", "9001015000085", "8505055800080"]},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert (body["total"], body["valid"], body["invalid"]) == (4, 3, 1)
+    assert body["results"][1] == {"id_number": "123", "valid": False}
+    assert body["results"][3] == {
+        "id_number": "8505055800080",
+        "valid": True,
+        "date_of_birth": "1985-05-05",
+        "gender": "male",
+        "citizen": True,
+    }
+    assert await _search_counts(dbsession) == {"9001015000085": 2, "8505055800080": 1}
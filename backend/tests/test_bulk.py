@@ -0,0 +1,182 @@
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import bulk
+from backend.bulk import Chunk, process_chunk, run, split_chunks
+from backend.models.id_search import IDSearch
+from backend.models.search_stats import SearchDemographics, SearchHourly
+from backend.services.bulk_pipeline import InputFormat
+from backend.services.id_validator import IDValidator
+
+PREFIXES = ("800101580008", "950715012308", "011231500018", "730229500008")
+
+
+def _expected_valid(id_numbers: List[str]) -> List[bool]:
+    # The bulk output also rejects IDs whose date does not exist (29 Feb 1973)
+    decoded = IDValidator.decode_many(id_numbers)
+    return [
+        bool(valid) and entry is not None
+        for valid, entry in zip(IDValidator.validate_many(id_numbers), decoded)
+    ]
+
+
+def _id_numbers() -> List[str]:
+    # Every check digit for each prefix, so most rows fail the Luhn check
+    return [f"{prefix}{digit}" for prefix in PREFIXES for digit in range(10)]
+
+
+def _write_input(path: Path, id_numbers: List[str]) -> None:
+    path.write_text(
+        "id_number\r\n" + "".join(f"{id_number}\r\n" for id_number in id_numbers),
+    )
+
+
+def _read_rows(path: Path) -> List[List[str]]:
+    with path.open(newline="") as file:
+        return list(csv.reader(file))
+
+
+def test_chunks_end_on_line_boundaries(tmp_path: Path) -> None:
+    """Chunks cover the file exactly and never split a line."""
+    path = tmp_path / "ids.csv"
+    _write_input(path, _id_numbers())
+    data = path.read_bytes()
+
+    chunks = split_chunks(path, chunk_size=40)
+
+    assert len(chunks) > 1
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(data)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous.end == chunk.start
+    for chunk in chunks:
+        assert data[chunk.end - 1 : chunk.end] == b"\n"
+
+
+def test_empty_file_has_no_chunks(tmp_path: Path) -> None:
+    """An empty input produces no work."""
+    path = tmp_path / "empty.csv"
+    path.write_bytes(b"")
+
+    assert split_chunks(path) == []
+
+
+def test_process_chunk_writes_rows_and_counts(tmp_path: Path) -> None:
+    """A chunk skips the header and writes one row per ID."""
+    path = tmp_path / "ids.csv"
+    id_numbers = _id_numbers()
+    _write_input(path, id_numbers)
+    part_path = tmp_path / "out.csv.part0"
+
+    result = process_chunk(
+        path,
+        Chunk(index=0, start=0, end=path.stat().st_size),
+        InputFormat.CSV,
+        0,
+        part_path,
+    )
+
+    rows = _read_rows(part_path)
+    assert [row[0] for row in rows] == id_numbers
+    assert result.records == len(id_numbers)
+    assert result.valid == sum(_expected_valid(id_numbers))
+
+
+def test_multi_chunk_run_matches_validator(tmp_path: Path) -> None:
+    """Results of a multi-chunk run agree with IDValidator row by row."""
+    input_path = tmp_path / "ids.csv"
+    output_path = tmp_path / "out.csv"
+    id_numbers = _id_numbers()
+    _write_input(input_path, id_numbers)
+
+    total, valid = run(
+        input_path,
+        output_path,
+        InputFormat.CSV,
+        workers=2,
+        chunk_size=64,
+    )
+
+    expected_valid = _expected_valid(id_numbers)
+    expected_decoded = IDValidator.decode_many(id_numbers)
+    header, *rows = _read_rows(output_path)
+    assert tuple(header) == bulk.OUTPUT_HEADER
+    assert [row[0] for row in rows] == id_numbers
+    assert [row[1] == "True" for row in rows] == expected_valid
+    for row, decoded in zip(rows, expected_decoded):
+        if decoded is None:
+            assert row[2:] == ["", "", ""]
+        else:
+            assert row[2] == decoded.date_of_birth.date().isoformat()
+            assert row[3] == decoded.gender
+            assert row[4] == str(decoded.citizen)
+    assert total == len(id_numbers)
+    assert valid == sum(expected_valid)
+    assert list(tmp_path.glob("out.csv.part*")) == []
+
+
+def test_failed_chunk_removes_part_files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Part files of finished chunks are removed when another chunk fails."""
+    input_path = tmp_path / "ids.csv"
+    output_path = tmp_path / "out.csv"
+    _write_input(input_path, _id_numbers())
+
+    def fail_second_chunk(*args: object) -> bulk.ChunkResult:
+        chunk = args[1]
+        result = process_chunk(*args)  # type: ignore[arg-type]
+        if chunk.index == 1:  # type: ignore[attr-defined]
+            raise RuntimeError("worker died")
+        return result
+
+    monkeypatch.setattr(bulk, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(bulk, "process_chunk", fail_second_chunk)
+
+    with pytest.raises(RuntimeError, match="worker died"):
+        run(input_path, output_path, InputFormat.CSV, workers=1, chunk_size=64)
+
+    assert list(tmp_path.glob("out.csv.part*")) == []
+
+
+@pytest.mark.anyio
+async def test_loaded_rows_are_counted_in_stats(
+    tmp_path: Path,
+    dbsession: AsyncSession,
+) -> None:
+    """Rows loaded offline reach id_searches and the stats rollups together."""
+    input_path = tmp_path / "ids.csv"
+    output_path = tmp_path / "out.csv"
+    _write_input(input_path, [*_id_numbers(), "8001015800089"])
+    run(input_path, output_path, InputFormat.CSV, workers=1)
+
+    rows = list(bulk._iter_valid_rows(output_path))  # noqa: SLF001
+    await bulk._load_batch(dbsession, rows)  # noqa: SLF001
+
+    searches = (
+        await dbsession.execute(select(IDSearch.id_number, IDSearch.search_count))
+    ).all()
+    assert dict(searches) == {
+        "8001015800089": 2,
+        "9507150123086": 1,
+        "0112315000185": 1,
+    }
+    demographics = (
+        await dbsession.execute(
+            select(
+                SearchDemographics.birth_year,
+                SearchDemographics.gender,
+                SearchDemographics.searches,
+            ).order_by(SearchDemographics.birth_year),
+        )
+    ).all()
+    assert demographics == [(1980, "male", 2), (1995, "female", 1), (2001, "male", 1)]
+    hourly = (await dbsession.execute(select(SearchHourly.searches))).scalars().all()
+    assert hourly == [4]
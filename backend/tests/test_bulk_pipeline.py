@@ -0,0 +1,187 @@
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List
+
+import httpx
+import pytest
+import ujson
+
+from backend.services.bulk_pipeline import (
+    MAX_LINE_LENGTH,
+    InputFormat,
+    RecordParser,
+    enrich_records,
+    split_lines,
+    validate_stream,
+)
+from backend.services.calendarific.quota import Priority, call_priority
+from backend.services.calendarific.sa_holidays import south_african_holidays
+from backend.web.application import get_app
+
+VALID_ID = "8001015800089"
+INVALID_ID = "8001015800088"
+
+
+async def _chunks(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def _lines(chunks: Iterable[bytes]) -> List[bytes]:
+    return [line async for line in split_lines(_chunks(chunks))]
+
+
+async def _results(chunks: Iterable[bytes], input_format: InputFormat) -> List[dict]:
+    output = b"".join(
+        [part async for part in validate_stream(_chunks(chunks), input_format)],
+    )
+    return [ujson.loads(line) for line in output.splitlines()]
+
+
+@pytest.mark.anyio
+async def test_lines_are_rejoined_across_chunks() -> None:
+    """Lines split over chunks come out whole, without CR or LF."""
+    lines = await _lines([b"ab", b"c\r\nde", b"f\n", b"\ng"])
+    assert lines == [b"abc", b"def", b"", b"g"]
+
+
+@pytest.mark.anyio
+async def test_overlong_lines_are_truncated() -> None:
+    """Overlong lines are cut to MAX_LINE_LENGTH, within one chunk or across many."""
+    long_line = b"1" * (MAX_LINE_LENGTH * 3)
+    assert await _lines([long_line + b"\nnext\n"]) == [
+        long_line[:MAX_LINE_LENGTH],
+        b"next",
+    ]
+
+    pieces = [long_line[i : i + 1000] for i in range(0, len(long_line), 1000)]
+    assert await _lines([*pieces, b"\nnext"]) == [long_line[:MAX_LINE_LENGTH], b"next"]
+
+
+def test_csv_header_selects_id_column() -> None:
+    """A header row is skipped and its id_number column used."""
+    parser = RecordParser(InputFormat.CSV)
+    assert parser.parse(b"name,id_number") is None
+    assert parser.parse(b"Thabo," + VALID_ID.encode()) == VALID_ID
+    assert parser.parse(b'"Smith, J",' + VALID_ID.encode()) == VALID_ID
+    assert parser.parse(b"only-one-field") == ""
+    assert parser.parse(b"   ") is None
+
+
+def test_csv_without_header_uses_first_column() -> None:
+    """Without a header the first column holds the ID number."""
+    parser = RecordParser(InputFormat.CSV)
+    assert parser.parse(VALID_ID.encode() + b",extra") == VALID_ID
+
+
+@pytest.mark.parametrize("first_line", [b"800101-5800-089", b"abc,def", b"name,age"])
+def test_csv_malformed_first_row_is_a_record(first_line: bytes) -> None:
+    """A first row without an id_number column is data, not a header."""
+    parser = RecordParser(InputFormat.CSV)
+    assert parser.parse(first_line) == first_line.decode().split(",")[0]
+    assert parser.parse(VALID_ID.encode()) == VALID_ID
+
+
+def test_ndjson_records() -> None:
+    """NDJSON lines may be strings, objects or numbers; bad JSON is unparseable."""
+    parser = RecordParser(InputFormat.NDJSON)
+    assert parser.parse(b'"' + VALID_ID.encode() + b'"') == VALID_ID
+    assert parser.parse(b'{"id_number": "' + VALID_ID.encode() + b'"}') == VALID_ID
+    assert parser.parse(b"1015800085") == "0001015800085"
+    assert parser.parse(b"{not json") == ""
+    assert parser.parse(b"true") == ""
+
+
+def test_input_format_from_content_type() -> None:
+    """JSON-lines media types select NDJSON, anything else CSV."""
+    assert (
+        InputFormat.from_content_type("application/x-ndjson; charset=utf-8")
+        is InputFormat.NDJSON
+    )
+    assert InputFormat.from_content_type("text/csv") is InputFormat.CSV
+
+
+@pytest.mark.anyio
+async def test_validate_stream_decodes_every_record() -> None:
+    """Every parsed record gets one result line, in input order."""
+    body = f"id_number\n{VALID_ID}\n{INVALID_ID}\nabc\n".encode()
+    results = await _results([body[:7], body[7:20], body[20:]], InputFormat.CSV)
+    assert results == [
+        {
+            "id_number": VALID_ID,
+            "valid": True,
+            "date_of_birth": "1980-01-01",
+            "gender": "male",
+            "citizen": True,
+        },
+        {"id_number": INVALID_ID, "valid": False},
+        {"id_number": "abc", "valid": False},
+    ]
+
+
+@pytest.mark.anyio
+async def test_validate_stream_reports_malformed_first_row() -> None:
+    """A malformed first row is answered as invalid instead of dropped."""
+    body = f"800101-5800-089\n{VALID_ID}\n".encode()
+    results = await _results([body], InputFormat.CSV)
+    assert [(result["id_number"], result["valid"]) for result in results] == [
+        ("800101-5800-089", False),
+        (VALID_ID, True),
+    ]
+
+
+class _Holidays:
+    def __init__(self) -> None:
+        self.lookups = 0
+        self.priorities: List[Priority] = []
+
+    async def get_holidays_for_date(self, date: datetime) -> list:
+        self.lookups += 1
+        self.priorities.append(call_priority.get())
+        return [
+            holiday
+            for holiday in south_african_holidays(date.year)
+            if holiday.date == date.date()
+        ]
+
+
+@pytest.mark.anyio
+async def test_enrich_looks_up_each_date_once() -> None:
+    """Records sharing a date of birth share one holiday lookup."""
+    holidays = _Holidays()
+    records = [
+        {"valid": True, "date_of_birth": "2000-01-01"},
+        {"valid": True, "date_of_birth": "2000-01-01"},
+        {"valid": False},
+    ]
+    await enrich_records(records, holidays)
+    assert holidays.lookups == 1
+    assert records[0]["holidays"] == [{"name": "New Year's Day", "date": "2000-01-01"}]
+    assert "holidays" not in records[2]
+
+
+@pytest.mark.anyio
+async def test_stream_enrichment_runs_at_background_priority() -> None:
+    """Holiday lookups of a stream do not spend the interactive reserve."""
+    holidays = _Holidays()
+    body = f"{VALID_ID}\n9001015000085\n".encode()
+
+    stream = validate_stream(_chunks([body]), InputFormat.CSV, holidays, batch_size=1)
+    async for _ in stream:
+        assert call_priority.get() is Priority.INTERACTIVE
+
+    assert holidays.priorities == [Priority.BACKGROUND, Priority.BACKGROUND]
+
+
+@pytest.mark.anyio
+async def test_validate_stream_endpoint() -> None:
+    """The endpoint streams NDJSON results for an NDJSON upload."""
+    transport = httpx.ASGITransport(app=get_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/id/validate/stream",
+            content=f'"{VALID_ID}"\n{{"id_number": "{INVALID_ID}"}}\n'.encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+    assert response.status_code == 200
+    results = [ujson.loads(line) for line in response.text.splitlines()]
+    assert [result["valid"] for result in results] == [True, False]
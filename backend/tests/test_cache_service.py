@@ -0,0 +1,178 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from backend.services import cache_backends
+from backend.services.cache_backends import SQLiteCacheBackend
+from backend.services.cache_service import CacheService, cache_response
+
+
+def test_lru_eviction_by_entries() -> None:
+    """The least recently used entry is evicted once max_entries is reached."""
+    cache = CacheService(max_entries=2)
+    cache.set("ns:a", 1)
+    cache.set("ns:b", 2)
+    assert cache.get("ns:a") == 1
+    cache.set("ns:c", 3)
+
+    assert cache.get("ns:b") is None
+    assert cache.get("ns:a") == 1
+    assert cache.get("ns:c") == 3
+    assert cache.stats()["namespaces"]["ns"]["evictions"] == 1
+
+
+def test_eviction_by_bytes() -> None:
+    """Entries are evicted to stay within max_bytes."""
+    cache = CacheService(max_bytes=10_000)
+    for i in range(100):
+        cache.set(f"ns:{i}", "x" * 1000)
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 10_000
+    assert stats["entries"] < 100
+    assert cache.get("ns:99") is not None
+
+
+def test_sweep_removes_expired(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Expired entries are swept without being read."""
+    cache = CacheService()
+    cache.set("short:a", 1, ttl=10)
+    cache.set("long:a", 2, ttl=1000)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 100)
+
+    assert cache.sweep_expired() == 1
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["namespaces"]["short"]["expirations"] == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_share_one_call() -> None:
+    """Concurrent callers for the same key trigger a single call."""
+    calls = 0
+    release = asyncio.Event()
+
+    @cache_response(ttl=60)
+    async def slow_lookup(year: int) -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return year
+
+    waiters = [asyncio.ensure_future(slow_lookup(1990)) for _ in range(10)]
+    await asyncio.sleep(0)
+    waiters[0].cancel()
+    release.set()
+
+    results = await asyncio.gather(*waiters[1:])
+    assert results == [1990] * 9
+    assert calls == 1
+
+
+@pytest.mark.anyio
+async def test_shared_exceptions_are_not_cached() -> None:
+    """A failed call is raised to every waiter and retried afterwards."""
+    calls = 0
+
+    @cache_response(ttl=60)
+    async def flaky_lookup(year: int) -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        if calls == 1:
+            raise RuntimeError("upstream down")
+        return year
+
+    results = await asyncio.gather(
+        flaky_lookup(2000),
+        flaky_lookup(2000),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await flaky_lookup(2000) == 2000
+    assert calls == 2
+
+
+def test_shared_backend_serves_other_instances(tmp_path: Path) -> None:
+    """A value set through one cache is found by another sharing the backend."""
+    first = CacheService(shared=SQLiteCacheBackend(tmp_path / "cache.sqlite3"))
+    second = CacheService(shared=SQLiteCacheBackend(tmp_path / "cache.sqlite3"))
+    first.set("ns:key", {"year": 1990}, ttl=60)
+
+    assert second.get("ns:key") == {"year": 1990}
+    assert second.stats()["namespaces"]["ns"]["shared_hits"] == 1
+    assert second.get("ns:key") == {"year": 1990}
+    assert second.stats()["namespaces"]["ns"]["hits"] == 1
+
+
+def test_shared_backend_is_thread_safe(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Threads sharing one backend open one connection and never interleave."""
+    connect = sqlite3.connect
+    connections = []
+
+    def slow_connect(*args: Any, **kwargs: Any) -> sqlite3.Connection:
+        # Widen the window in which a second thread could open its own
+        time.sleep(0.01)
+        connection = connect(*args, **kwargs)
+        connections.append(connection)
+        return connection
+
+    monkeypatch.setattr(cache_backends.sqlite3, "connect", slow_connect)
+    backend = SQLiteCacheBackend(tmp_path / "cache.sqlite3")
+
+    def work(worker: int) -> None:
+        for step in range(50):
+            key = f"ns:{worker}:{step}"
+            backend.set(key, {"worker": worker, "step": step}, time.time() + 60)
+            assert backend.get(key)[0] == {"worker": worker, "step": step}  # type: ignore[index]
+            backend.sweep_expired()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(8)))
+
+    assert len(connections) == 1
+    backend.close()
+
+
+class _YearLookup:
+    """Stands in for a service whose method results are cached."""
+
+    calls = 0
+
+    @cache_response(ttl=60)
+    async def lookup(self, year: int) -> dict:
+        _YearLookup.calls += 1
+        return {"year": year}
+
+
+@pytest.mark.anyio
+async def test_decorated_methods_share_backend_across_workers(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Two workers, each with its own cache and service, share cached results."""
+    import backend.services.cache_service as cache_module
+
+    key = _YearLookup.lookup.key_for(_YearLookup(), 1990)
+    assert "object at" not in key
+
+    path = tmp_path / "cache.sqlite3"
+    first = CacheService(shared=SQLiteCacheBackend(path))
+    second = CacheService(shared=SQLiteCacheBackend(path))
+
+    monkeypatch.setattr(cache_module, "cache_service", first)
+    assert await _YearLookup().lookup(1990) == {"year": 1990}
+
+    monkeypatch.setattr(cache_module, "cache_service", second)
+    assert await _YearLookup().lookup(1990) == {"year": 1990}
+    assert _YearLookup.calls == 1
+    assert second.stats()["namespaces"]["lookup"]["shared_hits"] == 1
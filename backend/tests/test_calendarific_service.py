@@ -0,0 +1,174 @@
+import asyncio
+import time
+from typing import List
+
+import httpx
+import pytest
+
+from backend.services.cache_service import cache_response, cache_service
+from backend.services.calendarific.quota import (
+    Priority,
+    QuotaBudget,
+    call_priority,
+    current_priority,
+)
+from backend.services.calendarific.service import (
+    CalendarificBudgetError,
+    CalendarificError,
+    CalendarificResponseError,
+    CalendarificService,
+    CalendarificUnavailableError,
+)
+
+HOLIDAYS_PAYLOAD = {
+    "meta": {"code": 200},
+    "response": {
+        "holidays": [
+            {
+                "name": "New Year's Day",
+                "date": {"datetime": {"year": 2024, "month": 1, "day": 1}},
+            },
+        ],
+    },
+}
+
+
+def _service(responses: List[int]) -> CalendarificService:
+    """Service whose transport answers with the given statuses in order."""
+    statuses = iter(responses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses), json=HOLIDAYS_PAYLOAD)
+
+    service = CalendarificService("test-key")
+    service.backoff_base = 0
+    service.client = httpx.AsyncClient(
+        base_url=service.base_url,
+        transport=httpx.MockTransport(handler),
+    )
+    return service
+
+
+@pytest.mark.anyio
+async def test_retries_transient_errors() -> None:
+    """5xx and 429 responses are retried until one succeeds."""
+    service = _service([503, 429, 200])
+    holidays = await service.get_holidays(2024)
+    assert holidays[0].iso == "2024-01-01"
+    assert holidays[0].name == "New Year's Day"
+    assert service.breaker.state == "closed"
+
+
+@pytest.mark.anyio
+async def test_circuit_opens_after_repeated_failures() -> None:
+    """Once the breaker opens, calls fail without reaching the API."""
+    service = _service([500] * 100)
+    service.max_retries = 0
+    service.breaker.failure_threshold = 2
+    for _ in range(2):
+        with pytest.raises(CalendarificUnavailableError):
+            await service.get_holidays(2024)
+    assert service.breaker.state == "open"
+
+    service.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: pytest.fail("API was called")),
+    )
+    with pytest.raises(CalendarificUnavailableError):
+        await service.get_holidays(2024)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("status", "error", "message"),
+    [
+        (401, CalendarificResponseError, "Failed to fetch holidays: 401 Unauthorized"),
+        (503, CalendarificUnavailableError, "Calendarific returned 503"),
+    ],
+)
+async def test_errors_do_not_leak_the_api_key(
+    status: int,
+    error: type,
+    message: str,
+) -> None:
+    """Error messages name the status, never the URL with its api_key."""
+    service = _service([status])
+    service.max_retries = 0
+
+    with pytest.raises(CalendarificError) as info:
+        await service.get_holidays(2024)
+
+    assert isinstance(info.value, error)
+    assert message in str(info.value)
+    assert "test-key" not in str(info.value)
+
+@pytest.mark.anyio
+async def test_background_calls_leave_reserve_for_interactive() -> None:
+    """Background calls stop at the reserve, interactive ones use it up."""
+    budget = QuotaBudget(
+        "test-key",
+        monthly_quota=3,
+        background_reserve=1,
+        rate=1000,
+        burst=10,
+    )
+    assert await budget.acquire(Priority.BACKGROUND)
+    assert await budget.acquire(Priority.BACKGROUND)
+    assert not await budget.acquire(Priority.BACKGROUND)
+    assert budget.nearly_exhausted
+    assert await budget.acquire(Priority.INTERACTIVE)
+    assert not await budget.acquire(Priority.INTERACTIVE)
+
+    stats = budget.stats()
+    assert stats["calls_made"] == 3
+    assert stats["calls_avoided"] == 2
+    assert stats["remaining"] == 0
+
+
+@pytest.mark.anyio
+async def test_budget_rejection_ends_half_open_trial(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A trial the budget did not allow leaves the next call free to try."""
+    service = _service([200])
+    service.breaker.failures = service.breaker.failure_threshold
+    service.breaker._opened_at = time.monotonic() - service.breaker.reset_timeout  # noqa: SLF001
+    allowed = iter([False, True])
+
+    async def acquire(priority: Priority) -> bool:
+        return next(allowed)
+
+    monkeypatch.setattr(service.budget, "acquire", acquire)
+    assert service.breaker.state == "half-open"
+    with pytest.raises(CalendarificBudgetError):
+        await service.get_holidays(2024)
+
+    holidays = await service.get_holidays(2024)
+    assert holidays[0].iso == "2024-01-01"
+    assert service.breaker.state == "closed"
+
+
+@pytest.mark.anyio
+async def test_shared_lookup_takes_highest_waiting_priority() -> None:
+    """A background lookup joined by an interactive caller calls as interactive."""
+    cache_service.clear()
+    released = asyncio.Event()
+    seen = []
+
+    @cache_response(ttl=60)
+    async def lookup(year: int) -> int:
+        await released.wait()
+        seen.append((year, current_priority()))
+        return year
+
+    async def prefetch(year: int) -> int:
+        call_priority.set(Priority.BACKGROUND)
+        return await lookup(year)
+
+    joined = asyncio.gather(prefetch(2024), lookup(2024))
+    alone = asyncio.ensure_future(prefetch(2025))
+    await asyncio.sleep(0.01)
+    released.set()
+
+    assert await joined == [2024, 2024]
+    assert await alone == 2025
+    assert sorted(seen) == [(2024, Priority.INTERACTIVE), (2025, Priority.BACKGROUND)]
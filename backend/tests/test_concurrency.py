@@ -0,0 +1,46 @@
+import sys
+
+import anyio
+import pytest
+
+from backend.services.concurrency import gather
+
+if sys.version_info < (3, 11):
+    from exceptiongroup import ExceptionGroup
+
+
+async def _value(value: int, delay: float = 0) -> int:
+    await anyio.sleep(delay)
+    return value
+
+
+async def _fail(error: Exception) -> None:
+    raise error
+
+
+@pytest.mark.anyio
+async def test_results_keep_argument_order() -> None:
+    """Results line up with the awaitables, not with completion order."""
+    assert await gather(_value(1, 0.02), _value(2), _value(3, 0.01)) == [1, 2, 3]
+
+
+@pytest.mark.anyio
+async def test_single_failure_raises_original_exception() -> None:
+    """One failing awaitable surfaces as itself and cancels the others."""
+    finished = []
+
+    async def slow() -> None:
+        await anyio.sleep(1)
+        finished.append(True)
+
+    with pytest.raises(LookupError, match="no holidays"):
+        await gather(slow(), _fail(LookupError("no holidays")))
+    assert finished == []
+
+
+@pytest.mark.anyio
+async def test_several_failures_stay_grouped() -> None:
+    """Failures from more than one awaitable are not collapsed."""
+    with pytest.raises(ExceptionGroup) as info:
+        await gather(_fail(ValueError("a")), _fail(KeyError("b")))
+    assert {type(error) for error in info.value.exceptions} == {ValueError, KeyError}
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.db.dependencies import get_db_session
+from backend.db.session import WriteTrackingSession, _writes
+from backend.models.id_search import IDSearch
+
+
+def test_writes_detects_data_modifying_statements() -> None:
+    """Plain SELECTs are reads, DML and SELECTs from DML CTEs are writes."""
+    assert not _writes(select(IDSearch).where(IDSearch.id == 1))
+    upsert = insert(IDSearch).values(id_number="8001015800089")
+    assert _writes(upsert)
+    assert _writes(select(upsert.returning(IDSearch.id).cte("upserted")))
+
+
+@pytest.mark.anyio
+async def test_unused_session_never_touches_the_pool() -> None:
+    """A request that fails before any statement neither connects nor commits."""
+    engine = create_async_engine("postgresql+asyncpg://nobody@127.0.0.1:1/none")
+    factory = async_sessionmaker(engine, sync_session_class=WriteTrackingSession)
+    request = SimpleNamespace(
+        app=SimpleNamespace(state=SimpleNamespace(db_session_factory=factory)),
+    )
+
+    dependency = get_db_session(request)
+    session = await dependency.__anext__()
+    with pytest.raises(ValueError):
+        await dependency.athrow(ValueError("invalid ID"))
+    assert not session.in_transaction()
+    assert engine.pool.checkedout() == 0
+
+    dependency = get_db_session(request)
+    await dependency.__anext__()
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    assert engine.pool.checkedout() == 0
+    await engine.dispose()
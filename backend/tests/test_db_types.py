@@ -0,0 +1,14 @@
+from sqlalchemy.dialects import postgresql
+
+from backend.db.types import IDNumber
+
+
+def test_id_number_round_trip() -> None:
+    """ID numbers are stored as integers and read back zero-padded."""
+    id_type = IDNumber()
+    dialect = postgresql.dialect()
+    for id_number in ("8001015800089", "0001015800085"):
+        stored = id_type.process_bind_param(id_number, dialect)
+        assert isinstance(stored, int)
+        assert id_type.process_result_value(stored, dialect) == id_number
+    assert id_type.process_bind_param(None, dialect) is None
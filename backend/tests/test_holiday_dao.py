@@ -0,0 +1,123 @@
+import importlib.util
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.dao import holiday_dao
+from backend.db.dao.holiday_dao import HolidayDAO
+from backend.db.dao.holiday_year_dao import HolidayYearDAO
+from backend.models.holiday import Holiday
+
+MIGRATION_008 = (
+    Path(__file__).parents[1] / "alembic" / "versions" / "008_shared_holidays.py"
+)
+
+
+def _migration() -> Any:
+    spec = importlib.util.spec_from_file_location("shared_holidays", MIGRATION_008)
+    module = importlib.util.module_from_spec(spec)  # type: ignore[arg-type]
+    spec.loader.exec_module(module)  # type: ignore[union-attr]
+    return module
+
+
+def _row(day: date, name: str) -> Dict[str, Any]:
+    return {"date": day, "name": name, "description": None, "type": "National holiday"}
+
+
+class _Session:
+    """Collects the statements a DAO executes."""
+
+    def __init__(self) -> None:
+        self.statements: List[Any] = []
+
+    async def execute(self, statement: Any) -> None:
+        self.statements.append(statement)
+
+
+@pytest.mark.anyio
+async def test_replace_year_statements(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The year is cleared, then refilled in chunks that skip duplicates."""
+    monkeypatch.setattr(holiday_dao, "INSERT_CHUNK_SIZE", 2)
+    session = _Session()
+    rows = [
+        _row(date(2024, 1, 1), "New Year's Day"),
+        _row(date(2024, 3, 21), "Human Rights Day"),
+        _row(date(2024, 3, 29), "Good Friday"),
+    ]
+
+    await HolidayDAO(session).replace_year("ZA", 2024, rows)  # type: ignore[arg-type]
+
+    delete, *inserts = [
+        statement.compile(dialect=postgresql.dialect())
+        for statement in session.statements
+    ]
+    assert str(delete).startswith("DELETE FROM holidays WHERE holidays.country =")
+    assert "holidays.date BETWEEN" in str(delete)
+    assert list(delete.params.values()) == ["ZA", date(2024, 1, 1), date(2024, 12, 31)]
+    assert len(inserts) == 2
+    for insert in inserts:
+        assert str(insert).endswith("ON CONFLICT DO NOTHING")
+    names = [
+        value
+        for insert in inserts
+        for key, value in insert.params.items()
+        if key.startswith("name")
+    ]
+    assert names == ["New Year's Day", "Human Rights Day", "Good Friday"]
+
+
+def test_backfill_reads_both_payload_formats() -> None:
+    """The 008 backfill unpacks compact lists and raw Calendarific holidays."""
+    sql = _migration().BACKFILL_HOLIDAYS
+    assert "WHEN 'array' THEN (h.item->>2)::date" in sql
+    assert "ELSE left(h.item->'date'->>'iso', 10)::date" in sql
+    assert "jsonb_array_elements(y.payload)" in sql
+    assert sql.strip().endswith("ON CONFLICT DO NOTHING")
+
+
+@pytest.mark.anyio
+async def test_replace_year(dbsession: AsyncSession) -> None:
+    """Replacing a year drops holidays that are no longer listed."""
+    dao = HolidayDAO(dbsession)
+    await dao.replace_year("ZA", 2024, [_row(date(2024, 1, 1), "New Year's Day")])
+    await dao.replace_year(
+        "ZA",
+        2024,
+        [_row(date(2024, 3, 21), "Human Rights Day")] * 2,
+    )
+
+    rows = (await dbsession.execute(select(Holiday.date, Holiday.name))).all()
+    assert rows == [(date(2024, 3, 21), "Human Rights Day")]
+
+
+@pytest.mark.anyio
+async def test_backfill_holidays(dbsession: AsyncSession) -> None:
+    """Stored years are copied into the holidays table once per holiday."""
+    raw = {
+        "name": "Freedom Day",
+        "description": "Freedom Day is a public holiday in South Africa.",
+        "date": {"iso": "2023-04-27"},
+        "type": ["National holiday"],
+    }
+    years = HolidayYearDAO(dbsession)
+    await years.upsert("ZA", 2023, [raw, raw])
+    await years.upsert(
+        "ZA", 2024, [["Youth Day", None, "2024-06-16", "National holiday"]],
+    )
+
+    await dbsession.execute(text(_migration().BACKFILL_HOLIDAYS))
+
+    rows = (
+        await dbsession.execute(
+            select(Holiday.date, Holiday.name, Holiday.type).order_by(Holiday.date),
+        )
+    ).all()
+    assert rows == [
+        (date(2023, 4, 27), "Freedom Day", "National holiday"),
+        (date(2024, 6, 16), "Youth Day", "National holiday"),
+    ]
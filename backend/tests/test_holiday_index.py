@@ -0,0 +1,110 @@
+from datetime import date
+from typing import List
+
+from backend.services.calendarific.holiday_index import HolidayIndex, HolidayStatus
+from backend.services.calendarific.holiday_record import HolidayRecord
+
+
+def _holiday(day: date, name: str) -> HolidayRecord:
+    return HolidayRecord(
+        name=name,
+        description=None,
+        ordinal=day.toordinal(),
+        type="National holiday",
+    )
+
+
+# Out of order on purpose, with two holidays on one date
+HOLIDAYS = [
+    _holiday(date(2023, 12, 26), "Day of Goodwill"),
+    _holiday(date(2023, 1, 1), "New Year's Day"),
+    _holiday(date(2023, 12, 15), "Rugby World Cup Victory Day"),
+    _holiday(date(2023, 3, 21), "Human Rights Day"),
+    _holiday(date(2023, 12, 16), "Day of Reconciliation"),
+    _holiday(date(2023, 12, 25), "Christmas Day"),
+    _holiday(date(2023, 3, 21), "Human Rights Day observed"),
+]
+
+
+def _names(holidays: List[HolidayRecord]) -> List[str]:
+    return [holiday.name for holiday in holidays]
+
+
+def test_on_date() -> None:
+    """Every holiday on the date is returned, and none on other dates."""
+    index = HolidayIndex(HOLIDAYS)
+
+    assert _names(index.on_date(date(2023, 3, 21))) == [
+        "Human Rights Day",
+        "Human Rights Day observed",
+    ]
+    assert _names(index.on_date(date(2023, 1, 1))) == ["New Year's Day"]
+    assert index.on_date(date(2023, 3, 22)) == []
+    # Same day and month of another year
+    assert index.on_date(date(2024, 1, 1)) == []
+
+
+def test_in_month() -> None:
+    """Holidays are grouped by month, and empty months have none."""
+    index = HolidayIndex(HOLIDAYS)
+
+    assert _names(index.in_month(12)) == [
+        "Day of Goodwill",
+        "Rugby World Cup Victory Day",
+        "Day of Reconciliation",
+        "Christmas Day",
+    ]
+    assert index.in_month(2) == []
+
+
+def test_in_range_bounds_are_inclusive() -> None:
+    """Holidays on the first and last day of the range are included, in date order."""
+    index = HolidayIndex(HOLIDAYS)
+
+    assert _names(index.in_range(date(2023, 12, 16), date(2023, 12, 25))) == [
+        "Day of Reconciliation",
+        "Christmas Day",
+    ]
+    assert _names(index.in_range(date(2023, 3, 21), date(2023, 3, 21))) == [
+        "Human Rights Day",
+        "Human Rights Day observed",
+    ]
+    assert index.in_range(date(2023, 12, 17), date(2023, 12, 24)) == []
+    assert index.in_range(date(2023, 12, 26), date(2023, 12, 15)) == []
+
+
+def test_in_range_year_edges() -> None:
+    """Ranges reaching past the year only return this year's holidays."""
+    index = HolidayIndex(HOLIDAYS)
+
+    before = index.in_range(date(2022, 12, 1), date(2023, 1, 1))
+    after = index.in_range(date(2023, 12, 26), date(2024, 1, 31))
+
+    assert _names(before) == ["New Year's Day"]
+    assert _names(after) == ["Day of Goodwill"]
+    assert index.in_range(date(2022, 1, 1), date(2022, 12, 31)) == []
+    assert len(index.in_range(date(2000, 1, 1), date(2099, 12, 31))) == len(HOLIDAYS)
+
+
+def test_empty_index() -> None:
+    """An index without holidays answers every lookup with nothing."""
+    index = HolidayIndex([], HolidayStatus.DEGRADED, 60)
+
+    assert index.on_date(date(2023, 1, 1)) == []
+    assert index.in_month(1) == []
+    assert index.in_range(date(2023, 1, 1), date(2023, 12, 31)) == []
+
+
+def test_with_status_shares_lookups() -> None:
+    """A copy with another status answers the same lookups."""
+    index = HolidayIndex(HOLIDAYS)
+
+    stale = index.with_status(HolidayStatus.STALE, 30)
+
+    assert (stale.status, stale.retry_after) == (HolidayStatus.STALE, 30)
+    assert (index.status, index.retry_after) == (HolidayStatus.FRESH, None)
+    assert stale.on_date(date(2023, 12, 25)) == index.on_date(date(2023, 12, 25))
+    assert stale.in_range(date(2023, 1, 1), date(2023, 12, 31)) == index.in_range(
+        date(2023, 1, 1),
+        date(2023, 12, 31),
+    )
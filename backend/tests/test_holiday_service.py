@@ -0,0 +1,403 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import anyio
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
+
+from backend.db.dao.holiday_year_dao import HolidayYearDAO
+from backend.models.holiday import Holiday
+from backend.models.holiday_year import HolidayYear
+from backend.services.cache_service import cache_service
+from backend.services.calendarific.holiday_index import HolidayStatus
+from backend.services.calendarific.holiday_service import HolidayService
+from backend.services.calendarific.sa_holidays import south_african_holidays
+from backend.settings import HolidaySource, settings
+
+HOLIDAYS_2024 = south_african_holidays(2024)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> None:
+    """Cache keys do not include the service, so start every test empty."""
+    cache_service.clear()
+
+
+def _service(monkeypatch: pytest.MonkeyPatch, responses: List[Any]) -> HolidayService:
+    """Service whose Calendarific calls return or raise the given values in order."""
+    service = HolidayService()
+    service.source = HolidaySource.CALENDARIFIC
+
+    async def get_holidays(year: int, country: str = "ZA") -> List[dict]:
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(service.calendarific, "get_holidays", get_holidays)
+    return service
+
+
+@pytest.mark.anyio
+async def test_failed_refresh_serves_stale_data(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A failed refresh keeps the last good year, cached only briefly."""
+    service = _service(
+        monkeypatch,
+        [HOLIDAYS_2024, RuntimeError("down"), HOLIDAYS_2024],
+    )
+    refresh = HolidayService.get_holiday_index.refresh
+    key = HolidayService.get_holiday_index.key_for(service, 2024)
+
+    fresh = await service.get_holiday_index(2024)
+    assert fresh.status == HolidayStatus.FRESH
+
+    stale = await refresh(service, 2024)
+    assert stale.status == HolidayStatus.STALE
+    assert stale.holidays == HOLIDAYS_2024
+    assert stale.retry_after == settings.holiday_error_ttl
+    assert cache_service.expiry(key) <= time.time() + settings.holiday_error_ttl
+
+    recovered = await refresh(service, 2024)
+    assert recovered.status == HolidayStatus.FRESH
+    assert recovered.retry_after is None
+
+
+@pytest.mark.anyio
+async def test_failures_without_data_back_off(monkeypatch: pytest.MonkeyPatch) -> None:
+    """With nothing to serve the answer is degraded and retried ever later."""
+    service = _service(monkeypatch, [RuntimeError("down"), RuntimeError("down")])
+    refresh = HolidayService.get_holiday_index.refresh
+
+    first = await service.get_holiday_index(2024)
+    second = await refresh(service, 2024)
+    assert first.status == second.status == HolidayStatus.DEGRADED
+    assert first.holidays == []
+    assert second.retry_after == 2 * first.retry_after
+
+
+@pytest.mark.anyio
+async def test_fallback_source_is_degraded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Locally computed holidays stand in for a failed fetch, marked degraded."""
+    service = _service(monkeypatch, [RuntimeError("down")])
+    service.source = HolidaySource.FALLBACK
+
+    index = await service.get_holiday_index(2024)
+    assert index.status == HolidayStatus.DEGRADED
+    assert index.holidays == HOLIDAYS_2024
+
+
+@pytest.mark.parametrize(
+    ("birthday", "window"),
+    [
+        (date(1990, 7, 15), (date(1990, 6, 1), date(1990, 8, 31))),
+        (date(1990, 1, 1), (date(1989, 12, 1), date(1990, 2, 28))),
+        (date(1990, 12, 31), (date(1990, 11, 1), date(1991, 1, 31))),
+        (date(2024, 1, 31), (date(2023, 12, 1), date(2024, 2, 29))),
+    ],
+)
+def test_birthday_window(birthday: date, window: Tuple[date, date]) -> None:
+    """The window runs from the month before the birthday to the month after."""
+    assert HolidayService.birthday_window(birthday) == window
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    ("birthday", "expected"),
+    [
+        (
+            datetime(2024, 1, 10),
+            ["2023-12-15", "2023-12-16", "2023-12-25", "2023-12-26", "2024-01-01"],
+        ),
+        (
+            datetime(2024, 12, 5),
+            ["2024-12-16", "2024-12-25", "2024-12-26", "2025-01-01"],
+        ),
+    ],
+)
+async def test_holidays_around_birthday_cross_the_year(
+    birthday: datetime,
+    expected: List[str],
+) -> None:
+    """December and January birthdays reach into the neighbouring year."""
+    service = HolidayService()
+    service.source = HolidaySource.LOCAL
+
+    holidays = await service.get_holidays_around_birthday(birthday)
+
+    assert [holiday.iso for holiday in holidays] == expected
+
+
+@pytest.mark.anyio
+async def test_refresher_only_refreshes_years_near_expiry(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Years expiring within refresh_ahead, or no longer cached, are refreshed."""
+    service = HolidayService()
+    service._loaded_years = {(2023, "ZA"), (2024, "ZA"), (2025, "ZA")}  # noqa: SLF001
+    key_for = HolidayService.get_holiday_index.key_for
+    expiries = {
+        key_for(service, 2023, "ZA"): time.time() + 10,
+        key_for(service, 2024, "ZA"): time.time() + 3600,
+    }
+    refreshed = []
+
+    async def refresh(self: HolidayService, year: int, country_code: str) -> None:
+        refreshed.append(year)
+
+    monkeypatch.setattr(cache_service, "expiry", expiries.get)
+    monkeypatch.setattr(HolidayService.get_holiday_index, "refresh", refresh)
+
+    task = asyncio.create_task(service.run_refresher(interval=0, refresh_ahead=60))
+    with anyio.fail_after(1):
+        while len(refreshed) < 4:
+            await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert set(refreshed) == {2023, 2025}
+
+
+class _Store:
+    """In-memory stand-in for the holiday_years table and refresh lock."""
+
+    def __init__(self, claimed: bool = True) -> None:
+        self.rows: Dict[Tuple[int, str], HolidayYear] = {}
+        self.claimed = claimed
+        self.saved = 0
+        # Locally computed years written to the holidays table
+        self.local: Dict[Tuple[int, str], List[Any]] = {}
+        # Rows other instances store while this one waits, one per read
+        self.arriving: List[Optional[HolidayYear]] = []
+
+    def put(self, year: int, age: timedelta, holidays: List[Any]) -> None:
+        self.rows[(year, "ZA")] = HolidayYear(
+            country="ZA",
+            year=year,
+            payload=[holiday.to_payload() for holiday in holidays],
+            fetched_at=datetime.now(timezone.utc) - age,
+        )
+
+    def attach(self, monkeypatch: pytest.MonkeyPatch, service: HolidayService) -> None:
+        async def load_stored(year: int, country_code: str) -> Optional[HolidayYear]:
+            if self.arriving:
+                row = self.arriving.pop(0)
+                if row is not None:
+                    self.rows[(year, country_code)] = row
+            return self.rows.get((year, country_code))
+
+        async def save(year: int, country_code: str, holidays: List[Any]) -> None:
+            self.saved += 1
+            self.put(year, timedelta(0), holidays)
+
+        async def save_local(year: int, country_code: str, holidays: List[Any]) -> None:
+            self.local[(year, country_code)] = holidays
+
+        @asynccontextmanager
+        async def refresh_lock(year: int, country_code: str) -> AsyncIterator[bool]:
+            yield self.claimed
+
+        service._session_factory = object()  # noqa: SLF001
+        service.lock_poll_interval = 0
+        monkeypatch.setattr(service, "_load_stored", load_stored)
+        monkeypatch.setattr(service, "_save", save)
+        monkeypatch.setattr(service, "_save_local", save_local)
+        monkeypatch.setattr(service, "_refresh_lock", refresh_lock)
+
+
+@pytest.mark.anyio
+async def test_claimed_refresh_fetches_and_saves(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The instance holding the lock fetches an expired year and stores it."""
+    service = _service(monkeypatch, [HOLIDAYS_2024])
+    store = _Store()
+    store.put(2024, timedelta(days=30), HOLIDAYS_2024[:1])
+    store.attach(monkeypatch, service)
+
+    index = await service.get_holiday_index(2024)
+    assert index.status == HolidayStatus.FRESH
+    assert index.holidays == HOLIDAYS_2024
+    assert store.saved == 1
+
+
+@pytest.mark.anyio
+async def test_claimed_refresh_rechecks_the_store(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A year refreshed elsewhere before the lock was taken is not fetched again."""
+    service = _service(monkeypatch, [])
+    store = _Store()
+    fresh = HolidayYear(
+        country="ZA",
+        year=2024,
+        payload=[holiday.to_payload() for holiday in HOLIDAYS_2024],
+        fetched_at=datetime.now(timezone.utc),
+    )
+    # Nothing on the first read, fresh once the lock is held
+    store.arriving = [None, fresh]
+    store.attach(monkeypatch, service)
+
+    index = await service.get_holiday_index(2024)
+    assert index.status == HolidayStatus.FRESH
+    assert index.holidays == HOLIDAYS_2024
+    assert store.saved == 0
+
+
+@pytest.mark.anyio
+async def test_failed_claimed_refresh_serves_stored_year(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """An expired stored year is served as stale when the fetch fails."""
+    service = _service(monkeypatch, [RuntimeError("down")])
+    store = _Store()
+    store.put(2024, timedelta(days=30), HOLIDAYS_2024)
+    store.attach(monkeypatch, service)
+
+    index = await service.get_holiday_index(2024)
+    assert index.status == HolidayStatus.STALE
+    assert index.holidays == HOLIDAYS_2024
+    assert store.saved == 0
+
+
+@pytest.mark.anyio
+async def test_unclaimed_refresh_waits_for_other_instance(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Without the lock, the year another instance stores is served."""
+    service = _service(monkeypatch, [])
+    store = _Store(claimed=False)
+    fresh = HolidayYear(
+        country="ZA",
+        year=2024,
+        payload=[holiday.to_payload() for holiday in HOLIDAYS_2024],
+        fetched_at=datetime.now(timezone.utc),
+    )
+    store.arriving = [None, None, fresh]
+    store.attach(monkeypatch, service)
+
+    index = await service.get_holiday_index(2024)
+    assert index.status == HolidayStatus.FRESH
+    assert index.holidays == HOLIDAYS_2024
+
+
+@pytest.mark.anyio
+async def test_unclaimed_refresh_gives_up_with_stale_year(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """When the other instance never stores the year, the old one is served."""
+    service = _service(monkeypatch, [])
+    store = _Store(claimed=False)
+    store.put(2024, timedelta(days=30), HOLIDAYS_2024)
+    store.attach(monkeypatch, service)
+    service.lock_wait = 0.01
+
+    index = await service.get_holiday_index(2024)
+    assert index.status == HolidayStatus.STALE
+    assert index.holidays == HOLIDAYS_2024
+
+
+@pytest.mark.anyio
+async def test_fallback_years_are_stored(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Locally computed stand-ins are written for searches to join."""
+    service = _service(monkeypatch, [RuntimeError("down")])
+    service.source = HolidaySource.FALLBACK
+    store = _Store()
+    store.attach(monkeypatch, service)
+
+    index = await service.get_holiday_index(2024)
+    assert index.status == HolidayStatus.DEGRADED
+    assert store.local == {(2024, "ZA"): HOLIDAYS_2024}
+    assert store.saved == 0
+
+
+@pytest.mark.anyio
+async def test_local_years_are_stored(dbsession: AsyncSession) -> None:
+    """With the local source every computed year reaches the holidays table."""
+    service = HolidayService()
+    service.source = HolidaySource.LOCAL
+    service.attach_store(async_sessionmaker(dbsession.bind, expire_on_commit=False))
+
+    await service.get_holiday_index(2024)
+
+    dates = (
+        await dbsession.execute(select(Holiday.date).distinct().order_by(Holiday.date))
+    ).scalars()
+    assert list(dates) == sorted({holiday.date for holiday in HOLIDAYS_2024})
+
+
+@pytest.mark.anyio
+async def test_local_years_leave_fetched_years_alone(dbsession: AsyncSession) -> None:
+    """A year fetched from Calendarific is not overwritten by local rules."""
+    service = HolidayService()
+    service.attach_store(async_sessionmaker(dbsession.bind, expire_on_commit=False))
+    await HolidayYearDAO(dbsession).upsert(
+        "ZA",
+        2024,
+        [holiday.to_payload() for holiday in HOLIDAYS_2024],
+    )
+
+    await service._save_local(2024, "ZA", HOLIDAYS_2024)  # noqa: SLF001
+
+    assert (await dbsession.execute(select(Holiday))).first() is None
+
+
+async def _year_locked_elsewhere(year: int) -> bool:
+    """Whether a year's refresh lock is held, seen from a fresh connection."""
+    engine = create_async_engine(str(settings.db_url), poolclass=NullPool)
+    try:
+        async with async_sessionmaker(engine)() as session:
+            await session.connection(
+                execution_options={"isolation_level": "AUTOCOMMIT"},
+            )
+            dao = HolidayYearDAO(session)
+            if not await dao.try_lock("ZA", year):
+                return True
+            await dao.unlock("ZA", year)
+            return False
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_refresh_lock_is_released(_engine: AsyncEngine) -> None:
+    """The lock is held while claimed and released afterwards."""
+    service = HolidayService()
+    service.attach_store(async_sessionmaker(_engine))
+
+    async with service._refresh_lock(2024, "ZA") as claimed:  # noqa: SLF001
+        assert claimed
+        assert await _year_locked_elsewhere(2024)
+    assert not await _year_locked_elsewhere(2024)
+
+
+@pytest.mark.anyio
+async def test_failed_unlock_does_not_pool_the_lock(
+    _engine: AsyncEngine,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A connection that could not unlock is dropped, releasing the lock."""
+    service = HolidayService()
+    service.attach_store(async_sessionmaker(_engine))
+
+    async def unlock(self: HolidayYearDAO, country: str, year: int) -> None:
+        raise ConnectionError("unlock failed")
+
+    monkeypatch.setattr(HolidayYearDAO, "unlock", unlock)
+    with pytest.raises(ConnectionError):
+        async with service._refresh_lock(2024, "ZA") as claimed:  # noqa: SLF001
+            assert claimed
+    monkeypatch.undo()
+
+    assert not await _year_locked_elsewhere(2024)
@@ -0,0 +1,97 @@
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+
+from backend.services import id_kernel
+from backend.services.id_validator import (
+    BirthInsightsTable,
+    IDValidator,
+    birth_insights,
+)
+
+
+def _with_check_digit(prefix: str) -> str:
+    for check_digit in "0123456789":
+        if IDValidator._validate_checksum(prefix + check_digit):  # noqa: SLF001
+            return prefix + check_digit
+    raise AssertionError("Luhn always has a check digit")
+
+
+def _random_ids(seed: int, count: int) -> List[str]:
+    """Mix of plausible, random and malformed ID numbers."""
+    rng = random.Random(seed)  # noqa: S311
+    ids = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            prefix = (
+                f"{rng.randint(0, 99):02d}{rng.randint(0, 13):02d}"
+                f"{rng.randint(0, 32):02d}{rng.randint(0, 9999):04d}"
+                f"{rng.randint(0, 2)}{rng.randint(0, 9)}"
+            )
+            ids.append(_with_check_digit(prefix))
+        elif kind < 0.9:
+            ids.append("".join(rng.choices("0123456789", k=13)))
+        else:
+            ids.append("".join(rng.choices("0123456789a -", k=rng.randint(0, 15))))
+    return ids
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_validate_many_matches_scalar(seed: int) -> None:
+    """Batch validation agrees with validate_id_number for every input."""
+    ids = _random_ids(seed, 2000)
+    expected = [IDValidator.validate_id_number(id_number) for id_number in ids]
+    assert IDValidator.validate_many(ids).tolist() == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_kernel_fields_match_scalar(seed: int) -> None:
+    """Record array fields agree with slicing the ID string."""
+    ids = [id_number for id_number in _random_ids(seed, 2000) if len(id_number) == 13]
+    ids = [id_number for id_number in ids if id_number.isdigit()]
+    decoded = id_kernel.decode_batch(ids)
+    for id_number, row in zip(ids, decoded):
+        assert row["birth_year"] == int(id_number[0:2])
+        assert row["birth_month"] == int(id_number[2:4])
+        assert row["birth_day"] == int(id_number[4:6])
+        assert row["gender_sequence"] == int(id_number[6:10])
+        assert row["citizenship"] == int(id_number[10])
+        assert row["checksum_ok"] == IDValidator._validate_checksum(id_number)  # noqa: SLF001
+
+
+@pytest.mark.anyio
+async def test_decode_many_matches_scalar() -> None:
+    """Batch decoding agrees with decode_id_number for every decodable ID."""
+    ids = _random_ids(42, 500)
+    for id_number, id_info in zip(ids, IDValidator.decode_many(ids)):
+        if id_info is None:
+            continue
+        expected = await IDValidator.decode_id_number(id_number)
+        assert id_info.as_dict() == expected.as_dict()
+
+
+def test_non_ascii_digits() -> None:
+    """Unicode decimal digits are handled like the scalar path."""
+    ids = ["٨٠٠١٠١٥٠٠٩٠٨٧", "8001015009087", "²001015009087"]
+    expected = [IDValidator.validate_id_number(id_number) for id_number in ids]
+    assert IDValidator.validate_many(ids).tolist() == expected
+
+
+def test_birth_insights_table_matches_direct_computation() -> None:
+    """Every date in the table gives the same insights as computing them."""
+    day = datetime.combine(BirthInsightsTable.FIRST_DATE, datetime.min.time())
+    while day.date() <= BirthInsightsTable.LAST_DATE:
+        assert birth_insights.lookup(day) == BirthInsightsTable._compute(day)  # noqa: SLF001
+        day += timedelta(days=1)
+
+
+def test_decoded_id_insights_are_lazy_and_shared() -> None:
+    """Insights are only computed when read, and shared between IDs."""
+    first, second = IDValidator.decode_many(["8001015009087", "8001015800089"])
+    assert first._insights is None  # noqa: SLF001
+    assert first.insights == birth_insights.lookup(first.date_of_birth)
+    assert first.insights.birth_stone is second.insights.birth_stone
+    assert first.insights.famous_birthdays is second.insights.famous_birthdays
@@ -0,0 +1,76 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from backend.services.calendarific.holiday_record import HolidayRecord
+from backend.services.calendarific.sa_holidays import (
+    SAHolidayCalculator,
+    easter_sunday,
+    south_african_holidays,
+)
+
+# Public holiday dates of South Africa, keyed by year. Taken from the
+# python-holidays package (0.58), plus the 2000 local government election
+# day it does not list.
+ZA_PUBLIC_HOLIDAYS = json.loads(
+    (Path(__file__).parent / "data" / "za_public_holidays.json").read_text(),
+)
+
+
+@pytest.mark.parametrize("year", sorted(ZA_PUBLIC_HOLIDAYS))
+def test_matches_published_holidays(year: str) -> None:
+    """Computed public holidays fall on the published dates."""
+    # Two holidays can share a date, like Good Friday on Human Rights Day 2008
+    computed = sorted({holiday.iso for holiday in south_african_holidays(int(year))})
+    assert computed == ZA_PUBLIC_HOLIDAYS[year]
+
+
+def test_easter_sunday() -> None:
+    """Computus agrees with known Easter dates, including the extremes."""
+    assert easter_sunday(2000) == date(2000, 4, 23)
+    assert easter_sunday(2008) == date(2008, 3, 23)
+    assert easter_sunday(2038) == date(2038, 4, 25)
+    assert easter_sunday(2285) == date(2285, 3, 22)
+
+
+def test_sunday_holiday_moves_to_monday() -> None:
+    """A Sunday holiday adds the Monday, unless that is a holiday already."""
+    holidays = {holiday.iso: holiday.name for holiday in south_african_holidays(2022)}
+    # Workers' Day fell on a Sunday
+    assert holidays["2022-05-02"] == "Workers' Day observed"
+    # Christmas fell on a Sunday: the Monday is the Day of Goodwill anyway,
+    # and the Tuesday was proclaimed a holiday instead
+    assert holidays["2022-12-26"] == "Day of Goodwill"
+    assert holidays["2022-12-27"] == "Day of Goodwill observed"
+
+
+@pytest.mark.anyio
+async def test_calculator_interface() -> None:
+    """The calculator answers like CalendarificService for South Africa only."""
+    calculator = SAHolidayCalculator()
+    assert await calculator.get_holidays(2025, "ZA") == south_african_holidays(2025)
+    with pytest.raises(ValueError):
+        await calculator.get_holidays(2025, "US")
+
+
+def test_record_payload_round_trip() -> None:
+    """Records survive the compact store format and raw Calendarific holidays."""
+    raw = {
+        "name": "Freedom Day",
+        "description": "Freedom Day is a public holiday in South Africa.",
+        "country": {"id": "za", "name": "South Africa"},
+        "date": {
+            "iso": "2024-04-27",
+            "datetime": {"year": 2024, "month": 4, "day": 27},
+        },
+        "type": ["National holiday"],
+        "primary_type": "National holiday",
+        "locations": "All",
+        "states": "All",
+    }
+    record = HolidayRecord.from_calendarific(raw)
+    assert record.iso == "2024-04-27"
+    assert HolidayRecord.from_payload(record.to_payload()) == record
+    assert HolidayRecord.from_payload(raw) == record
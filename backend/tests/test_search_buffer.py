@@ -0,0 +1,180 @@
+from typing import Any, Callable, Dict, List
+
+import httpx
+import pytest
+
+from backend.db.dao import id_search_dao
+from backend.db.dependencies import get_db_session
+from backend.services import search_buffer as search_buffer_module
+from backend.services.cache_service import cache_service
+from backend.services.calendarific.holiday_service import holiday_service
+from backend.services.search_buffer import SearchCountBuffer
+from backend.services.search_stats import SearchStatsRollup
+from backend.settings import HolidaySource, settings
+from backend.web.application import get_app
+
+SearchFactory = Callable[..., Dict[str, Any]]
+SessionFactory = Callable[[], Any]
+
+
+@pytest.mark.anyio
+async def test_flush_writes_one_row_per_id(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_session_factory: SessionFactory,
+    make_search: SearchFactory,
+    stats_rollup: SearchStatsRollup,
+) -> None:
+    """Repeated searches are merged and written in one upsert."""
+    written: List[List[Dict[str, Any]]] = []
+
+    async def bulk_upsert(self: Any, searches: List[Dict[str, Any]]) -> None:
+        written.append(searches)
+
+    monkeypatch.setattr(id_search_dao.IDSearchDAO, "bulk_upsert", bulk_upsert)
+    buffer = SearchCountBuffer(max_ids=100)
+    buffer.attach_store(fake_session_factory)
+
+    for id_number in ["8001015009087", "8001015009087", "8001015800089"]:
+        buffer.add(make_search(id_number))
+    assert await buffer.flush() == 2
+    assert buffer.pending == 0
+    # Written searches reach the stats rollups only once committed
+    assert stats_rollup.pending == 3
+
+    counts = {search["id_number"]: search["search_count"] for search in written[0]}
+    assert counts == {"8001015009087": 2, "8001015800089": 1}
+
+
+@pytest.mark.anyio
+async def test_failed_flush_keeps_counts(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_session_factory: SessionFactory,
+    make_search: SearchFactory,
+) -> None:
+    """Counts survive a failed flush and merge with newer searches."""
+
+    async def bulk_upsert(self: Any, searches: List[Dict[str, Any]]) -> None:
+        raise ConnectionError("database down")
+
+    monkeypatch.setattr(id_search_dao.IDSearchDAO, "bulk_upsert", bulk_upsert)
+    buffer = SearchCountBuffer()
+    buffer.attach_store(fake_session_factory)
+
+    buffer.add(make_search("8001015009087"))
+    with pytest.raises(ConnectionError):
+        await buffer.flush()
+    buffer.add(make_search("8001015009087"))
+    assert buffer._pending["8001015009087"]["search_count"] == 2  # noqa: SLF001
+
+
+@pytest.mark.anyio
+async def test_size_triggered_flush(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_session_factory: SessionFactory,
+    make_search: SearchFactory,
+) -> None:
+    """Reaching max_ids distinct IDs flushes without waiting for the interval."""
+    written: List[List[Dict[str, Any]]] = []
+
+    async def bulk_upsert(self: Any, searches: List[Dict[str, Any]]) -> None:
+        written.append(searches)
+
+    monkeypatch.setattr(id_search_dao.IDSearchDAO, "bulk_upsert", bulk_upsert)
+    buffer = SearchCountBuffer(max_ids=2)
+    buffer.attach_store(fake_session_factory)
+
+    buffer.add(make_search("8001015009087"))
+    assert buffer._flush_task is None  # noqa: SLF001
+    buffer.add(make_search("8001015800089"))
+    await buffer._flush_task  # noqa: SLF001
+    assert len(written) == 1
+    assert buffer.pending == 0
+
+
+@pytest.mark.anyio
+async def test_failed_flushes_back_off_and_full_buffer_refuses(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_session_factory: SessionFactory,
+    make_search: SearchFactory,
+) -> None:
+    """A failed flush holds off the next one, and a full buffer refuses searches."""
+    attempts = 0
+
+    async def bulk_upsert(self: Any, searches: List[Dict[str, Any]]) -> None:
+        nonlocal attempts
+        attempts += 1
+        raise ConnectionError("database down")
+
+    monkeypatch.setattr(id_search_dao.IDSearchDAO, "bulk_upsert", bulk_upsert)
+    buffer = SearchCountBuffer(max_ids=1, max_pending=2)
+    buffer.attach_store(fake_session_factory)
+
+    assert buffer.add(make_search("8001015009087"))
+    await buffer._flush_task  # noqa: SLF001
+    assert attempts == 1
+    assert not buffer._may_flush()  # noqa: SLF001
+
+    assert buffer.add(make_search("8001015800089"))
+    assert buffer._flush_task.done()  # noqa: SLF001
+    assert attempts == 1
+    assert not buffer.add(make_search("0001015800085"))
+    assert buffer.pending == 2
+
+
+@pytest.mark.anyio
+async def test_drain_writes_everything_pending(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_session_factory: SessionFactory,
+    make_search: SearchFactory,
+) -> None:
+    """Draining waits for a running flush and writes what is left."""
+    written: List[str] = []
+
+    async def bulk_upsert(self: Any, searches: List[Dict[str, Any]]) -> None:
+        written.extend(search["id_number"] for search in searches)
+
+    monkeypatch.setattr(id_search_dao.IDSearchDAO, "bulk_upsert", bulk_upsert)
+    buffer = SearchCountBuffer(max_ids=1)
+    buffer.attach_store(fake_session_factory)
+
+    buffer.add(make_search("8001015009087"))
+    buffer.add(make_search("8001015800089"))
+    await buffer.drain()
+    assert sorted(written) == ["8001015009087", "8001015800089"]
+    assert buffer.pending == 0
+
+
+@pytest.mark.anyio
+async def test_buffered_search_keeps_birth_date_holidays(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A buffered search answers without a count but with its holidays."""
+    buffered: List[Dict[str, Any]] = []
+
+    def add(search: Dict[str, Any]) -> bool:
+        buffered.append(search)
+        return True
+
+    async def record_search(self: Any, search: Dict[str, Any]) -> None:
+        pytest.fail("buffered search was written directly")
+
+    cache_service.clear()
+    monkeypatch.setattr(settings, "search_buffer_enabled", True)
+    monkeypatch.setattr(search_buffer_module.search_buffer, "add", add)
+    monkeypatch.setattr(id_search_dao.IDSearchDAO, "record_search", record_search)
+    monkeypatch.setattr(holiday_service, "source", HolidaySource.LOCAL)
+    app = get_app()
+    app.dependency_overrides[get_db_session] = lambda: None
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Born on Freedom Day 2000
+        response = await client.post(
+            "/api/id/validate", data={"id_number": "0004275000083"},
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id_info"]["search_count"] is None
+    assert [holiday["name"] for holiday in body["holidays"]] == ["Freedom Day"]
+    assert body["holidays"][0]["date"] == "2000-04-27"
+    assert [search["id_number"] for search in buffered] == ["0004275000083"]
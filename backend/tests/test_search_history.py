@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.dao.id_search_dao import SearchOrder
+from backend.models.id_search import IDSearch
+from backend.web.api.searches.views import _decode_cursor, _encode_cursor
+
+
+def test_cursor_round_trip() -> None:
+    """Cursors decode to the sort key and id they were made from."""
+    searched_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    cursor = _encode_cursor(SearchOrder.LAST_SEARCHED, searched_at, 42)
+    assert _decode_cursor(SearchOrder.LAST_SEARCHED, cursor) == (searched_at, 42)
+
+    cursor = _encode_cursor(SearchOrder.SEARCH_COUNT, 7, 3)
+    assert _decode_cursor(SearchOrder.SEARCH_COUNT, cursor) == (7, 3)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "WzFd", ""])
+def test_invalid_cursor_is_rejected(cursor: str) -> None:
+    """Malformed cursors and cursors of another order are a 400."""
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(SearchOrder.SEARCH_COUNT, cursor)
+    assert error.value.status_code == 400
+
+    other_order = _encode_cursor(SearchOrder.SEARCH_COUNT, 7, 3)
+    with pytest.raises(HTTPException):
+        _decode_cursor(SearchOrder.LAST_SEARCHED, other_order)
+
+
+async def _add_searches(dbsession: AsyncSession) -> List[IDSearch]:
+    """Searches with repeated counts and last searched times."""
+    created_at = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    # (search_count, hours after created_at of the last search or None)
+    shapes = [(3, None), (1, 2), (3, 2), (2, None), (1, None), (3, 1), (2, 2), (1, 1)]
+    searches = [
+        IDSearch(
+            id_number=f"{9001015000000 + number:013d}",
+            date_of_birth=datetime(1990, 1, 1),
+            gender="male",
+            citizen=True,
+            search_count=search_count,
+            created_at=created_at,
+            updated_at=None if hours is None else created_at + timedelta(hours=hours),
+        )
+        for number, (search_count, hours) in enumerate(shapes)
+    ]
+    dbsession.add_all(searches)
+    await dbsession.flush()
+    return searches
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("order", list(SearchOrder))
+async def test_paging_visits_every_search_once(
+    order: SearchOrder,
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    dbsession: AsyncSession,
+) -> None:
+    """
+    Following next_cursor returns every search once, in order, despite ties.
+
+    :param order: sort order to page through.
+    :param client: client for the app.
+    :param fastapi_app: current FastAPI application.
+    :param dbsession: session to the test database.
+    """
+    searches = await _add_searches(dbsession)
+
+    def sort_key(search: IDSearch) -> tuple:
+        if order == SearchOrder.LAST_SEARCHED:
+            return search.updated_at or search.created_at, search.id
+        return search.search_count, search.id
+
+    expected = [
+        search.id_number
+        for search in sorted(searches, key=sort_key, reverse=True)
+    ]
+    url = fastapi_app.url_path_for("list_searches")
+    seen: List[str] = []
+    cursor: Optional[str] = None
+    for _ in range(len(searches)):
+        params = {"order_by": order.value, "limit": 3}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = await client.get(url, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(item["id_number"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert len(set(seen)) == len(searches)
+
+
+@pytest.mark.anyio
+async def test_list_searches_rejects_invalid_cursor(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+) -> None:
+    """
+    Malformed cursors and cursors of the other order are a 400.
+
+    :param client: client for the app.
+    :param fastapi_app: current FastAPI application.
+    """
+    url = fastapi_app.url_path_for("list_searches")
+    other_order = _encode_cursor(SearchOrder.SEARCH_COUNT, 7, 3)
+
+    for params in (
+        {"cursor": "not a cursor"},
+        {"order_by": SearchOrder.LAST_SEARCHED.value, "cursor": other_order},
+    ):
+        response = await client.get(url, params=params)
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid cursor"}
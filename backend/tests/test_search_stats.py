@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from backend.db.dao import search_stats_dao
+from backend.db.session import after_commit
+from backend.models.search_stats import SearchDemographics, SearchHourly
+from backend.services.search_stats import (
+    SearchStatsRollup,
+    count_searches,
+    current_hour,
+)
+from backend.web.api.stats.views import search_stats
+
+SearchFactory = Callable[..., Dict[str, Any]]
+SessionFactory = Callable[[], Any]
+
+
+def test_counts_are_rolled_up(make_search: SearchFactory) -> None:
+    """Searches are summed per birth year, gender and citizen status and per hour."""
+    searches = [
+        make_search(),
+        make_search(search_count=3),
+        make_search(date_of_birth=datetime(1991, 5, 2), gender="female", citizen=False),
+    ]
+    demographics, hourly = count_searches(searches)
+    assert demographics == {(1980, "male", True): 4, (1991, "female", False): 1}
+    assert hourly == {current_hour(): 5}
+
+    rollup = SearchStatsRollup()
+    rollup.add(make_search())
+    rollup.add_many(searches)
+    assert rollup.pending == 6
+
+
+@pytest.mark.anyio
+async def test_failed_flush_restores_counts(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_session_factory: SessionFactory,
+    make_search: SearchFactory,
+) -> None:
+    """Counts of a failed flush are kept and written with newer ones next time."""
+    written: List[Dict[Any, int]] = []
+
+    async def add(
+        self: Any,
+        demographics: Dict[Any, int],
+        hourly: Dict[Any, int],
+    ) -> None:
+        if not written:
+            written.append({})
+            raise ConnectionError("database down")
+        written.append(dict(demographics))
+
+    monkeypatch.setattr(search_stats_dao.SearchStatsDAO, "add", add)
+    rollup = SearchStatsRollup()
+    rollup.attach_store(fake_session_factory)
+
+    rollup.add(make_search())
+    with pytest.raises(ConnectionError):
+        await rollup.flush()
+    assert rollup.pending == 1
+
+    rollup.add(make_search())
+    assert await rollup.flush() == 2
+    assert written[-1] == {(1980, "male", True): 2}
+    assert rollup.pending == 0
+
+
+def test_counted_only_after_commit(make_search: SearchFactory) -> None:
+    """Searches registered with after_commit are counted on commit, not on rollback."""
+    rollup = SearchStatsRollup()
+    session = Session(create_engine("sqlite://"))
+    async_session: Any = SimpleNamespace(sync_session=session)
+
+    session.execute(text("SELECT 1"))
+    after_commit(async_session, lambda: rollup.add(make_search()))
+    session.rollback()
+    assert rollup.pending == 0
+
+    session.execute(text("SELECT 1"))
+    after_commit(async_session, lambda: rollup.add(make_search()))
+    assert rollup.pending == 0
+    session.commit()
+    assert rollup.pending == 1
+
+
+@pytest.mark.anyio
+async def test_stats_endpoint_aggregates_rollups(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Decade, gender and citizen totals are summed from the rollup rows."""
+    rows = [
+        SearchDemographics(birth_year=1981, gender="Male", citizen=True, searches=4),
+        SearchDemographics(birth_year=1989, gender="Female", citizen=False, searches=2),
+        SearchDemographics(birth_year=1990, gender="Female", citizen=True, searches=1),
+    ]
+    hours = [SearchHourly(hour=current_hour() - timedelta(hours=1), searches=7)]
+
+    async def demographics(self: Any) -> List[SearchDemographics]:
+        return rows
+
+    async def hourly(self: Any, since: datetime) -> List[SearchHourly]:
+        assert since == current_hour() - timedelta(hours=23)
+        return hours
+
+    monkeypatch.setattr(search_stats_dao.SearchStatsDAO, "demographics", demographics)
+    monkeypatch.setattr(search_stats_dao.SearchStatsDAO, "hourly", hourly)
+
+    stats = await search_stats(hours=24, session=None)
+    assert stats.total_searches == 7
+    assert [(d.decade, d.searches) for d in stats.by_decade] == [(1980, 6), (1990, 1)]
+    assert stats.by_gender == {"Male": 4, "Female": 3}
+    assert stats.by_citizen == {"citizen": 5, "permanent_resident": 2}
+    assert stats.hourly[0].searches == 7